@@ -1,21 +1,32 @@
+"""Manim render worker: queues render jobs, publishes the videos and caches them by code."""
+import asyncio
+import hashlib
+import json
 import logging
 import os
 import re
 import shutil
+import socket
+import sqlite3
 import subprocess
+import time
+from collections import OrderedDict, deque
 from contextlib import contextmanager
 from datetime import date
+from functools import lru_cache, partial
+from importlib import metadata, util
 from pathlib import Path
-from threading import Lock, Thread
-from typing import Any, Iterator
+from threading import Condition, Lock, Thread
+from typing import Any, Callable, Iterator, Protocol
 from uuid import uuid4
 
 import boto3
+import render_pool
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
-
 load_dotenv()
 
 try:  # pragma: no cover - exercised in container runtime
@@ -34,9 +45,28 @@ app = FastAPI(title="AnimAI Manim Worker")
 
 TMP_DIR = Path(os.getenv("MANIM_TMP_DIR", "/tmp/manim-worker"))
 PUBLISHED_DIR = TMP_DIR / "published"
+RENDER_CACHE_DIR = TMP_DIR / "render-cache"
 MAX_CODE_BYTES = int(os.getenv("MANIM_MAX_CODE_BYTES", "300000"))
 RENDER_TIMEOUT_SECONDS = int(os.getenv("MANIM_RENDER_TIMEOUT_SECONDS", "900"))
 QUALITY_FLAG = os.getenv("MANIM_QUALITY_FLAG", "-ql").strip() or "-ql"
+RENDER_BACKEND = (os.getenv("MANIM_RENDER_BACKEND") or "auto").strip().lower()
+MAX_CONCURRENT_RENDERS = max(1, int(os.getenv("MANIM_MAX_CONCURRENT_RENDERS") or os.cpu_count() or 1))
+MAX_QUEUED_JOBS = max(1, int(os.getenv("MANIM_MAX_QUEUED_JOBS", "32")))
+QUEUE_RETRY_AFTER_SECONDS = max(1, int(os.getenv("MANIM_QUEUE_RETRY_AFTER_SECONDS", "30")))
+JOB_STORE_BACKEND = (os.getenv("MANIM_JOB_STORE") or "sqlite").strip().lower()
+JOB_STORE_PATH = Path(os.getenv("MANIM_JOB_STORE_PATH") or TMP_DIR / "jobs.sqlite3")
+JOB_TTL_SECONDS = max(60, int(os.getenv("MANIM_JOB_TTL_SECONDS", "86400")))
+JOB_EVICTION_INTERVAL_SECONDS = max(1, int(os.getenv("MANIM_JOB_EVICTION_INTERVAL_SECONDS", "300")))
+WORKER_ID = (os.getenv("MANIM_WORKER_ID") or socket.gethostname()).strip()
+# A running job is stale once it outlives its render timeout with room to publish; a queued one after the job TTL.
+STALE_RUNNING_JOB_SECONDS = RENDER_TIMEOUT_SECONDS * 2
+RENDER_CACHE_ENABLED = os.getenv("MANIM_RENDER_CACHE_ENABLED", "true").lower() == "true"
+RENDER_CACHE_TTL_SECONDS = max(60, int(os.getenv("MANIM_RENDER_CACHE_TTL_SECONDS", "604800")))
+RENDER_CACHE_MAX_BYTES = max(0, int(os.getenv("MANIM_RENDER_CACHE_MAX_BYTES", str(5 * 1024**3))))
+MAX_LONG_POLL_SECONDS = max(1, int(os.getenv("MANIM_MAX_LONG_POLL_SECONDS", "60")))
+JOB_RECHECK_SECONDS = 2.0
+SSE_HEARTBEAT_SECONDS = 15.0
+FINISHED_JOB_STATUSES = ("succeeded", "failed")
 SCENE_NAME_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
 REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,80}$")
 TRACE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
@@ -44,10 +74,207 @@ SPAN_ID_PATTERN = re.compile(r"^[0-9a-f]{16}$")
 
 TMP_DIR.mkdir(parents=True, exist_ok=True)
 PUBLISHED_DIR.mkdir(parents=True, exist_ok=True)
+RENDER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 app.mount("/published", StaticFiles(directory=str(PUBLISHED_DIR)), name="published")
 
-_jobs: dict[str, dict[str, Any]] = {}
-_jobs_lock = Lock()
+
+class JobStore(Protocol):
+    """Where render jobs live; shared by every worker process when it is SQLite-backed."""
+
+    def create(self, job: dict[str, Any]) -> None:
+        """Store a new job record."""
+
+    def update(self, job_id: str, **updates: Any) -> None:
+        """Merge updates into a job; unknown ids are ignored."""
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        """Return a copy of the job, or None if it is unknown."""
+
+    def evict_finished(self, older_than: float) -> int:
+        """Delete finished jobs last updated before older_than; return how many."""
+
+    def references_video(self, video_url: str) -> bool:
+        """Return True if any stored job points at video_url."""
+
+    def fail_unfinished(
+        self, worker_id: str, error: str, running_before: float = 0.0, queued_before: float = 0.0
+    ) -> int:
+        """Fail jobs a previous run of this worker left unfinished; return how many."""
+
+
+class InMemoryJobStore:
+    """Single-process job store; jobs are lost on restart."""
+
+    def __init__(self) -> None:
+        """Start with no jobs."""
+        self._jobs: dict[str, dict[str, Any]] = {}
+        self._lock = Lock()
+
+    def create(self, job: dict[str, Any]) -> None:
+        """Store a new job record."""
+        with self._lock:
+            self._jobs[job["job_id"]] = dict(job)
+
+    def update(self, job_id: str, **updates: Any) -> None:
+        """Merge updates into a job; unknown ids are ignored."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(updates)
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        """Return a copy of the job, or None if it is unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def evict_finished(self, older_than: float) -> int:
+        """Delete finished jobs last updated before older_than; return how many."""
+        with self._lock:
+            expired = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job["status"] in FINISHED_JOB_STATUSES and job["updated_at"] < older_than
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+    def references_video(self, video_url: str) -> bool:
+        """Return True if any stored job points at video_url."""
+        with self._lock:
+            return any(job.get("video_url") == video_url for job in self._jobs.values())
+
+    def fail_unfinished(
+        self, worker_id: str, error: str, running_before: float = 0.0, queued_before: float = 0.0
+    ) -> int:
+        """Return 0; nothing survives a restart in memory, so there is never anything to fail."""
+        return 0
+
+
+class SQLiteJobStore:
+    """Job store in a WAL-mode SQLite file, so jobs survive restarts and are visible to every worker."""
+
+    def __init__(self, path: Path) -> None:
+        """Open or create the jobs table at path."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA busy_timeout=5000")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                worker_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_status_updated_at ON jobs (status, updated_at)"
+        )
+
+    def create(self, job: dict[str, Any]) -> None:
+        """Store a new job record."""
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO jobs (job_id, status, worker_id, payload, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (job["job_id"], job["status"], job["worker_id"], json.dumps(job), job["updated_at"]),
+            )
+
+    def update(self, job_id: str, **updates: Any) -> None:
+        """Merge updates into a job; unknown ids are ignored."""
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._connection.execute(
+                    "SELECT payload FROM jobs WHERE job_id = ?", (job_id,)
+                ).fetchone()
+                if row is not None:
+                    job = json.loads(row[0])
+                    job.update(updates)
+                    self._connection.execute(
+                        "UPDATE jobs SET status = ?, payload = ?, updated_at = ? WHERE job_id = ?",
+                        (job["status"], json.dumps(job), job["updated_at"], job_id),
+                    )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        """Return a copy of the job, or None if it is unknown."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT payload FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def evict_finished(self, older_than: float) -> int:
+        """Delete finished jobs last updated before older_than; return how many."""
+        with self._lock:
+            cursor = self._connection.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (*FINISHED_JOB_STATUSES, older_than),
+            )
+        return cursor.rowcount
+
+    def references_video(self, video_url: str) -> bool:
+        """Return True if any stored job points at video_url."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM jobs WHERE json_extract(payload, '$.video_url') = ? LIMIT 1", (video_url,)
+            ).fetchone()
+        return row is not None
+
+    def fail_unfinished(
+        self, worker_id: str, error: str, running_before: float = 0.0, queued_before: float = 0.0
+    ) -> int:
+        """Fail this worker's unfinished jobs, plus any owner's jobs that stopped updating long ago.
+
+        The second part catches jobs left behind by a worker whose id changed, e.g. a recreated container.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                """
+                SELECT job_id FROM jobs
+                WHERE status NOT IN (?, ?)
+                  AND (worker_id = ? OR (status = 'running' AND updated_at < ?) OR updated_at < ?)
+                """,
+                (*FINISHED_JOB_STATUSES, worker_id, running_before, queued_before),
+            ).fetchall()
+        for (job_id,) in rows:
+            self.update(job_id, status="failed", error=error, updated_at=time.time())
+        return len(rows)
+
+
+def _create_job_store() -> JobStore:
+    if JOB_STORE_BACKEND == "memory":
+        return InMemoryJobStore()
+    if JOB_STORE_BACKEND == "sqlite":
+        return SQLiteJobStore(JOB_STORE_PATH)
+    raise RuntimeError(f"Unsupported MANIM_JOB_STORE backend: {JOB_STORE_BACKEND}")
+
+
+_job_store = _create_job_store()
+_last_job_eviction = 0.0
+_job_eviction_lock = Lock()
+_render_cache_lock = Lock()
+# In-memory render cache index and the published bytes it covers. Guarded by _render_cache_lock.
+_render_cache_entries: OrderedDict[str, dict[str, Any]] | None = None
+_render_cache_bytes = 0
+
+# Jobs waiting for a render slot, oldest first. Guarded by _render_queue_ready.
+_render_queue: deque[tuple[str, Callable[[], None]]] = deque()
+_render_queue_ready = Condition()
+_render_workers: list[Thread] = []
+# Long-poll and SSE requests waiting on a job, woken from render threads through their event loop.
+_job_listeners: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+_job_listeners_lock = Lock()
 _langfuse_configured = False
 
 
@@ -234,6 +461,22 @@ def _build_manim_command(source_file: Path, scene_name: str, media_dir: Path) ->
     ]
 
 
+def _resolve_render_backend() -> str:
+    if RENDER_BACKEND in {"cli", "forkserver"}:
+        return RENDER_BACKEND
+    if RENDER_BACKEND != "auto":
+        raise RuntimeError(f"Unsupported MANIM_RENDER_BACKEND: {RENDER_BACKEND}")
+
+    # Custom quality flags and hosts without manim or forkserver support keep using the CLI.
+    if (
+        QUALITY_FLAG in render_pool.QUALITY_FLAG_TO_CONFIG
+        and render_pool.forkserver_supported()
+        and util.find_spec("manim") is not None
+    ):
+        return "forkserver"
+    return "cli"
+
+
 def _find_video_path(media_dir: Path, scene_name: str) -> Path | None:
     matches = sorted(media_dir.glob(f"videos/**/{scene_name}.mp4"))
     if matches:
@@ -256,22 +499,33 @@ def _render_video(code: str, scene_name: str, request_id: str) -> Path:
     media_dir = request_dir / "media"
     media_dir.mkdir(parents=True, exist_ok=True)
 
-    command = _build_manim_command(source_file, scene_name, media_dir)
-    logger.info("worker: running command=%s", " ".join(command))
-
-    try:
-        subprocess.run(
-            command,
-            check=True,
-            capture_output=True,
-            text=True,
-            timeout=RENDER_TIMEOUT_SECONDS,
+    if _resolve_render_backend() == "forkserver":
+        logger.info("worker: rendering scene_name=%s in forked render process", scene_name)
+        render_pool.run_render(
+            code,
+            source_file,
+            scene_name,
+            media_dir,
+            QUALITY_FLAG,
+            RENDER_TIMEOUT_SECONDS,
         )
-    except subprocess.TimeoutExpired as exc:
-        raise RuntimeError(f"Manim render timed out after {RENDER_TIMEOUT_SECONDS} seconds") from exc
-    except subprocess.CalledProcessError as exc:
-        error_output = (exc.stderr or exc.stdout or str(exc)).strip()
-        raise RuntimeError(f"Manim failed: {error_output}") from exc
+    else:
+        command = _build_manim_command(source_file, scene_name, media_dir)
+        logger.info("worker: running command=%s", " ".join(command))
+
+        try:
+            subprocess.run(
+                command,
+                check=True,
+                capture_output=True,
+                text=True,
+                timeout=RENDER_TIMEOUT_SECONDS,
+            )
+        except subprocess.TimeoutExpired as exc:
+            raise RuntimeError(f"Manim render timed out after {RENDER_TIMEOUT_SECONDS} seconds") from exc
+        except subprocess.CalledProcessError as exc:
+            error_output = (exc.stderr or exc.stdout or str(exc)).strip()
+            raise RuntimeError(f"Manim failed: {error_output}") from exc
 
     video_path = _find_video_path(media_dir, scene_name)
     if video_path is None or not video_path.exists():
@@ -279,11 +533,14 @@ def _render_video(code: str, scene_name: str, request_id: str) -> Path:
     return video_path
 
 
+def _published_path(scene_name: str, request_id: str, today: str) -> Path:
+    return PUBLISHED_DIR / today / scene_name / f"{request_id}.mp4"
+
+
 def _upload_video(video_path: Path, scene_name: str, request_id: str, today: str) -> str:
     if os.getenv("SKIP_UPLOAD") == "1":
-        target_dir = PUBLISHED_DIR / today / scene_name
-        target_dir.mkdir(parents=True, exist_ok=True)
-        published_path = target_dir / f"{request_id}.mp4"
+        published_path = _published_path(scene_name, request_id, today)
+        published_path.parent.mkdir(parents=True, exist_ok=True)
         relative_path = published_path.relative_to(PUBLISHED_DIR).as_posix()
         shutil.copy2(video_path, published_path)
         return f"{_local_published_base_url()}/{relative_path}"
@@ -326,9 +583,204 @@ def _upload_video(video_path: Path, scene_name: str, request_id: str, today: str
     return f"https://pub-{account_id}.r2.dev/{key}"
 
 
+@lru_cache(maxsize=1)
+def _manim_version() -> str:
+    try:
+        return metadata.version("manim")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _normalize_code(code: str) -> str:
+    lines = code.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def _render_cache_key(code: str, scene_name: str) -> str:
+    digest = hashlib.sha256()
+    for part in (_normalize_code(code), scene_name, QUALITY_FLAG, _manim_version()):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _render_cache_entry_path(cache_key: str) -> Path:
+    return RENDER_CACHE_DIR / f"{cache_key}.json"
+
+
+def _read_render_cache_entry(entry_path: Path) -> dict[str, Any] | None:
+    try:
+        return json.loads(entry_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _render_cache_index() -> OrderedDict[str, dict[str, Any]]:
+    # Callers hold _render_cache_lock. The index directory is scanned once per process; after that the
+    # entries and their total size are kept in memory, least recently used first.
+    global _render_cache_entries, _render_cache_bytes
+    if _render_cache_entries is None:
+        loaded: list[tuple[float, str, dict[str, Any]]] = []
+        for entry_path in RENDER_CACHE_DIR.glob("*.json"):
+            entry = _read_render_cache_entry(entry_path)
+            if entry is None:
+                entry_path.unlink(missing_ok=True)
+                continue
+            loaded.append((entry_path.stat().st_mtime, entry_path.stem, entry))
+        _render_cache_entries = OrderedDict((cache_key, entry) for _, cache_key, entry in sorted(loaded))
+        _render_cache_bytes = sum(entry.get("size_bytes", 0) for entry in _render_cache_entries.values())
+    return _render_cache_entries
+
+
+def _index_render_cache_entry(cache_key: str, entry: dict[str, Any]) -> None:
+    # Callers hold _render_cache_lock.
+    global _render_cache_bytes
+    index = _render_cache_index()
+    previous = index.pop(cache_key, None)
+    if previous is not None:
+        _render_cache_bytes -= previous.get("size_bytes", 0)
+    index[cache_key] = entry
+    _render_cache_bytes += entry.get("size_bytes", 0)
+
+
+def _drop_render_cache_entry(cache_key: str) -> bool:
+    """Delete an entry and its published video, unless a job the store still holds returns that video.
+
+    Callers hold _render_cache_lock. Returns False when the entry was kept for a live job.
+    """
+    global _render_cache_bytes
+    index = _render_cache_index()
+    entry = index.get(cache_key) or _read_render_cache_entry(_render_cache_entry_path(cache_key)) or {}
+    video_url = entry.get("video_url")
+    if video_url and _job_store.references_video(video_url):
+        return False
+
+    _render_cache_entry_path(cache_key).unlink(missing_ok=True)
+    if index.pop(cache_key, None) is not None:
+        _render_cache_bytes -= entry.get("size_bytes", 0)
+    published_path = entry.get("published_path")
+    if published_path:
+        Path(published_path).unlink(missing_ok=True)
+    return True
+
+
+def _lookup_render_cache(cache_key: str) -> str | None:
+    if not RENDER_CACHE_ENABLED:
+        return None
+
+    entry_path = _render_cache_entry_path(cache_key)
+    with _render_cache_lock:
+        entry = _read_render_cache_entry(entry_path)
+        if entry is None:
+            return None
+
+        expired = time.time() - entry.get("created_at", 0.0) > RENDER_CACHE_TTL_SECONDS
+        published_path = entry.get("published_path")
+        if expired or (published_path and not Path(published_path).exists()):
+            _drop_render_cache_entry(cache_key)
+            return None
+
+        # Touch the entry so LRU order survives a restart; entries written by another worker join the index here.
+        os.utime(entry_path)
+        index = _render_cache_index()
+        if cache_key in index:
+            index.move_to_end(cache_key)
+        else:
+            _index_render_cache_entry(cache_key, entry)
+        return entry.get("video_url") or None
+
+
+def _store_render_cache(cache_key: str, video_url: str, published_path: Path | None) -> None:
+    if not RENDER_CACHE_ENABLED:
+        return
+
+    entry = {
+        "video_url": video_url,
+        "published_path": str(published_path) if published_path else "",
+        "size_bytes": published_path.stat().st_size if published_path else 0,
+        "created_at": time.time(),
+    }
+    entry_path = _render_cache_entry_path(cache_key)
+    with _render_cache_lock:
+        try:
+            temp_path = entry_path.with_suffix(".tmp")
+            temp_path.write_text(json.dumps(entry), encoding="utf-8")
+            temp_path.replace(entry_path)
+            _index_render_cache_entry(cache_key, entry)
+            _evict_render_cache(keep=cache_key)
+        except OSError:
+            logger.warning("worker: failed to update render cache key=%s", cache_key, exc_info=True)
+
+
+def _evict_render_cache(keep: str) -> None:
+    """Drop expired entries, then least recently used videos until the cache fits RENDER_CACHE_MAX_BYTES.
+
+    Callers hold _render_cache_lock. `keep` is the entry just stored, whose job has not published its URL yet.
+    """
+    now = time.time()
+    for cache_key, entry in list(_render_cache_index().items()):
+        if cache_key == keep:
+            continue
+        expired = now - entry.get("created_at", 0.0) > RENDER_CACHE_TTL_SECONDS
+        over_budget = _render_cache_bytes > RENDER_CACHE_MAX_BYTES and entry.get("size_bytes", 0) > 0
+        if expired or over_budget:
+            _drop_render_cache_entry(cache_key)
+
+
 def _update_job(job_id: str, **updates: Any) -> None:
-    with _jobs_lock:
-        _jobs[job_id].update(updates)
+    _job_store.update(job_id, updated_at=time.time(), **updates)
+    _notify_job_listeners(job_id)
+
+
+def _notify_job_listeners(job_id: str) -> None:
+    with _job_listeners_lock:
+        listeners = list(_job_listeners.get(job_id, ()))
+    for loop, event in listeners:
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            # The request's event loop already closed; its listener is about to unregister.
+            continue
+
+
+@contextmanager
+def _job_listener(job_id: str) -> Iterator[asyncio.Event]:
+    event = asyncio.Event()
+    listener = (asyncio.get_running_loop(), event)
+    with _job_listeners_lock:
+        _job_listeners.setdefault(job_id, set()).add(listener)
+    try:
+        yield event
+    finally:
+        with _job_listeners_lock:
+            listeners = _job_listeners.get(job_id)
+            if listeners is not None:
+                listeners.discard(listener)
+                if not listeners:
+                    del _job_listeners[job_id]
+
+
+async def _wait_for_job_change(changed: asyncio.Event, timeout: float) -> None:
+    # Listeners only hear about updates made by this process, so waits are sliced and callers
+    # re-read the store, which also picks up jobs finished by another replica sharing it.
+    try:
+        await asyncio.wait_for(changed.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    changed.clear()
+
+
+def _maybe_evict_finished_jobs() -> None:
+    global _last_job_eviction
+    now = time.time()
+    with _job_eviction_lock:
+        if now - _last_job_eviction < JOB_EVICTION_INTERVAL_SECONDS:
+            return
+        _last_job_eviction = now
+
+    evicted = _job_store.evict_finished(now - JOB_TTL_SECONDS)
+    if evicted:
+        logger.info("worker: evicted %s finished jobs older than %ss", evicted, JOB_TTL_SECONDS)
 
 
 def _run_job(
@@ -372,6 +824,13 @@ def _run_job(
                     if upload_observation is not None:
                         upload_observation.update(output={"video_url": video_url})
 
+                published_path = _published_path(scene_name, request_id, today)
+                _store_render_cache(
+                    _render_cache_key(code, scene_name),
+                    video_url,
+                    published_path if published_path.exists() else None,
+                )
+
                 _update_job(
                     job_id,
                     status="succeeded",
@@ -391,38 +850,206 @@ def _run_job(
                     shutil.rmtree(request_dir, ignore_errors=True)
 
 
+@app.on_event("startup")
+def warm_render_pool() -> None:
+    """Start the forkserver render pool at startup when that backend is selected."""
+    if _resolve_render_backend() == "forkserver":
+        render_pool.warm_render_pool()
+        logger.info("worker: forkserver render pool started preload=%s", render_pool.PRELOAD_MODULES)
+
+
+@app.on_event("startup")
+def recover_interrupted_jobs() -> None:
+    """Fail jobs that a previous run of this worker left queued or running."""
+    # Jobs this worker owned before a restart will never finish; failing them lets pollers stop waiting.
+    # Stale rows of other worker ids are failed too, so eviction can clean them up.
+    now = time.time()
+    interrupted = _job_store.fail_unfinished(
+        WORKER_ID,
+        "Render worker restarted before the job finished",
+        running_before=now - STALE_RUNNING_JOB_SECONDS,
+        queued_before=now - JOB_TTL_SECONDS,
+    )
+    if interrupted:
+        logger.warning("worker: marked %s interrupted jobs as failed worker_id=%s", interrupted, WORKER_ID)
+
+
+def _render_worker_loop() -> None:
+    while True:
+        with _render_queue_ready:
+            while not _render_queue:
+                _render_queue_ready.wait()
+            job_id, task = _render_queue.popleft()
+
+        try:
+            task()
+        except Exception:
+            logger.exception("worker: render task crashed job_id=%s", job_id)
+
+
+def _ensure_render_workers() -> None:
+    with _render_queue_ready:
+        while len(_render_workers) < MAX_CONCURRENT_RENDERS:
+            worker = Thread(
+                target=_render_worker_loop,
+                name=f"manim-render-{len(_render_workers)}",
+                daemon=True,
+            )
+            _render_workers.append(worker)
+            worker.start()
+
+
+def _queue_position(job_id: str) -> tuple[int, int]:
+    """Return the 1-based queue position of a job (0 once it left the queue) and the queue depth."""
+    with _render_queue_ready:
+        depth = len(_render_queue)
+        for index, (queued_job_id, _) in enumerate(_render_queue, start=1):
+            if queued_job_id == job_id:
+                return index, depth
+    return 0, depth
+
+
 @app.get("/health")
-def health() -> dict[str, str]:
-    return {"status": "ok", "quality": QUALITY_FLAG}
+def health() -> dict[str, Any]:
+    """Report render quality and queue depth."""
+    with _render_queue_ready:
+        queue_depth = len(_render_queue)
+    return {
+        "status": "ok",
+        "quality": QUALITY_FLAG,
+        "queue_depth": queue_depth,
+        "max_queued_jobs": MAX_QUEUED_JOBS,
+        "max_concurrent_renders": MAX_CONCURRENT_RENDERS,
+    }
 
 
 @app.post("/jobs")
-def create_job(payload: dict[str, Any]) -> dict[str, str]:
+def create_job(payload: dict[str, Any]) -> dict[str, Any]:
+    """Queue a render job, or finish it at once from the render cache."""
     code, scene_name, request_id, trace_id, parent_span_id = _validate_payload(payload)
     job_id = str(uuid4())
+    _maybe_evict_finished_jobs()
+
+    cached_video_url = _lookup_render_cache(_render_cache_key(code, scene_name))
+    if cached_video_url:
+        logger.info("worker: render cache hit job_id=%s scene_name=%s", job_id, scene_name)
+        now = time.time()
+        _job_store.create(
+            {
+                "job_id": job_id,
+                "status": "succeeded",
+                "scene_name": scene_name,
+                "request_id": request_id,
+                "video_url": cached_video_url,
+                "error": "",
+                "cache_hit": True,
+                "worker_id": WORKER_ID,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        return {"job_id": job_id, "status": "succeeded", "video_url": cached_video_url, "cache_hit": True}
+
+    _ensure_render_workers()
+
+    with _render_queue_ready:
+        if len(_render_queue) >= MAX_QUEUED_JOBS:
+            logger.warning("worker: render queue full depth=%s, rejecting job", len(_render_queue))
+            raise HTTPException(
+                status_code=429,
+                detail="Render queue is full, retry later",
+                headers={"Retry-After": str(QUEUE_RETRY_AFTER_SECONDS)},
+            )
+
+        now = time.time()
+        _job_store.create(
+            {
+                "job_id": job_id,
+                "status": "queued",
+                "scene_name": scene_name,
+                "request_id": request_id,
+                "video_url": "",
+                "error": "",
+                "cache_hit": False,
+                "worker_id": WORKER_ID,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        _render_queue.append(
+            (
+                job_id,
+                partial(_run_job, job_id, code, scene_name, request_id, trace_id, parent_span_id),
+            )
+        )
+        queue_position = len(_render_queue)
+        _render_queue_ready.notify()
 
-    with _jobs_lock:
-        _jobs[job_id] = {
-            "job_id": job_id,
-            "status": "queued",
-            "scene_name": scene_name,
-            "request_id": request_id,
-            "video_url": "",
-            "error": "",
-        }
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "queue_position": queue_position,
+        "queue_depth": queue_position,
+    }
 
-    Thread(
-        target=_run_job,
-        args=(job_id, code, scene_name, request_id, trace_id, parent_span_id),
-        daemon=True,
-    ).start()
-    return {"job_id": job_id, "status": "queued"}
+
+def _job_snapshot(job_id: str) -> dict[str, Any] | None:
+    # Blocks on the job store and the render queue lock, so async endpoints call it through asyncio.to_thread.
+    job = _job_store.get(job_id)
+    if job is None:
+        return None
+    job["queue_position"], job["queue_depth"] = _queue_position(job_id)
+    return job
 
 
 @app.get("/jobs/{job_id}")
-def get_job(job_id: str) -> dict[str, Any]:
-    with _jobs_lock:
-        job = _jobs.get(job_id)
-        if job is None:
-            raise HTTPException(status_code=404, detail="Job not found")
-        return dict(job)
+async def get_job(job_id: str, wait: float = 0.0) -> dict[str, Any]:
+    """Return a job, long-polling up to wait seconds for it to finish."""
+    deadline = time.monotonic() + min(max(wait, 0.0), MAX_LONG_POLL_SECONDS)
+    with _job_listener(job_id) as changed:
+        job = await asyncio.to_thread(_job_snapshot, job_id)
+        while job is not None and job["status"] not in FINISHED_JOB_STATUSES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await _wait_for_job_change(changed, min(remaining, JOB_RECHECK_SECONDS))
+            job = await asyncio.to_thread(_job_snapshot, job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str) -> StreamingResponse:
+    """Stream job snapshots as server-sent events until the job finishes."""
+    if await asyncio.to_thread(_job_store.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events() -> Any:
+        with _job_listener(job_id) as changed:
+            last_state: tuple[str, int] | None = None
+            last_sent = time.monotonic()
+            while True:
+                job = await asyncio.to_thread(_job_snapshot, job_id)
+                if job is None:
+                    return
+
+                state = (job["status"], job["queue_position"])
+                if state != last_state:
+                    yield f"event: job\ndata: {json.dumps(job)}\n\n"
+                    last_state = state
+                    last_sent = time.monotonic()
+                elif time.monotonic() - last_sent >= SSE_HEARTBEAT_SECONDS:
+                    yield ": keep-alive\n\n"
+                    last_sent = time.monotonic()
+
+                if job["status"] in FINISHED_JOB_STATUSES:
+                    return
+                await _wait_for_job_change(changed, JOB_RECHECK_SECONDS)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
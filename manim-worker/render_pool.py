@@ -0,0 +1,130 @@
+"""In-process Manim rendering in children forked from a pre-imported forkserver."""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import traceback
+from multiprocessing import forkserver
+from multiprocessing.connection import Connection
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+# Imported once by the forkserver; every render child is forked with these already loaded,
+# so no job pays interpreter startup, `import manim`, cairo/pango init or voiceover imports.
+PRELOAD_MODULES = [
+    "manim",
+    "manim_voiceover",
+    "manim_voiceover.services.gtts",
+    "render_pool",
+]
+QUALITY_FLAG_TO_CONFIG = {
+    "-ql": "low_quality",
+    "-qm": "medium_quality",
+    "-qh": "high_quality",
+    "-qp": "production_quality",
+    "-qk": "fourk_quality",
+}
+
+_context: Any = None
+_context_lock = Lock()
+
+
+def forkserver_supported() -> bool:
+    """Return whether this platform offers the forkserver start method."""
+    return "forkserver" in multiprocessing.get_all_start_methods()
+
+
+def get_render_context() -> Any:
+    """Return the shared forkserver context, registering the preloaded modules on first use."""
+    global _context
+    with _context_lock:
+        if _context is None:
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(PRELOAD_MODULES)
+            _context = context
+        return _context
+
+
+def warm_render_pool() -> None:
+    """Start the forkserver now so the first render does not pay for the preload imports."""
+    get_render_context()
+    forkserver.ensure_running()
+
+
+def render_scene(
+    code: str,
+    source_file: str,
+    scene_name: str,
+    media_dir: str,
+    quality: str,
+    connection: Connection,
+) -> None:
+    """Render `scene_name` from `code` in this forked child and report ("ok"|"error", detail) on `connection`."""
+    try:
+        os.chdir(Path(source_file).parent)
+        namespace: dict[str, Any] = {"__name__": "__animai_scene__", "__file__": source_file}
+        exec(compile(code, source_file, "exec"), namespace)
+        scene_class = namespace.get(scene_name)
+        if not isinstance(scene_class, type):
+            raise RuntimeError(f"Scene class {scene_name} was not defined by the submitted code")
+
+        from manim import tempconfig
+
+        with tempconfig(
+            {
+                "quality": quality,
+                "media_dir": media_dir,
+                "input_file": source_file,
+                "disable_caching": True,
+            }
+        ):
+            scene_class().render()
+        connection.send(("ok", ""))
+    except BaseException:
+        connection.send(("error", traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+def run_render(
+    code: str,
+    source_file: Path,
+    scene_name: str,
+    media_dir: Path,
+    quality_flag: str,
+    timeout_seconds: int,
+) -> None:
+    """Render in a forked child, raising RuntimeError on scene errors or after `timeout_seconds`."""
+    context = get_render_context()
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=render_scene,
+        args=(
+            code,
+            str(source_file),
+            scene_name,
+            str(media_dir),
+            QUALITY_FLAG_TO_CONFIG[quality_flag],
+            sender,
+        ),
+        daemon=True,
+    )
+    process.start()
+    sender.close()
+
+    try:
+        if not receiver.poll(timeout_seconds):
+            process.kill()
+            process.join()
+            raise RuntimeError(f"Manim render timed out after {timeout_seconds} seconds")
+        status, detail = receiver.recv()
+    except EOFError:
+        process.join()
+        raise RuntimeError(f"Manim failed: render process exited with code {process.exitcode}") from None
+    finally:
+        receiver.close()
+
+    process.join()
+    if status != "ok":
+        raise RuntimeError(f"Manim failed: {detail.strip()}")
@@ -67,12 +67,7 @@ STYLE FOR non_animation_reply:
 """.strip()
 
 
-def analyze_user_prompt(state: State) -> dict:
-    prompt = state["prompt"]
-    response = llm.with_structured_output(PromptClassification).invoke(
-        [("system", SYSTEM_PROMPT), ("human", prompt)],
-    )
-
+def _classification_update(response: PromptClassification) -> dict:
     ai_content = (
         "Animation request accepted."
         if response["animation"]
@@ -85,5 +80,22 @@ def analyze_user_prompt(state: State) -> dict:
     }
 
 
+def analyze_user_prompt(state: State) -> dict:
+    prompt = state["prompt"]
+    response = llm.with_structured_output(PromptClassification).invoke(
+        [("system", SYSTEM_PROMPT), ("human", prompt)],
+    )
+    return _classification_update(response)
+
+
+async def aanalyze_user_prompt(state: State) -> dict:
+    """Async `analyze_user_prompt` for the graph's ainvoke path."""
+    prompt = state["prompt"]
+    response = await llm.with_structured_output(PromptClassification).ainvoke(
+        [("system", SYSTEM_PROMPT), ("human", prompt)],
+    )
+    return _classification_update(response)
+
+
 def animation_required(state: State) -> Literal["route_prompt_for_grounding", "__end__"]:
     return "route_prompt_for_grounding" if state.get("animation", False) else END
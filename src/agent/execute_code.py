@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import time
+from typing import Any
 from uuid import uuid4
 
+import httpx
 import requests
 
 from agent.graph_state import State
+from agent.http_clients import get_async_client, get_http_session
 from observability.langfuse import start_langfuse_observation
 
 
@@ -18,18 +22,105 @@ def _poll_interval_seconds() -> int:
     return max(1, int(os.getenv("MANIM_WORKER_POLL_SECONDS", "5")))
 
 
+def _long_poll_seconds() -> int:
+    return max(0, int(os.getenv("MANIM_WORKER_LONG_POLL_SECONDS", "30")))
+
+
 def _max_wait_seconds() -> int:
     return max(_poll_interval_seconds(), int(os.getenv("MANIM_WORKER_MAX_WAIT_SECONDS", "900")))
 
 
+def _render_failure(state: State, message: str, observation: Any | None = None, **output: Any) -> dict:
+    if observation is not None and output:
+        observation.update(level="ERROR", status_message=message, output=output)
+    elif observation is not None:
+        observation.update(level="ERROR", status_message=message)
+    return {
+        "sandbox_error": message,
+        "video_url": "",
+        "render_failures": state.get("render_failures", 0) + 1,
+    }
+
+
+def _render_success(video_url: str, observation: Any | None = None, **output: Any) -> dict:
+    if observation is not None:
+        observation.update(output={**output, "video_url": video_url})
+    return {
+        "sandbox_error": "No error",
+        "video_url": video_url,
+        "render_failures": 0,
+    }
+
+
+def _job_payload(state: State, request_id: str, observation: Any | None) -> dict:
+    return {
+        "code": state["code"],
+        "scene_name": state["scene_name"],
+        "request_id": request_id,
+        "trace_id": observation.trace_id if observation is not None else "",
+        "parent_span_id": observation.id if observation is not None else "",
+    }
+
+
+def _submitted_result(state: State, submit_data: dict, observation: Any | None) -> dict | None:
+    job_id = (submit_data.get("job_id") or "").strip()
+    if not job_id:
+        return _render_failure(state, "Render worker did not return a job_id", observation)
+
+    if submit_data.get("status") == "succeeded" and submit_data.get("video_url"):
+        # The worker served this scene from its render cache without queueing a render.
+        return _render_success(
+            submit_data["video_url"],
+            observation,
+            job_id=job_id,
+            status="succeeded",
+            cache_hit=True,
+        )
+    return None
+
+
+def _finished_job_result(state: State, job_id: str, status_data: dict, observation: Any | None) -> dict | None:
+    status = (status_data.get("status") or "").strip()
+    if status == "succeeded":
+        return _render_success(status_data.get("video_url", ""), observation, job_id=job_id, status=status)
+    if status == "failed":
+        error_message = status_data.get("error", "Render job failed")
+        return _render_failure(state, error_message, observation, job_id=job_id, status=status)
+    return None
+
+
+def _poll_wait_seconds(deadline: float, long_poll_seconds: int) -> int:
+    return min(long_poll_seconds, max(0, int(deadline - time.monotonic())))
+
+
+def _should_sleep_between_polls(wait_seconds: int, request_started: float) -> bool:
+    # Workers without long-poll support answer immediately; fall back to interval polling.
+    return not wait_seconds or time.monotonic() - request_started < wait_seconds
+
+
+def _queue_full_delay(response: requests.Response | httpx.Response, deadline: float) -> float | None:
+    """Seconds to wait before resubmitting a job the worker turned away as queue-full, or None to give up."""
+    if response.status_code != 429:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+    try:
+        retry_after = float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        retry_after = _poll_interval_seconds()
+    return min(max(1.0, retry_after), remaining)
+
+
+def _timeout_result(state: State, job_id: str, observation: Any | None) -> dict:
+    timeout_message = f"Render job {job_id} timed out after {_max_wait_seconds()} seconds"
+    return _render_failure(state, timeout_message, observation, job_id=job_id)
+
+
 def execute_code(state: State) -> dict:
     worker_url = _worker_url()
     if not worker_url:
-        return {
-            "sandbox_error": "MANIM_WORKER_URL is not configured",
-            "video_url": "",
-            "render_failures": state.get("render_failures", 0) + 1,
-        }
+        return _render_failure(state, "MANIM_WORKER_URL is not configured")
 
     request_id = str(uuid4())
     with start_langfuse_observation(
@@ -38,94 +129,115 @@ def execute_code(state: State) -> dict:
         input={"scene_name": state["scene_name"], "request_id": request_id},
         metadata={"worker_url": worker_url},
     ) as observation:
-        trace_id = observation.trace_id if observation is not None else ""
-        parent_span_id = observation.id if observation is not None else ""
-        payload = {
-            "code": state["code"],
-            "scene_name": state["scene_name"],
-            "request_id": request_id,
-            "trace_id": trace_id,
-            "parent_span_id": parent_span_id,
-        }
-
+        deadline = time.monotonic() + _max_wait_seconds()
         try:
-            submit_response = requests.post(
-                f"{worker_url}/jobs",
-                json=payload,
-                timeout=30,
-            )
+            # A full worker queue is backpressure, not a broken scene: wait and resubmit the same code.
+            while True:
+                submit_response = get_http_session().post(
+                    f"{worker_url}/jobs",
+                    json=_job_payload(state, request_id, observation),
+                    timeout=30,
+                )
+                delay = _queue_full_delay(submit_response, deadline)
+                if delay is None:
+                    break
+                time.sleep(delay)
             submit_response.raise_for_status()
             submit_data = submit_response.json()
         except requests.RequestException as exc:
-            if observation is not None:
-                observation.update(level="ERROR", status_message=str(exc))
-            return {
-                "sandbox_error": f"Failed to submit render job: {exc}",
-                "video_url": "",
-                "render_failures": state.get("render_failures", 0) + 1,
-            }
-
-        job_id = submit_data.get("job_id", "").strip()
-        if not job_id:
-            if observation is not None:
-                observation.update(level="ERROR", status_message="Render worker did not return a job_id")
-            return {
-                "sandbox_error": "Render worker did not return a job_id",
-                "video_url": "",
-                "render_failures": state.get("render_failures", 0) + 1,
-            }
+            return _render_failure(state, f"Failed to submit render job: {exc}", observation)
+
+        submitted_result = _submitted_result(state, submit_data, observation)
+        if submitted_result is not None:
+            return submitted_result
 
+        job_id = submit_data["job_id"].strip()
         poll_interval = _poll_interval_seconds()
-        deadline = time.monotonic() + _max_wait_seconds()
+        long_poll_seconds = _long_poll_seconds()
 
         while time.monotonic() < deadline:
+            wait_seconds = _poll_wait_seconds(deadline, long_poll_seconds)
+            request_started = time.monotonic()
             try:
-                status_response = requests.get(
+                # With wait > 0 the worker holds the request open until the job finishes.
+                status_response = get_http_session().get(
                     f"{worker_url}/jobs/{job_id}",
-                    timeout=30,
+                    params={"wait": wait_seconds} if wait_seconds else None,
+                    timeout=30 + wait_seconds,
                 )
                 status_response.raise_for_status()
                 status_data = status_response.json()
             except requests.RequestException as exc:
-                if observation is not None:
-                    observation.update(level="ERROR", status_message=str(exc))
-                return {
-                    "sandbox_error": f"Failed to poll render job {job_id}: {exc}",
-                    "video_url": "",
-                    "render_failures": state.get("render_failures", 0) + 1,
-                }
-
-            status = (status_data.get("status") or "").strip()
-            if status == "succeeded":
-                video_url = status_data.get("video_url", "")
-                if observation is not None:
-                    observation.update(output={"job_id": job_id, "status": status, "video_url": video_url})
-                return {
-                    "sandbox_error": "No error",
-                    "video_url": video_url,
-                    "render_failures": 0,
-                }
-            if status == "failed":
-                error_message = status_data.get("error", "Render job failed")
-                if observation is not None:
-                    observation.update(
-                        level="ERROR",
-                        status_message=error_message,
-                        output={"job_id": job_id, "status": status},
-                    )
-                return {
-                    "sandbox_error": error_message,
-                    "video_url": "",
-                    "render_failures": state.get("render_failures", 0) + 1,
-                }
-
-            time.sleep(poll_interval)
-
-        timeout_message = f"Render job {job_id} timed out after {_max_wait_seconds()} seconds"
-        if observation is not None:
-            observation.update(level="ERROR", status_message=timeout_message, output={"job_id": job_id})
-        return {
-            "sandbox_error": timeout_message,
-            "video_url": "",
-            "render_failures": state.get("render_failures", 0) + 1,
-        }
+                return _render_failure(state, f"Failed to poll render job {job_id}: {exc}", observation)
+
+            finished_result = _finished_job_result(state, job_id, status_data, observation)
+            if finished_result is not None:
+                return finished_result
+
+            if _should_sleep_between_polls(wait_seconds, request_started):
+                time.sleep(poll_interval)
+
+        return _timeout_result(state, job_id, observation)
+
+
+async def aexecute_code(state: State) -> dict:
+    """Async `execute_code`: submits and waits on the render job without blocking the event loop."""
+    worker_url = _worker_url()
+    if not worker_url:
+        return _render_failure(state, "MANIM_WORKER_URL is not configured")
+
+    request_id = str(uuid4())
+    with start_langfuse_observation(
+        name="execute-code",
+        as_type="tool",
+        input={"scene_name": state["scene_name"], "request_id": request_id},
+        metadata={"worker_url": worker_url},
+    ) as observation:
+        client = get_async_client()
+        deadline = time.monotonic() + _max_wait_seconds()
+        try:
+            while True:
+                submit_response = await client.post(
+                    f"{worker_url}/jobs",
+                    json=_job_payload(state, request_id, observation),
+                    timeout=30,
+                )
+                delay = _queue_full_delay(submit_response, deadline)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+            submit_response.raise_for_status()
+            submit_data = submit_response.json()
+        except httpx.HTTPError as exc:
+            return _render_failure(state, f"Failed to submit render job: {exc}", observation)
+
+        submitted_result = _submitted_result(state, submit_data, observation)
+        if submitted_result is not None:
+            return submitted_result
+
+        job_id = submit_data["job_id"].strip()
+        poll_interval = _poll_interval_seconds()
+        long_poll_seconds = _long_poll_seconds()
+
+        while time.monotonic() < deadline:
+            wait_seconds = _poll_wait_seconds(deadline, long_poll_seconds)
+            request_started = time.monotonic()
+            try:
+                status_response = await client.get(
+                    f"{worker_url}/jobs/{job_id}",
+                    params={"wait": wait_seconds} if wait_seconds else None,
+                    timeout=30 + wait_seconds,
+                )
+                status_response.raise_for_status()
+                status_data = status_response.json()
+            except httpx.HTTPError as exc:
+                return _render_failure(state, f"Failed to poll render job {job_id}: {exc}", observation)
+
+            finished_result = _finished_job_result(state, job_id, status_data, observation)
+            if finished_result is not None:
+                return finished_result
+
+            if _should_sleep_between_polls(wait_seconds, request_started):
+                await asyncio.sleep(poll_interval)
+
+        return _timeout_result(state, job_id, observation)
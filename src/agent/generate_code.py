@@ -172,46 +172,80 @@ def _validate_generated_code(code: str, scene_name: str) -> list[str]:
     return errors
 
 
+def _outline_messages(state: State) -> list:
+    return [("system", OUTLINE_PROMPT), ("human", _outline_payload(state))]
+
+
+def _code_messages(state: State) -> list:
+    language = state.get("language", "en")
+    language_name = get_language_name(language)
+    return [
+        ("system", CODE_PROMPT.format(language=language, language_name=language_name)),
+        ("human", _code_payload(state)),
+    ]
+
+
+def _fix_messages(state: State, code: str, scene_name: str, validation_errors: list[str]) -> list:
+    return [
+        ("system", FIX_PROMPT),
+        (
+            "human",
+            json.dumps(
+                {
+                    "errors": validation_errors,
+                    "code": code,
+                    "scene_name": scene_name,
+                    "code_outline": state.get("code_outline", {}),
+                    "scene_spec": state.get("scene_spec", {}),
+                },
+                ensure_ascii=False,
+            ),
+        ),
+    ]
+
+
+def _code_update(code: str, scene_name: str) -> dict:
+    code = re.sub(r"^```(?:python)?\n|\n```$", "", code.strip(), flags=re.MULTILINE)
+    return {"code": code, "scene_name": scene_name}
+
+
 def generate_code_outline(state: State) -> dict:
-    response = llm.with_structured_output(CodeOutline).invoke(
-        [("system", OUTLINE_PROMPT), ("human", _outline_payload(state))],
-    )
+    response = llm.with_structured_output(CodeOutline).invoke(_outline_messages(state))
+    return {"code_outline": response}
+
+
+async def agenerate_code_outline(state: State) -> dict:
+    """Async `generate_code_outline` for the graph's ainvoke path."""
+    response = await llm.with_structured_output(CodeOutline).ainvoke(_outline_messages(state))
     return {"code_outline": response}
 
 
 def generate_code(state: State) -> dict:
-    language = state.get("language", "en")
-    language_name = get_language_name(language)
-    response = llm.with_structured_output(CodeOutput).invoke(
-        [
-            ("system", CODE_PROMPT.format(language=language, language_name=language_name)),
-            ("human", _code_payload(state)),
-        ],
-    )
+    response = llm.with_structured_output(CodeOutput).invoke(_code_messages(state))
     code = response["code"]
     scene_name = response["scene_name"]
     validation_errors = _validate_generated_code(code, scene_name)
     if validation_errors:
         fix_response = llm.with_structured_output(CodeOutput).invoke(
-            [
-                ("system", FIX_PROMPT),
-                (
-                    "human",
-                    json.dumps(
-                        {
-                            "errors": validation_errors,
-                            "code": code,
-                            "scene_name": scene_name,
-                            "code_outline": state.get("code_outline", {}),
-                            "scene_spec": state.get("scene_spec", {}),
-                        },
-                        ensure_ascii=False,
-                    ),
-                ),
-            ],
+            _fix_messages(state, code, scene_name, validation_errors),
         )
         code = fix_response["code"]
         scene_name = fix_response["scene_name"]
 
-    code = re.sub(r"^```(?:python)?\n|\n```$", "", code.strip(), flags=re.MULTILINE)
-    return {"code": code, "scene_name": scene_name}
+    return _code_update(code, scene_name)
+
+
+async def agenerate_code(state: State) -> dict:
+    """Async `generate_code` for the graph's ainvoke path."""
+    response = await llm.with_structured_output(CodeOutput).ainvoke(_code_messages(state))
+    code = response["code"]
+    scene_name = response["scene_name"]
+    validation_errors = _validate_generated_code(code, scene_name)
+    if validation_errors:
+        fix_response = await llm.with_structured_output(CodeOutput).ainvoke(
+            _fix_messages(state, code, scene_name, validation_errors),
+        )
+        code = fix_response["code"]
+        scene_name = fix_response["scene_name"]
+
+    return _code_update(code, scene_name)
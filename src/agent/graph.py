@@ -1,34 +1,53 @@
+from langchain_core.runnables import RunnableLambda
 from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph import END, START, StateGraph
 from langgraph.types import RetryPolicy
 
-from agent.analyze_user_prompt import analyze_user_prompt, animation_required
-from agent.generate_code import generate_code, generate_code_outline
+from agent.analyze_user_prompt import aanalyze_user_prompt, analyze_user_prompt, animation_required
+from agent.generate_code import agenerate_code, agenerate_code_outline, generate_code, generate_code_outline
 from agent.graph_state import State
-from agent.map_reduce import continue_shots, get_chunks
-from agent.plan_video import plan_video
-from agent.regenerate_code import correct_code, route_code_recovery, simplify_code
-from agent.research_router import route_prompt_for_grounding
-from agent.research_topic import build_topic_brief
-from agent.execute_code import execute_code
+from agent.map_reduce import (
+    aget_chunks,
+    aget_chunks_batch,
+    continue_shots,
+    get_chunks,
+    get_chunks_batch,
+    retrieval_mode,
+)
+from agent.plan_video import aplan_video, plan_video
+from agent.regenerate_code import (
+    acorrect_code,
+    asimplify_code,
+    correct_code,
+    route_code_recovery,
+    simplify_code,
+)
+from agent.research_router import aroute_prompt_for_grounding, route_prompt_for_grounding
+from agent.research_topic import abuild_topic_brief, build_topic_brief
+from agent.execute_code import aexecute_code, execute_code
+
+
+def _node(func, afunc) -> RunnableLambda:
+    # ainvoke (used by /run) awaits afunc on the event loop; invoke keeps the sync node.
+    return RunnableLambda(func, afunc=afunc, name=func.__name__)
 
 
 graph = StateGraph(State)
 
-graph.add_node("analyze_user_prompt", analyze_user_prompt)
-graph.add_node("route_prompt_for_grounding", route_prompt_for_grounding)
-graph.add_node("build_topic_brief", build_topic_brief)
-graph.add_node("plan_video", plan_video)
-graph.add_node(
-    "get_chunks",
-    get_chunks,
-    retry_policy=RetryPolicy(max_attempts=3, initial_interval=1.0, backoff_factor=2.0),
-)
-graph.add_node("generate_code_outline", generate_code_outline)
-graph.add_node("generate_code", generate_code)
-graph.add_node("correct_code", correct_code)
-graph.add_node("simplify_code", simplify_code)
-graph.add_node("execute_code", execute_code)
+graph.add_node("analyze_user_prompt", _node(analyze_user_prompt, aanalyze_user_prompt))
+graph.add_node("route_prompt_for_grounding", _node(route_prompt_for_grounding, aroute_prompt_for_grounding))
+graph.add_node("build_topic_brief", _node(build_topic_brief, abuild_topic_brief))
+graph.add_node("plan_video", _node(plan_video, aplan_video))
+retrieval_retry_policy = RetryPolicy(max_attempts=3, initial_interval=1.0, backoff_factor=2.0)
+if retrieval_mode() == "batch":
+    graph.add_node("get_chunks", _node(get_chunks_batch, aget_chunks_batch), retry_policy=retrieval_retry_policy)
+else:
+    graph.add_node("get_chunks", _node(get_chunks, aget_chunks), retry_policy=retrieval_retry_policy)
+graph.add_node("generate_code_outline", _node(generate_code_outline, agenerate_code_outline))
+graph.add_node("generate_code", _node(generate_code, agenerate_code))
+graph.add_node("correct_code", _node(correct_code, acorrect_code))
+graph.add_node("simplify_code", _node(simplify_code, asimplify_code))
+graph.add_node("execute_code", _node(execute_code, aexecute_code))
 
 
 graph.add_edge(START, "analyze_user_prompt")
@@ -39,7 +58,10 @@ graph.add_conditional_edges(
 )
 graph.add_edge("route_prompt_for_grounding", "build_topic_brief")
 graph.add_edge("build_topic_brief", "plan_video")
-graph.add_conditional_edges("plan_video", continue_shots)
+if retrieval_mode() == "batch":
+    graph.add_edge("plan_video", "get_chunks")
+else:
+    graph.add_conditional_edges("plan_video", continue_shots)
 graph.add_edge("get_chunks", "generate_code_outline")
 graph.add_edge("generate_code_outline", "generate_code")
 graph.add_edge("generate_code", "execute_code")
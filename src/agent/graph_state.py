@@ -6,7 +6,7 @@ import operator
 from typing import Annotated, Literal
 
 from langgraph.graph.message import add_messages
-from typing_extensions import TypedDict
+from typing_extensions import NotRequired, TypedDict
 
 
 class RouteInfo(TypedDict):
@@ -93,13 +93,15 @@ class ShotPlan(TypedDict):
 
 class RetrievedChunk(TypedDict):
     chunk_id: str
+    # Row in the local retrieval corpus; content is resolved from it when the evidence is formatted.
+    chunk_row: int
     source_type: Literal["api", "example"]
     symbol: str
     score_dense: float
     score_lexical: float
     score_rerank: float
-    content: str
-    metadata: dict
+    # Only set for chunks outside the local corpus (chunk_row == -1).
+    content: NotRequired[str]
 
 
 class ShotEvidence(TypedDict):
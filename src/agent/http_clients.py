@@ -0,0 +1,111 @@
+"""Shared keep-alive HTTP clients for agent nodes: a pooled `requests.Session` and an `httpx.AsyncClient` per loop."""
+from __future__ import annotations
+
+import asyncio
+import os
+import weakref
+from functools import lru_cache
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Transient upstream answers worth retrying. POST is not retried here so a render job is never submitted
+# twice; execute_code resubmits a job the worker rejected with 429 itself, after Retry-After.
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+RETRY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = weakref.WeakKeyDictionary()
+
+
+def _pool_hosts() -> int:
+    return max(1, int(os.getenv("HTTP_POOL_HOSTS", "10")))
+
+
+def _pool_maxsize() -> int:
+    return max(1, int(os.getenv("HTTP_POOL_MAXSIZE", "10")))
+
+
+def _retry_total() -> int:
+    return max(0, int(os.getenv("HTTP_RETRY_TOTAL", "2")))
+
+
+def _retry_backoff_seconds() -> float:
+    return max(0.0, float(os.getenv("HTTP_RETRY_BACKOFF_SECONDS", "0.5")))
+
+
+@lru_cache(maxsize=1)
+def get_http_session() -> requests.Session:
+    """Process-wide session; keeps up to HTTP_POOL_MAXSIZE connections alive per host."""
+    retry = Retry(
+        total=_retry_total(),
+        backoff_factor=_retry_backoff_seconds(),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=RETRY_METHODS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=_pool_hosts(), pool_maxsize=_pool_maxsize(), max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class _RetryingTransport(httpx.AsyncBaseTransport):
+    """Retries idempotent requests on connection errors and RETRY_STATUSES with exponential backoff."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, retries: int, backoff_seconds: float) -> None:
+        self._transport = transport
+        self._retries = retries
+        self._backoff_seconds = backoff_seconds
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        retries = self._retries if request.method in RETRY_METHODS else 0
+        attempt = 0
+        while True:
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError:
+                if attempt >= retries:
+                    raise
+            else:
+                if attempt >= retries or response.status_code not in RETRY_STATUSES:
+                    return response
+                await response.aclose()
+            await asyncio.sleep(self._backoff_seconds * 2**attempt)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _new_async_client() -> httpx.AsyncClient:
+    # httpx only limits the pool as a whole, so size it for HTTP_POOL_HOSTS hosts of HTTP_POOL_MAXSIZE each.
+    pool_size = _pool_hosts() * _pool_maxsize()
+    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    transport = _RetryingTransport(
+        httpx.AsyncHTTPTransport(limits=limits),
+        retries=_retry_total(),
+        backoff_seconds=_retry_backoff_seconds(),
+    )
+    return httpx.AsyncClient(transport=transport)
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Client for the running event loop; httpx connections cannot be shared across loops."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _async_clients[loop] = _new_async_client()
+    return client
+
+
+async def aclose_http_clients() -> None:
+    """Close this loop's async client and the shared session; called on API shutdown."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+    if get_http_session.cache_info().currsize:
+        get_http_session().close()
+        get_http_session.cache_clear()
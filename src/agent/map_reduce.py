@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+import os
+
 from typing_extensions import TypedDict
 
 from langgraph.types import Send
 
 from agent.graph_state import SceneSpec, ShotPlan, State, TopicBrief
-from rag.retriever import retrieve_shot_evidence
+from rag.retriever import retrieve_evidence_batch, retrieve_shot_evidence
+
+
+def retrieval_mode() -> str:
+    """Return RETRIEVAL_MODE, falling back to per_shot for unknown values."""
+    # "per_shot" fans out one get_chunks node per shot; "batch" retrieves every shot in one node.
+    mode = os.getenv("RETRIEVAL_MODE", "per_shot").strip().lower()
+    return mode if mode in {"per_shot", "batch"} else "per_shot"
 
 
 class ShotRetrievalState(TypedDict):
@@ -39,3 +49,40 @@ def get_chunks(state: ShotRetrievalState) -> dict:
         prompt=state["prompt"],
     )
     return {"retrieval_evidence": [evidence]}
+
+
+async def aget_chunks(state: ShotRetrievalState) -> dict:
+    """Async `get_chunks`; retrieval runs in a worker thread."""
+    # Retrieval is CPU-bound scoring plus a synchronous Chroma client, so it runs in a thread.
+    shot = state["shot"]
+    evidence = await asyncio.to_thread(
+        retrieve_shot_evidence,
+        shot=shot,
+        scene_spec=state["scene_spec"],
+        topic_brief=state["topic_brief"],
+        prompt=state["prompt"],
+    )
+    return {"retrieval_evidence": [evidence]}
+
+
+def get_chunks_batch(state: State) -> dict:
+    """Retrieve evidence for every planned shot in one node."""
+    evidence = retrieve_evidence_batch(
+        shots=state["shot_plan"],
+        scene_spec=state["scene_spec"],
+        topic_brief=state["topic_brief"],
+        prompt=state["prompt"],
+    )
+    return {"retrieval_evidence": evidence}
+
+
+async def aget_chunks_batch(state: State) -> dict:
+    """Async `get_chunks_batch`; retrieval runs in a worker thread."""
+    evidence = await asyncio.to_thread(
+        retrieve_evidence_batch,
+        shots=state["shot_plan"],
+        scene_spec=state["scene_spec"],
+        topic_brief=state["topic_brief"],
+        prompt=state["prompt"],
+    )
+    return {"retrieval_evidence": evidence}
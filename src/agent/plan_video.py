@@ -67,24 +67,24 @@ Avoid:
 """.strip()
 
 
-def plan_video(state: State) -> dict:
-    response = llm.with_structured_output(PlannerOutput).invoke(
-        [
-            ("system", SYSTEM_PROMPT),
-            (
-                "human",
-                json.dumps(
-                    {
-                        "prompt": state["prompt"],
-                        "route_info": state["route_info"],
-                        "topic_brief": state["topic_brief"],
-                    },
-                    ensure_ascii=False, #make sure non english are presevred correctly
-                ),
+def _planner_messages(state: State) -> list:
+    return [
+        ("system", SYSTEM_PROMPT),
+        (
+            "human",
+            json.dumps(
+                {
+                    "prompt": state["prompt"],
+                    "route_info": state["route_info"],
+                    "topic_brief": state["topic_brief"],
+                },
+                ensure_ascii=False, #make sure non english are presevred correctly
             ),
-        ],
-    )
+        ),
+    ]
+
 
+def _plan_update(response: PlannerOutput) -> dict:
     scene_spec: SceneSpec = response["scene_spec"]
     shot_plan: list[ShotPlan] = sorted(response["shot_plan"], key=lambda item: item["order"])
     shot_summary = "\n".join(f"{shot['order']}. {shot['purpose']}" for shot in shot_plan)
@@ -93,3 +93,14 @@ def plan_video(state: State) -> dict:
         "scene_spec": scene_spec,
         "shot_plan": shot_plan,
     }
+
+
+def plan_video(state: State) -> dict:
+    response = llm.with_structured_output(PlannerOutput).invoke(_planner_messages(state))
+    return _plan_update(response)
+
+
+async def aplan_video(state: State) -> dict:
+    """Async `plan_video` for the graph's ainvoke path."""
+    response = await llm.with_structured_output(PlannerOutput).ainvoke(_planner_messages(state))
+    return _plan_update(response)
@@ -72,29 +72,30 @@ def route_code_recovery(state: State) -> Literal["correct_code", "simplify_code"
     return "correct_code"
 
 
-def correct_code(state: State) -> dict:
+def _correct_messages(state: State) -> list:
     evidence_blocks = [format_evidence_block(item) for item in state.get("retrieval_evidence", [])]
     foundation_block = format_foundation_block(get_foundation_chunks())
-    response = llm.with_structured_output(CodeOutput).invoke(
-        [
-            ("system", SYSTEM_PROMPT),
-            (
-                "human",
-                json.dumps(
-                    {
-                        "runtime_error": state.get("sandbox_error", ""),
-                        "failed_code": state.get("code", ""),
-                        "scene_name": state.get("scene_name", ""),
-                        "scene_spec": state.get("scene_spec", {}),
-                        "code_outline": state.get("code_outline", {}),
-                        "foundation_block": foundation_block,
-                        "evidence_blocks": evidence_blocks,
-                    },
-                    ensure_ascii=False,
-                ),
+    return [
+        ("system", SYSTEM_PROMPT),
+        (
+            "human",
+            json.dumps(
+                {
+                    "runtime_error": state.get("sandbox_error", ""),
+                    "failed_code": state.get("code", ""),
+                    "scene_name": state.get("scene_name", ""),
+                    "scene_spec": state.get("scene_spec", {}),
+                    "code_outline": state.get("code_outline", {}),
+                    "foundation_block": foundation_block,
+                    "evidence_blocks": evidence_blocks,
+                },
+                ensure_ascii=False,
             ),
-        ],
-    )
+        ),
+    ]
+
+
+def _correct_update(state: State, response: CodeOutput) -> dict:
     return {
         "code": response["code"],
         "scene_name": response["scene_name"],
@@ -104,30 +105,31 @@ def correct_code(state: State) -> dict:
     }
 
 
-def simplify_code(state: State) -> dict:
+def _simplify_messages(state: State) -> list:
     evidence_blocks = [format_evidence_block(item) for item in state.get("retrieval_evidence", [])]
     foundation_block = format_foundation_block(get_foundation_chunks())
-    response = llm.with_structured_output(CodeOutput).invoke(
-        [
-            ("system", SIMPLIFY_PROMPT),
-            (
-                "human",
-                json.dumps(
-                    {
-                        "runtime_error": state.get("sandbox_error", ""),
-                        "failed_code": state.get("code", ""),
-                        "prompt": state.get("prompt", ""),
-                        "topic_brief": state.get("topic_brief", {}),
-                        "scene_spec": state.get("scene_spec", {}),
-                        "code_outline": state.get("code_outline", {}),
-                        "foundation_block": foundation_block,
-                        "evidence_blocks": evidence_blocks,
-                    },
-                    ensure_ascii=False,
-                ),
+    return [
+        ("system", SIMPLIFY_PROMPT),
+        (
+            "human",
+            json.dumps(
+                {
+                    "runtime_error": state.get("sandbox_error", ""),
+                    "failed_code": state.get("code", ""),
+                    "prompt": state.get("prompt", ""),
+                    "topic_brief": state.get("topic_brief", {}),
+                    "scene_spec": state.get("scene_spec", {}),
+                    "code_outline": state.get("code_outline", {}),
+                    "foundation_block": foundation_block,
+                    "evidence_blocks": evidence_blocks,
+                },
+                ensure_ascii=False,
             ),
-        ],
-    )
+        ),
+    ]
+
+
+def _simplify_update(response: CodeOutput) -> dict:
     return {
         "code": response["code"],
         "scene_name": response["scene_name"],
@@ -140,4 +142,26 @@ def simplify_code(state: State) -> dict:
                 )
             )
         ],
-    }
\ No newline at end of file
+    }
+
+
+def correct_code(state: State) -> dict:
+    response = llm.with_structured_output(CodeOutput).invoke(_correct_messages(state))
+    return _correct_update(state, response)
+
+
+async def acorrect_code(state: State) -> dict:
+    """Async `correct_code` for the graph's ainvoke path."""
+    response = await llm.with_structured_output(CodeOutput).ainvoke(_correct_messages(state))
+    return _correct_update(state, response)
+
+
+def simplify_code(state: State) -> dict:
+    response = llm.with_structured_output(CodeOutput).invoke(_simplify_messages(state))
+    return _simplify_update(response)
+
+
+async def asimplify_code(state: State) -> dict:
+    """Async `simplify_code` for the graph's ainvoke path."""
+    response = await llm.with_structured_output(CodeOutput).ainvoke(_simplify_messages(state))
+    return _simplify_update(response)
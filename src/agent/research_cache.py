@@ -0,0 +1,139 @@
+"""Caches for topic research: DuckDuckGo results in memory, extracted page excerpts on disk."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from cache_utils import LRUCache, SQLiteCache
+
+logger = logging.getLogger(__name__)
+
+
+def _search_ttl_seconds() -> float:
+    return max(0.0, float(os.getenv("RESEARCH_SEARCH_CACHE_TTL_SECONDS", "21600")))
+
+
+def _time_sensitive_search_ttl_seconds() -> float:
+    return max(0.0, float(os.getenv("RESEARCH_SEARCH_CACHE_TIME_SENSITIVE_TTL_SECONDS", "600")))
+
+
+@lru_cache(maxsize=1)
+def get_search_cache() -> LRUCache:
+    """Return the process-wide search result cache, sized by RESEARCH_SEARCH_CACHE_MAX_ENTRIES."""
+    max_entries = max(1, int(os.getenv("RESEARCH_SEARCH_CACHE_MAX_ENTRIES", "512")))
+    return LRUCache(max_entries, ttl_seconds=_search_ttl_seconds())
+
+
+def search_cache_key(query: str, max_results: int) -> tuple[str, int]:
+    """Key a search on its whitespace- and case-folded query and result count."""
+    return re.sub(r"\s+", " ", query).strip().casefold(), max_results
+
+
+def search_cache_max_age(time_sensitive: bool) -> float:
+    """Return how old a cached result list may be for this route; 0 means always search again."""
+    return _time_sensitive_search_ttl_seconds() if time_sensitive else _search_ttl_seconds()
+
+
+def search_cache_stats() -> dict[str, Any]:
+    """Return the search cache's entry count and hit rate for /health/ready."""
+    return get_search_cache().stats()
+
+
+def _cache_enabled() -> bool:
+    return os.getenv("RESEARCH_PAGE_CACHE_ENABLED", "true").lower() == "true"
+
+
+def _cache_path() -> Path:
+    path = (os.getenv("RESEARCH_PAGE_CACHE_PATH") or "").strip()
+    return Path(path) if path else Path(tempfile.gettempdir()) / "animai" / "research-pages.sqlite3"
+
+
+def _ttl_seconds() -> float:
+    return max(0.0, float(os.getenv("RESEARCH_PAGE_CACHE_TTL_SECONDS", "86400")))
+
+
+def _max_bytes() -> int:
+    return max(0, int(os.getenv("RESEARCH_PAGE_CACHE_MAX_BYTES", str(64 * 1024**2))))
+
+
+class PageCache:
+    """Excerpts keyed by URL; entries past the TTL keep their validators for a conditional GET."""
+
+    def __init__(self, path: Path, ttl_seconds: float, max_bytes: int) -> None:
+        """Store excerpts in SQLite at `path`, fresh for `ttl_seconds` and trimmed to about `max_bytes`."""
+        # Freshness is decided here rather than by SQLiteCache so stale entries can be revalidated.
+        self._store = SQLiteCache(path, table="research_pages")
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._size_lock = threading.Lock()
+        self._estimated_bytes: int | None = None
+
+    def get(self, url: str) -> dict | None:
+        """Return the stored entry for `url`, fresh or not; unreadable entries are dropped."""
+        value = self._store.get(url)
+        if value is None:
+            return None
+        try:
+            return json.loads(value)
+        except ValueError:
+            self._store.delete(url)
+            return None
+
+    def is_fresh(self, entry: dict) -> bool:
+        """Return whether `entry` can be served without asking the origin."""
+        return time.time() - entry.get("fetched_at", 0.0) <= self.ttl_seconds
+
+    @staticmethod
+    def validators(entry: dict | None) -> dict[str, str]:
+        """Return conditional GET headers built from the entry's ETag and Last-Modified."""
+        headers: dict[str, str] = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def set(self, url: str, excerpt: str, etag: str | None = None, last_modified: str | None = None) -> None:
+        """Store a freshly fetched excerpt with its validators, trimming the table once it is over budget."""
+        entry = {"excerpt": excerpt, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()}
+        value = json.dumps(entry)
+        self._store.set(url, value)
+        self._trim_if_over_budget(len(value))
+
+    def revalidated(self, url: str, entry: dict) -> None:
+        """Restart the TTL of an entry the origin answered with 304 Not Modified."""
+        self.set(url, entry["excerpt"], entry.get("etag"), entry.get("last_modified"))
+
+    def _trim_if_over_budget(self, written_bytes: int) -> None:
+        # The table is only scanned once a running estimate passes the budget; overwritten entries are
+        # counted twice, which only makes trimming happen early. Trimming to 90% leaves room for the next writes.
+        with self._size_lock:
+            if self._estimated_bytes is None:
+                self._estimated_bytes = self._store.total_bytes()
+            else:
+                self._estimated_bytes += written_bytes
+            if self._estimated_bytes <= self.max_bytes:
+                return
+            self._store.trim(self.max_bytes * 9 // 10)
+            self._estimated_bytes = self._store.total_bytes()
+
+
+@lru_cache(maxsize=1)
+def get_page_cache() -> PageCache | None:
+    """Return the process-wide page cache, or None when it is disabled or its file cannot be opened."""
+    if not _cache_enabled():
+        return None
+    try:
+        return PageCache(_cache_path(), _ttl_seconds(), _max_bytes())
+    except (OSError, sqlite3.Error):
+        logger.warning("Research page cache unavailable; fetching pages uncached", exc_info=True)
+        return None
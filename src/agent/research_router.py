@@ -32,13 +32,7 @@ Rules:
 """.strip()
 
 
-def route_prompt_for_grounding(state: State) -> dict:
-    prompt = state["prompt"]
-    response = llm.with_structured_output(RouteInfo).invoke(
-        [("system", SYSTEM_PROMPT), ("human", prompt)],
-    )
-
-    route_info: RouteInfo = response
+def _route_update(route_info: RouteInfo) -> dict:
     summary = (
         f"Route: {route_info['route']}; domain: {route_info['domain']}; "
         f"external grounding: {route_info['needs_external_grounding']}."
@@ -48,3 +42,20 @@ def route_prompt_for_grounding(state: State) -> dict:
         "messages": [AIMessage(content=summary)],
         "route_info": route_info,
     }
+
+
+def route_prompt_for_grounding(state: State) -> dict:
+    prompt = state["prompt"]
+    response = llm.with_structured_output(RouteInfo).invoke(
+        [("system", SYSTEM_PROMPT), ("human", prompt)],
+    )
+    return _route_update(response)
+
+
+async def aroute_prompt_for_grounding(state: State) -> dict:
+    """Async `route_prompt_for_grounding` for the graph's ainvoke path."""
+    prompt = state["prompt"]
+    response = await llm.with_structured_output(RouteInfo).ainvoke(
+        [("system", SYSTEM_PROMPT), ("human", prompt)],
+    )
+    return _route_update(response)
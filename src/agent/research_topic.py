@@ -1,7 +1,14 @@
 from __future__ import annotations
 
+import asyncio
+import codecs
 import json
+import os
 import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from html.parser import HTMLParser
 from urllib.parse import urlparse
 
 import requests
@@ -9,7 +16,15 @@ from langchain_core.messages import AIMessage
 from typing_extensions import TypedDict
 
 from agent.graph_state import RouteInfo, State, TopicBrief
+from agent.http_clients import get_http_session
 from agent.llm import make_llm
+from agent.research_cache import (
+    PageCache,
+    get_page_cache,
+    get_search_cache,
+    search_cache_key,
+    search_cache_max_age,
+)
 from agent.source_registry import get_domain_config
 
 
@@ -22,7 +37,19 @@ REQUEST_HEADERS = {
     )
 }
 MAX_SEARCH_RESULTS = 5
+SEARCH_THREADS = 2
 MAX_FETCHED_PAGES = 3
+EXCERPT_CHARS = 1800
+MIN_EXCERPT_BLOCK_CHARS = 40
+PAGE_READ_CHUNK_BYTES = 16 * 1024
+
+
+def _research_deadline_seconds() -> float:
+    return max(1.0, float(os.getenv("RESEARCH_DEADLINE_SECONDS", "20")))
+
+
+def _page_max_bytes() -> int:
+    return max(1, int(os.getenv("RESEARCH_PAGE_MAX_BYTES", str(1024**2))))
 
 
 class SearchQueries(TypedDict):
@@ -79,26 +106,31 @@ recommended_visual_mode must be one of: conceptual, quantitative, hybrid.
 """.strip()
 
 
+def _structured_messages(system_prompt: str, payload: dict) -> list:
+    return [
+        ("system", system_prompt),
+        ("human", json.dumps(payload)),
+    ]
+
+
 def _invoke_structured(schema, system_prompt: str, payload: dict):
-    return llm.with_structured_output(schema).invoke(
-        [
-            ("system", system_prompt),
-            ("human", json.dumps(payload)),
-        ],
-    )
+    return llm.with_structured_output(schema).invoke(_structured_messages(system_prompt, payload))
 
 
-def _build_search_queries(prompt: str, route_info: RouteInfo) -> list[str]:
+async def _ainvoke_structured(schema, system_prompt: str, payload: dict):
+    return await llm.with_structured_output(schema).ainvoke(_structured_messages(system_prompt, payload))
+
+
+def _search_query_payload(prompt: str, route_info: RouteInfo) -> dict:
     domain_config = get_domain_config(route_info["domain"])
-    response = _invoke_structured(
-        SearchQueries,
-        QUERY_PROMPT,
-        {
-            "prompt": prompt,
-            "route_info": route_info,
-            "query_hints": list(domain_config.query_hints),
-        },
-    )
+    return {
+        "prompt": prompt,
+        "route_info": route_info,
+        "query_hints": list(domain_config.query_hints),
+    }
+
+
+def _queries_from_response(response: SearchQueries, prompt: str, route_info: RouteInfo) -> list[str]:
     queries = [query.strip() for query in response.get("queries", []) if query.strip()] # if its non empty, then keep it
     if queries:
         return queries[:4]
@@ -107,24 +139,84 @@ def _build_search_queries(prompt: str, route_info: RouteInfo) -> list[str]:
     return [fallback or prompt]
 
 
-def _search_with_duckduckgo(query: str) -> list[dict]:
-    try:
-        from duckduckgo_search import DDGS
-    except ImportError:
+def _build_search_queries(prompt: str, route_info: RouteInfo) -> list[str]:
+    response = _invoke_structured(SearchQueries, QUERY_PROMPT, _search_query_payload(prompt, route_info))
+    return _queries_from_response(response, prompt, route_info)
+
+
+async def _abuild_search_queries(prompt: str, route_info: RouteInfo) -> list[str]:
+    response = await _ainvoke_structured(SearchQueries, QUERY_PROMPT, _search_query_payload(prompt, route_info))
+    return _queries_from_response(response, prompt, route_info)
+
+
+class _SearchSession:
+    """Runs one research run's searches on SEARCH_THREADS dedicated threads, each reusing one DuckDuckGo client.
+
+    DDGS keeps mutable HTTP, parser and rate-limit state, so a client is never used by two threads at once.
+    """
+
+    def __init__(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=SEARCH_THREADS, thread_name_prefix="research-search")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._clients: list = []
+
+    def submit(self, query: str, time_sensitive: bool) -> Future:
+        return self._executor.submit(_search_with_duckduckgo, query, self, time_sensitive)
+
+    def client(self):
+        if not hasattr(self._local, "client"):
+            self._local.client = None
+            try:
+                from duckduckgo_search import DDGS
+
+                self._local.client = DDGS()
+            except Exception:
+                return None
+            with self._lock:
+                self._clients.append(self._local.client)
+        return self._local.client
+
+    def close(self) -> None:
+        # A search still running past the deadline fails quietly once its client is closed; its result is unused.
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            client.__exit__(None, None, None)
+
+
+def _search_with_duckduckgo(
+    query: str,
+    session: _SearchSession,
+    time_sensitive: bool = False,
+) -> list[dict]:
+    cache = get_search_cache()
+    cache_key = search_cache_key(query, MAX_SEARCH_RESULTS)
+    max_age = search_cache_max_age(time_sensitive)
+    cached = cache.get(cache_key, max_age=max_age) if max_age > 0 else None
+    if cached is not None:
+        return list(cached)
+
+    client = session.client()
+    if client is None:
         return []
 
     try:
-        with DDGS() as ddgs:
-            return [
-                {
-                    "title": item.get("title", ""),
-                    "href": item.get("href", ""),
-                    "body": item.get("body", ""),
-                }
-                for item in ddgs.text(query, max_results=MAX_SEARCH_RESULTS)
-            ]
+        results = [
+            {
+                "title": item.get("title", ""),
+                "href": item.get("href", ""),
+                "body": item.get("body", ""),
+            }
+            for item in client.text(query, max_results=MAX_SEARCH_RESULTS)
+        ]
     except Exception:
         return []
+    # Empty lists are usually rate limits or transient failures, so they are not remembered.
+    if results:
+        cache.set(cache_key, results)
+    return results
 
 
 def _prioritize_results(results: list[dict], route_info: RouteInfo) -> list[dict]:
@@ -146,35 +238,208 @@ def _clean_text(text: str) -> str:
     return re.sub(r"\s+", " ", text).strip()
 
 
+_BLOCK_TAGS = frozenset({"p", "li"})
+_SKIPPED_TAGS = frozenset({"script", "style", "template", "noscript"})
+
+
+class _ExcerptParser(HTMLParser):
+    """Incrementally collects the page title and <p>/<li> text; `done` is set once the excerpt is full.
+
+    Every <p>/<li> start or end tag closes the current run of text, so text inside nested blocks is
+    collected once, in document order.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.done = False
+        self._title: list[str] | None = None
+        self._in_title = False
+        self._skipping = 0
+        self._depth = 0
+        self._pending: list[str] = []
+        self._chunks: list[str] = []
+        self._length = 0
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag == "title" and self._title is None:
+            self._title = []
+            self._in_title = True
+        elif tag in _SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+            self._depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title":
+            self._in_title = False
+        elif tag in _SKIPPED_TAGS:
+            self._skipping = max(0, self._skipping - 1)
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+            self._depth = max(0, self._depth - 1)
+
+    def handle_data(self, data: str) -> None:
+        if self._skipping:
+            return
+        if self._in_title:
+            self._title.append(data)
+        elif self._depth:
+            self._pending.append(data)
+
+    def excerpt(self) -> str:
+        self.close()
+        self._flush()
+        title = _clean_text(" ".join(self._title or []))
+        excerpt = " ".join(self._chunks)[:EXCERPT_CHARS]
+        return f"Title: {title}\nExcerpt: {excerpt}" if title else excerpt
+
+    def _flush(self) -> None:
+        text = _clean_text(" ".join(self._pending))
+        self._pending = []
+        if self.done or len(text) < MIN_EXCERPT_BLOCK_CHARS:
+            return
+        self._chunks.append(text)
+        self._length += len(text)
+        self.done = self._length > EXCERPT_CHARS
+
+
+def _response_decoder(response: requests.Response) -> codecs.IncrementalDecoder:
+    # Without a declared charset requests assumes ISO-8859-1 for text/*; most pages are UTF-8.
+    encoding = response.encoding if "charset" in response.headers.get("content-type", "") else "utf-8"
+    try:
+        return codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+
+def _read_excerpt(response: requests.Response) -> str:
+    """Parse the body as it downloads, stopping once the excerpt is full or RESEARCH_PAGE_MAX_BYTES are read."""
+    parser = _ExcerptParser()
+    decoder = _response_decoder(response)
+    remaining = _page_max_bytes()
+    for chunk in response.iter_content(PAGE_READ_CHUNK_BYTES):
+        parser.feed(decoder.decode(chunk[:remaining]))
+        remaining -= len(chunk)
+        if parser.done or remaining <= 0:
+            break
+    # Flush bytes the decoder still holds, e.g. a multi-byte character split across the last chunk.
+    parser.feed(decoder.decode(b"", final=True))
+    return parser.excerpt()
+
+
 def _fetch_page_excerpt(url: str) -> str:
+    cache = get_page_cache()
+    cached = cache.get(url) if cache is not None else None
+    if cached is not None and cache.is_fresh(cached):
+        return cached["excerpt"]
+
+    headers = {**REQUEST_HEADERS, **PageCache.validators(cached)}
     try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=10)
-        response.raise_for_status()
+        with get_http_session().get(url, headers=headers, timeout=10, stream=True) as response:
+            if cached is not None and response.status_code == 304:
+                cache.revalidated(url, cached)
+                return cached["excerpt"]
+            response.raise_for_status()
+            if "html" not in response.headers.get("content-type", ""):
+                return ""
+            excerpt = _read_excerpt(response)
     except requests.RequestException:
-        return ""
+        # A stale excerpt is still better grounding than none.
+        return cached["excerpt"] if cached is not None else ""
 
-    if "html" not in response.headers.get("content-type", ""):
-        return ""
+    if cache is not None and excerpt:
+        cache.set(url, excerpt, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return excerpt
 
-    try:
-        from bs4 import BeautifulSoup
-    except ImportError:
-        return _clean_text(response.text)[:1500]
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    title = _clean_text(soup.title.get_text(" ", strip=True)) if soup.title else ""
-    chunks: list[str] = []
-
-    for tag in soup.find_all(["p", "li"]):
-        text = _clean_text(tag.get_text(" ", strip=True))
-        if len(text) < 40:
-            continue
-        chunks.append(text)
-        if sum(len(chunk) for chunk in chunks) > 1800:
+
+def _remaining(deadline: float) -> float:
+    return max(0.0, deadline - time.monotonic())
+
+
+def _finished(future: Future, default):
+    if not future.done() or future.cancelled() or future.exception() is not None:
+        return default
+    return future.result()
+
+
+def _select_results(result_lists: list[list[dict] | None], route_info: RouteInfo) -> list[dict]:
+    selected: list[dict] = []
+    seen_urls: set[str] = set()
+    for results in result_lists:
+        for result in _prioritize_results(results or [], route_info):
+            href = result.get("href", "").strip()
+            if not href or href in seen_urls:
+                continue
+            seen_urls.add(href)
+            selected.append({**result, "href": href})
+            if len(selected) >= MAX_SEARCH_RESULTS:
+                return selected
+    return selected
+
+
+def _finished_prefix(searches: list[Future]) -> list[list[dict] | None]:
+    prefix: list[list[dict] | None] = []
+    for search in searches:
+        if not search.done():
             break
+        prefix.append(_finished(search, []))
+    return prefix
+
+
+def _gather_web_evidence(queries: list[str], route_info: RouteInfo) -> list[str]:
+    """Search every query and fetch the chosen pages concurrently, all within one deadline.
+
+    Pages are fetched as soon as the searches before them have settled their place in the
+    results, and only until MAX_FETCHED_PAGES excerpts are in: a page that yields nothing makes
+    room for the next result. Whatever has not finished by RESEARCH_DEADLINE_SECONDS is left out.
+    """
+    deadline = time.monotonic() + _research_deadline_seconds()
+    executor = ThreadPoolExecutor(max_workers=MAX_FETCHED_PAGES, thread_name_prefix="research-fetch")
+    fetches: dict[str, Future] = {}
+
+    def fetch_selected(results: list[dict]) -> None:
+        # At most MAX_FETCHED_PAGES pages are in flight or fetched; an empty fetch frees its slot for the next result.
+        slots = MAX_FETCHED_PAGES - sum(1 for fetch in fetches.values() if not fetch.done() or _finished(fetch, ""))
+        for result in results:
+            if slots <= 0:
+                return
+            if result["href"] not in fetches:
+                fetches[result["href"]] = executor.submit(_fetch_page_excerpt, result["href"])
+                slots -= 1
+
+    session = _SearchSession()
+    try:
+        time_sensitive = bool(route_info.get("time_sensitive"))
+        searches = [session.submit(query, time_sensitive) for query in queries]
+        while True:
+            fetch_selected(_select_results(_finished_prefix(searches), route_info))
+            pending = [future for future in [*searches, *fetches.values()] if not future.done()]
+            if not pending or not _remaining(deadline):
+                break
+            wait(pending, timeout=_remaining(deadline), return_when=FIRST_COMPLETED)
+
+        # Searches still running at the deadline are skipped.
+        results = _select_results([_finished(search, None) for search in searches], route_info)
+    finally:
+        # Stragglers finish on their own request timeouts without holding up the brief.
+        executor.shutdown(wait=False, cancel_futures=True)
+        session.close()
 
-    excerpt = " ".join(chunks)[:1800]
-    return f"Title: {title}\nExcerpt: {excerpt}" if title else excerpt
+    evidence_blocks: list[str] = []
+    excerpt_count = 0
+    for result in results:
+        evidence = (
+            f"URL: {result['href']}\n"
+            f"Title: {result.get('title', '').strip()}\n"
+            f"Snippet: {result.get('body', '').strip()}"
+        )
+        excerpt = _finished(fetches[result["href"]], "") if result["href"] in fetches else ""
+        if excerpt and excerpt_count < MAX_FETCHED_PAGES:
+            evidence += f"\nPage Excerpt: {excerpt}"
+            excerpt_count += 1
+        evidence_blocks.append(evidence)
+    return evidence_blocks
 
 
 def _collect_web_evidence(prompt: str, route_info: RouteInfo) -> tuple[list[str], list[str]]:
@@ -182,69 +447,80 @@ def _collect_web_evidence(prompt: str, route_info: RouteInfo) -> tuple[list[str]
         return [], []
 
     queries = _build_search_queries(prompt, route_info)
-    evidence_blocks: list[str] = []
-    seen_urls: set[str] = set()
-    excerpted_urls: set[str] = set()
+    return queries, _gather_web_evidence(queries, route_info)
 
-    for query in queries:
-        for result in _prioritize_results(_search_with_duckduckgo(query), route_info):
-            href = result.get("href", "").strip()
-            if not href or href in seen_urls:
-                continue
 
-            seen_urls.add(href)
-            evidence = (
-                f"URL: {href}\n"
-                f"Title: {result.get('title', '').strip()}\n"
-                f"Snippet: {result.get('body', '').strip()}"
-            )
-
-            if len(excerpted_urls) < MAX_FETCHED_PAGES:
-                excerpt = _fetch_page_excerpt(href)
-                if excerpt:
-                    evidence += f"\nPage Excerpt: {excerpt}"
-                    excerpted_urls.add(href)
-
-            evidence_blocks.append(evidence)
-            if len(evidence_blocks) >= MAX_SEARCH_RESULTS:
-                return queries, evidence_blocks
+async def _acollect_web_evidence(prompt: str, route_info: RouteInfo) -> tuple[list[str], list[str]]:
+    if not route_info.get("needs_external_grounding"):
+        return [], []
 
+    queries = await _abuild_search_queries(prompt, route_info)
+    # DuckDuckGo search has no async client, so the concurrent search/fetch runs off the event loop.
+    evidence_blocks = await asyncio.to_thread(_gather_web_evidence, queries, route_info)
     return queries, evidence_blocks
 
 
-def _synthesize_topic_brief(
+def _synthesis_request(
     prompt: str,
     route_info: RouteInfo,
     queries: list[str],
     evidence_blocks: list[str],
-) -> TopicBrief:
+) -> tuple[str, dict]:
     if evidence_blocks:
-        system_prompt = SYNTHESIS_PROMPT
-        payload = {
+        return SYNTHESIS_PROMPT, {
             "prompt": prompt,
             "route_info": route_info,
             "search_queries": queries,
             "web_evidence": evidence_blocks,
         }
-    else:
-        system_prompt = INTERNAL_BRIEF_PROMPT
-        payload = {
-            "prompt": prompt,
-            "route_info": route_info,
-        }
 
+    return INTERNAL_BRIEF_PROMPT, {
+        "prompt": prompt,
+        "route_info": route_info,
+    }
+
+
+def _synthesize_topic_brief(
+    prompt: str,
+    route_info: RouteInfo,
+    queries: list[str],
+    evidence_blocks: list[str],
+) -> TopicBrief:
+    system_prompt, payload = _synthesis_request(prompt, route_info, queries, evidence_blocks)
     return _invoke_structured(TopicBrief, system_prompt, payload)
 
 
-def build_topic_brief(state: State) -> dict:
-    prompt = state["prompt"]
-    route_info = state["route_info"]
-    queries, evidence_blocks = _collect_web_evidence(prompt, route_info)
-    topic_brief: TopicBrief = _synthesize_topic_brief(prompt, route_info, queries, evidence_blocks)
+async def _asynthesize_topic_brief(
+    prompt: str,
+    route_info: RouteInfo,
+    queries: list[str],
+    evidence_blocks: list[str],
+) -> TopicBrief:
+    system_prompt, payload = _synthesis_request(prompt, route_info, queries, evidence_blocks)
+    return await _ainvoke_structured(TopicBrief, system_prompt, payload)
 
+
+def _topic_brief_update(topic_brief: TopicBrief) -> dict:
     summary = topic_brief.get("factual_summary", "").strip()
     message = summary or f"Built topic brief for {topic_brief.get('topic_title', 'the topic')}."
     return {
         "messages": [AIMessage(content=message)],
         "topic_brief": topic_brief,
     }
+
+
+def build_topic_brief(state: State) -> dict:
+    prompt = state["prompt"]
+    route_info = state["route_info"]
+    queries, evidence_blocks = _collect_web_evidence(prompt, route_info)
+    topic_brief: TopicBrief = _synthesize_topic_brief(prompt, route_info, queries, evidence_blocks)
+    return _topic_brief_update(topic_brief)
+
+
+async def abuild_topic_brief(state: State) -> dict:
+    """Async `build_topic_brief`; web research runs in a worker thread."""
+    prompt = state["prompt"]
+    route_info = state["route_info"]
+    queries, evidence_blocks = await _acollect_web_evidence(prompt, route_info)
+    topic_brief: TopicBrief = await _asynthesize_topic_brief(prompt, route_info, queries, evidence_blocks)
+    return _topic_brief_update(topic_brief)
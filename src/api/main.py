@@ -1,10 +1,13 @@
+import asyncio
 import logging
 import os
+import threading
+import time
 from uuid import uuid4
 
 import requests
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Request, status
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from langgraph.errors import GraphRecursionError
@@ -13,7 +16,12 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 
-from chroma_utils import chroma_query_enabled, embed_texts, get_chroma_cloud_client
+from agent.http_clients import aclose_http_clients
+from agent.research_cache import search_cache_stats
+from api.language_registry import get_language_name, normalize_language
+from api.prompt_cache import get_prompt_cache, prompt_cache_key
+from chroma_utils import chroma_query_enabled, embed_texts, get_chroma_collection, reset_chroma_client
+from rag.retriever import retrieval_cache_stats, warm_retrieval
 import httpx
 from openai import APITimeoutError
 
@@ -33,6 +41,9 @@ logger = logging.getLogger(__name__)
 
 # Keep semantic cache close to exact-match territory so new prompts still exercise the pipeline.
 THRESHOLD = 0.05
+# Bump when prompt handling or rendering changes enough that earlier cached videos should not be served.
+CACHE_PIPELINE_VERSION = "1"
+CACHE_COLLECTION_NAME = "manim_cached_video_url_v2"
 limiter = Limiter(key_func=get_remote_address)
 app = FastAPI(title="AnimAI API")
 app.state.limiter = limiter
@@ -46,16 +57,56 @@ app.add_middleware(
 )
 
 
+# Warm-up is retried with doubling delays; after the last failure the API reports "degraded" but ready,
+# because retrieval still builds its indexes lazily on first use.
+WARMUP_ATTEMPTS = 3
+WARMUP_RETRY_SECONDS = 5.0
+_warmup_state: dict[str, object] = {"status": "pending", "attempts": 0, "duration_seconds": None}
+_warmup_stop = threading.Event()
+
+
 class RunRequest(BaseModel):
     prompt: str
     language: str = "en"
 
 
+def _warm_up() -> None:
+    started = time.perf_counter()
+    _warmup_state["status"] = "warming"
+    for attempt in range(1, WARMUP_ATTEMPTS + 1):
+        _warmup_state["attempts"] = attempt
+        try:
+            warm_retrieval()
+            get_language_name("en")
+        except Exception:
+            logger.exception("Retrieval warm-up attempt %s/%s failed", attempt, WARMUP_ATTEMPTS)
+        else:
+            _warmup_state["status"] = "ready"
+            break
+        if attempt == WARMUP_ATTEMPTS:
+            logger.warning("Retrieval warm-up gave up; indexes will be built on first use")
+            _warmup_state["status"] = "degraded"
+        elif _warmup_stop.wait(WARMUP_RETRY_SECONDS * 2 ** (attempt - 1)):
+            break
+    _warmup_state["duration_seconds"] = round(time.perf_counter() - started, 3)
+    logger.info("Retrieval warm-up finished with status=%s", _warmup_state["status"])
+
+
 @app.on_event("startup")
 async def startup_event() -> None:
+    _warmup_stop.clear()
     configure_langfuse()
     if os.getenv("LANGFUSE_AUTH_CHECK_ON_STARTUP", "").lower() == "true":
         auth_check_langfuse()
+    # Warm in a thread so liveness stays responsive; /health/ready reports when it is done.
+    app.state.warmup_task = asyncio.create_task(asyncio.to_thread(_warm_up))
+
+
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    """Stop a pending warm-up retry and close the shared HTTP clients."""
+    _warmup_stop.set()
+    await aclose_http_clients()
 
 
 def _generation_error_status_code(error_message: str) -> int:
@@ -113,6 +164,20 @@ def _error_response(message: str, status_code: int) -> JSONResponse:
     )
 
 
+def _cache_scope(language: str) -> dict[str, str]:
+    # The API never renders, so MANIM_QUALITY_FLAG here must mirror the worker's; compose passes both
+    # services the same value.
+    return {
+        "language": normalize_language(language),
+        "quality": os.getenv("MANIM_QUALITY_FLAG", "-ql").strip() or "-ql",
+        "pipeline_version": os.getenv("SEMANTIC_CACHE_PIPELINE_VERSION", "").strip() or CACHE_PIPELINE_VERSION,
+    }
+
+
+def _cache_where(scope: dict[str, str]) -> dict:
+    return {"$and": [{name: value} for name, value in scope.items()]}
+
+
 def _get_cache_collection():
     if not _semantic_cache_enabled():
         logger.info("Semantic cache disabled")
@@ -124,15 +189,32 @@ def _get_cache_collection():
         )
         return None
 
-    client = get_chroma_cloud_client()
-    if client is None:
+    collection = get_chroma_collection(CACHE_COLLECTION_NAME, create=True)
+    if collection is None:
         logger.info("Chroma cache disabled because the client is unavailable")
+    return collection
+
+
+def _get_exact_cached_video_url(cache_key: str) -> str | None:
+    if not _semantic_cache_enabled():
+        return None
+    try:
+        return get_prompt_cache().get(cache_key)
+    except Exception:
+        logger.warning("Skipping exact prompt cache lookup after failure", exc_info=True)
         return None
 
-    return client.get_or_create_collection(name="manim_cached_video_url_v2")
+
+def _remember_video_url(cache_key: str, video_url: str) -> None:
+    if not _semantic_cache_enabled():
+        return
+    try:
+        get_prompt_cache().set(cache_key, video_url)
+    except Exception:
+        logger.warning("Skipping exact prompt cache write after failure", exc_info=True)
 
 
-def _get_cached_video_url(prompt: str) -> str | None:
+def _get_cached_video_url(prompt: str, language: str) -> str | None:
     try:
         collection = _get_cache_collection()
         if collection is None:
@@ -142,7 +224,12 @@ def _get_cached_video_url(prompt: str) -> str | None:
         if not query_embeddings:
             return None
 
-        result = collection.query(query_embeddings=query_embeddings, n_results=1)
+        # Entries rendered for another language, quality or pipeline version never match.
+        result = collection.query(
+            query_embeddings=query_embeddings,
+            n_results=1,
+            where=_cache_where(_cache_scope(language)),
+        )
         distances = result.get("distances", [[]])
         metadatas = result.get("metadatas", [[]])
         if not distances or not metadatas or not distances[0] or not metadatas[0]:
@@ -155,10 +242,11 @@ def _get_cached_video_url(prompt: str) -> str | None:
         return None
     except Exception:
         logger.warning("Skipping semantic cache lookup after Chroma failure", exc_info=True)
+        reset_chroma_client()
         return None
 
 
-def _cache_video_url(prompt: str, video_url: str) -> None:
+def _cache_video_url(prompt: str, language: str, video_url: str) -> None:
     try:
         collection = _get_cache_collection()
         if collection is None:
@@ -170,10 +258,11 @@ def _cache_video_url(prompt: str, video_url: str) -> None:
             ids=[str(uuid4())],
             embeddings=embeddings,
             documents=[prompt],
-            metadatas=[{"video_url": video_url}],
+            metadatas=[{"video_url": video_url, **_cache_scope(language)}],
         )
     except Exception:
         logger.warning("Skipping semantic cache write after Chroma failure", exc_info=True)
+        reset_chroma_client()
 
 
 @app.get("/health")
@@ -181,9 +270,23 @@ async def health() -> dict[str, str]:
     return {"message": "ok", "executor": "manim-worker"}
 
 
+@app.get("/health/ready")
+async def readiness() -> JSONResponse:
+    """Report warm-up progress and cache hit rates; 503 until retrieval is ready or degraded."""
+    ready = _warmup_state["status"] in {"ready", "degraded"}
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            **_warmup_state,
+            "retrieval_cache": retrieval_cache_stats(),
+            "research_search_cache": search_cache_stats(),
+        },
+    )
+
+
 @app.post("/run")
 @limiter.limit("10/minute")
-async def run_pipeline(payload: RunRequest, request: Request):
+async def run_pipeline(payload: RunRequest, request: Request, background_tasks: BackgroundTasks):
     thread_id = str(uuid4())
     language = payload.language.strip() or "en"
     client_host = request.client.host if request.client else "unknown"
@@ -201,9 +304,19 @@ async def run_pipeline(payload: RunRequest, request: Request):
             metadata=trace_metadata,
             trace_name="animation-api-request",
         ):
-            cached_url = _get_cached_video_url(payload.prompt)
+            # Repeat prompts are answered from the exact tier without an embedding call. Its SQLite read can
+            # wait on a busy lock, so like the semantic tier it runs off the event loop.
+            cache_key = prompt_cache_key(payload.prompt, **_cache_scope(language))
+            cached_url = await asyncio.to_thread(_get_exact_cached_video_url, cache_key)
+            if cached_url:
+                logger.info("Exact prompt cache hit for prompt")
+                return {"result": cached_url, "status": "success"}
+
+            # Embedding and Chroma Cloud calls are blocking HTTP round trips; keep them off the event loop.
+            cached_url = await asyncio.to_thread(_get_cached_video_url, payload.prompt, language)
             if cached_url:
                 logger.info("Semantic cache hit for prompt")
+                background_tasks.add_task(_remember_video_url, cache_key, cached_url)
                 return {"result": cached_url, "status": "success"}
 
             workflow_config = {
@@ -244,7 +357,9 @@ async def run_pipeline(payload: RunRequest, request: Request):
                     status_code,
                 )
 
-            _cache_video_url(payload.prompt, video_url)
+            # Written after the response is sent; Starlette runs sync tasks in its threadpool.
+            background_tasks.add_task(_remember_video_url, cache_key, video_url)
+            background_tasks.add_task(_cache_video_url, payload.prompt, language, video_url)
             return {"result": video_url, "status": "success"}
 
     except HTTPException:
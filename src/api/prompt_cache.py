@@ -0,0 +1,64 @@
+"""Exact-match prompt cache: normalized prompt and render scope to published video URL."""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+from api.language_registry import normalize_language
+from cache_utils import LRUCache, SQLiteCache
+
+
+def _max_entries() -> int:
+    return max(1, int(os.getenv("PROMPT_CACHE_MAX_ENTRIES", "1024")))
+
+
+def _sqlite_path() -> Path | None:
+    path = (os.getenv("PROMPT_CACHE_PATH") or "").strip()
+    return Path(path) if path else None
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Fold case, Unicode forms and whitespace so trivially different prompts share a key."""
+    normalized = unicodedata.normalize("NFKC", prompt).casefold()
+    return re.sub(r"\s+", " ", normalized).strip()
+
+
+def prompt_cache_key(prompt: str, language: str, **scope: str) -> str:
+    """Hash the normalized prompt with its language and any other render scope fields."""
+    scope_fields = "".join(f"{name}={value}\n" for name, value in sorted(scope.items()))
+    payload = f"{normalize_language(language)}\n{scope_fields}{normalize_prompt(prompt)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PromptCache:
+    """Exact-match tier answering repeat prompts before the embedding tier is consulted."""
+
+    def __init__(self, max_entries: int, sqlite_path: Path | None = None) -> None:
+        """Keep `max_entries` URLs in memory, backed by SQLite at `sqlite_path` when given."""
+        self._memory = LRUCache(max_entries)
+        self._store = SQLiteCache(sqlite_path, table="prompt_video_urls") if sqlite_path else None
+
+    def get(self, key: str) -> str | None:
+        """Return the cached video URL, promoting SQLite hits into memory."""
+        video_url = self._memory.get(key)
+        if video_url is None and self._store is not None:
+            video_url = self._store.get(key)
+            if video_url is not None:
+                self._memory.set(key, video_url)
+        return video_url
+
+    def set(self, key: str, video_url: str) -> None:
+        """Remember `video_url` in memory and, if configured, in SQLite."""
+        self._memory.set(key, video_url)
+        if self._store is not None:
+            self._store.set(key, video_url)
+
+
+@lru_cache(maxsize=1)
+def get_prompt_cache() -> PromptCache:
+    """Return the process-wide cache sized by PROMPT_CACHE_MAX_ENTRIES and stored at PROMPT_CACHE_PATH."""
+    return PromptCache(_max_entries(), _sqlite_path())
@@ -0,0 +1,176 @@
+"""Small thread-safe caches shared across the API, agent and retrieval layers."""
+from __future__ import annotations
+
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+
+class LRUCache:
+    """In-memory least-recently-used map with optional expiry and hit/miss counters."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float | None = None) -> None:
+        """Keep at most `max_entries` entries, each for `ttl_seconds` if given."""
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Any, default: Any = None, max_age: float | None = None) -> Any:
+        """`max_age` lets a caller demand a fresher entry than the cache-wide TTL; older ones count as misses."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None:
+                if time.monotonic() - entry[0] > self.ttl_seconds:
+                    del self._entries[key]
+                    entry = None
+            if entry is not None and max_age is not None and time.monotonic() - entry[0] > max_age:
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Any, value: Any) -> None:
+        """Store `value`, evicting the least recently used entries past `max_entries`."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return entry count, hits, misses and hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        """Return the number of stored entries, expired ones included."""
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """Persistent string key/value table shared by the process-local caches."""
+
+    def __init__(self, path: Path, table: str = "cache", ttl_seconds: float | None = None) -> None:
+        """Open (or create) `table` in the SQLite file at `path`; entries older than `ttl_seconds` expire."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self._lock = Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA busy_timeout=5000")
+        self._connection.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                stored_at REAL NOT NULL
+            )
+            """
+        )
+
+    def get(self, key: str) -> Any:
+        """Return the stored value, or None if it is missing or expired."""
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, stored_at = row
+        if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+            self.delete(key)
+            return None
+        return value
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """Return the unexpired values among `keys`, keyed by key."""
+        found: dict[str, Any] = {}
+        # Stay well below SQLite's bound-parameter limit.
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            placeholders = ", ".join("?" for _ in batch)
+            with self._lock:
+                rows = self._connection.execute(
+                    f"SELECT key, value, stored_at FROM {self.table} WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+            now = time.time()
+            for key, value, stored_at in rows:
+                if self.ttl_seconds is None or now - stored_at <= self.ttl_seconds:
+                    found[key] = value
+        return found
+
+    def set(self, key: str, value: Any) -> None:
+        """Store `value` under `key`, replacing any previous value."""
+        self.set_many({key: value})
+
+    def set_many(self, items: dict[str, Any]) -> None:
+        """Store every item in one statement."""
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in items.items()],
+            )
+
+    def delete(self, key: str) -> None:
+        """Remove `key` if present."""
+        with self._lock:
+            self._connection.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def total_bytes(self) -> int:
+        """Return the summed size of the stored values."""
+        with self._lock:
+            (total,) = self._connection.execute(f"SELECT COALESCE(SUM(LENGTH(value)), 0) FROM {self.table}").fetchone()
+        return total
+
+    def trim(self, max_bytes: int) -> int:
+        """Drop the oldest entries until the stored values fit in `max_bytes`."""
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT key, LENGTH(value) FROM {self.table} ORDER BY stored_at DESC, rowid DESC"
+            ).fetchall()
+            total = 0
+            evicted: list[tuple[str]] = []
+            for key, size in rows:
+                total += size or 0
+                if total > max_bytes:
+                    evicted.append((key,))
+            self._connection.executemany(f"DELETE FROM {self.table} WHERE key = ?", evicted)
+        return len(evicted)
+
+    def evict_expired(self) -> int:
+        """Delete entries past the TTL and return how many were removed."""
+        if self.ttl_seconds is None:
+            return 0
+        with self._lock:
+            cursor = self._connection.execute(
+                f"DELETE FROM {self.table} WHERE stored_at < ?", (time.time() - self.ttl_seconds,)
+            )
+        return cursor.rowcount
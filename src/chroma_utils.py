@@ -1,8 +1,17 @@
+"""Chroma Cloud client, collection handles and cached query embeddings."""
 from __future__ import annotations
 
-from ast import In
+import hashlib
 import os
+import time
 from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+import numpy as np
+
+from cache_utils import LRUCache, SQLiteCache
 
 
 def _chroma_openai_api_key_env_var() -> str | None:
@@ -14,13 +23,20 @@ def _chroma_openai_api_key_env_var() -> str | None:
 
 
 def chroma_query_enabled() -> bool:
+    """Return True when Chroma Cloud credentials and an OpenAI key are configured."""
     required = ("CHROMA_API_KEY", "CHROMA_DATABASE", "CHROMA_TENANT")
     return all(os.getenv(name) for name in required) and _chroma_openai_api_key_env_var() is not None
 
 
+def embedding_model() -> str:
+    """Return the OpenAI embedding model used for queries and the index."""
+    return os.getenv("CHROMA_OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+
+
 @lru_cache(maxsize=1) # it caches the result of the function, so that subsequent calls with the same arguments return the cached result instead of recomputing it. 
 #In this case, since there are no arguments, it will cache the first computed value and return it for all future calls.
 def get_chroma_embedding_function():
+    """Return the cached OpenAI embedding function, or None without a key or chromadb."""
     api_key_env_var = _chroma_openai_api_key_env_var()
     if api_key_env_var is None:
         return None
@@ -32,20 +48,75 @@ def get_chroma_embedding_function():
 
     return OpenAIEmbeddingFunction(
         api_key_env_var=api_key_env_var,
-        model_name=os.getenv("CHROMA_OPENAI_EMBEDDING_MODEL", "text-embedding-3-small"),
+        model_name=embedding_model(),
     )
 
 
+@lru_cache(maxsize=1)
+def _embedding_memory_cache() -> LRUCache:
+    return LRUCache(max(1, int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "4096"))))
+
+
+@lru_cache(maxsize=1)
+def _embedding_disk_cache() -> SQLiteCache | None:
+    path = (os.getenv("EMBEDDING_CACHE_PATH") or "").strip()
+    return SQLiteCache(Path(path), table="embeddings") if path else None
+
+
+def _embedding_cache_key(text: str) -> str:
+    return hashlib.sha256(f"{embedding_model()}\n{text}".encode()).hexdigest()
+
+
 def embed_texts(texts: list[str]) -> list:
+    """Embed texts, serving repeats from the memory and optional disk caches."""
     embedding_function = get_chroma_embedding_function()
     if embedding_function is None:
         return []
-    return embedding_function(texts)
 
+    keys = [_embedding_cache_key(text) for text in texts]
+    memory_cache = _embedding_memory_cache()
+    embeddings: dict[str, np.ndarray] = {}
+    for key in keys:
+        embedding = memory_cache.get(key)
+        if embedding is not None:
+            embeddings[key] = embedding
 
-def get_chroma_cloud_client():
+    missing = {key: text for key, text in zip(keys, texts) if key not in embeddings}
+    disk_cache = _embedding_disk_cache()
+    if missing and disk_cache is not None:
+        for key, blob in disk_cache.get_many(list(missing)).items():
+            embeddings[key] = np.frombuffer(blob, dtype=np.float32)
+            memory_cache.set(key, embeddings[key])
+            del missing[key]
+
+    if missing:
+        # All misses go to the embedding API in a single batched request.
+        fresh = embedding_function(list(missing.values()))
+        for key, embedding in zip(missing, fresh):
+            vector = np.asarray(embedding, dtype=np.float32)
+            vector.setflags(write=False)
+            embeddings[key] = vector
+            memory_cache.set(key, vector)
+        if disk_cache is not None:
+            disk_cache.set_many({key: embeddings[key].tobytes() for key in missing})
+
+    return [embeddings[key] for key in keys]
+
+
+_client: Any = None
+_client_checked_at = 0.0
+_collections: dict[str, Any] = {}
+_client_lock = Lock()
+
+
+def _health_check_interval_seconds() -> float:
+    return max(0.0, float(os.getenv("CHROMA_HEALTH_CHECK_SECONDS", "60")))
+
+
+def _create_chroma_cloud_client():
     try:
         import chromadb
+        from chromadb.config import Settings
     except ImportError:
         return None
 
@@ -54,8 +125,62 @@ def get_chroma_cloud_client():
         "api_key": os.getenv("CHROMA_API_KEY"),
         "database": os.getenv("CHROMA_DATABASE"),
         "tenant": os.getenv("CHROMA_TENANT"),
+        # One pooled keep-alive HTTP client serves every cache lookup and dense query.
+        "settings": Settings(
+            chroma_http_keepalive_secs=float(os.getenv("CHROMA_HTTP_KEEPALIVE_SECONDS", "120")),
+            chroma_http_max_connections=max(1, int(os.getenv("CHROMA_HTTP_MAX_CONNECTIONS", "20"))),
+        ),
     }
     if cloud_host:
         client_kwargs["cloud_host"] = cloud_host
 
     return chromadb.CloudClient(**client_kwargs)
+
+
+def _client_is_healthy(client: Any) -> bool:
+    try:
+        client.heartbeat()
+    except Exception:
+        return False
+    return True
+
+
+def get_chroma_cloud_client():
+    """Return the shared Chroma Cloud client, reconnecting after a failed health check."""
+    global _client, _client_checked_at
+    with _client_lock:
+        now = time.monotonic()
+        if _client is not None and now - _client_checked_at >= _health_check_interval_seconds():
+            if not _client_is_healthy(_client):
+                _client = None
+                _collections.clear()
+            _client_checked_at = now
+        if _client is None:
+            _client = _create_chroma_cloud_client()
+            _client_checked_at = now
+        return _client
+
+
+def get_chroma_collection(name: str, create: bool = False):
+    """Return a cached handle to the named collection, or None without a client."""
+    client = get_chroma_cloud_client()
+    if client is None:
+        return None
+
+    with _client_lock:
+        collection = _collections.get(name)
+    if collection is None:
+        collection = client.get_or_create_collection(name=name) if create else client.get_collection(name=name)
+        with _client_lock:
+            if _client is client:
+                _collections[name] = collection
+    return collection
+
+
+def reset_chroma_client() -> None:
+    """Drop the shared client and its collection handles."""
+    # Called after a failed request so the next caller reconnects instead of reusing a broken client.
+    global _client
+    with _client_lock:
+        _client = None
+        _collections.clear()
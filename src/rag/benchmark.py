@@ -0,0 +1,184 @@
+"""Offline retrieval benchmark: quality and per-stage latency of `retrieve_shot_evidence`.
+
+Runs the recorded shot plans in `benchmarks/shots.json`, scores the ranked API symbols
+against each shot's held-out symbols (recall@k, MRR) and reports p50/p95/p99 latency for
+every retrieval stage. Results are diffed against `benchmarks/baseline.json` when present.
+
+Retrieval pins a shot's `candidate_symbols` as exact matches, so those are removed from both
+the expected and the ranked symbols: only what retrieval had to find on its own is scored.
+
+Usage: PYTHONPATH=src python -m rag.benchmark [--repeat N] [--write-baseline]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from rag import retriever
+
+BENCHMARK_DIR = Path(__file__).resolve().parent / "benchmarks"
+SHOTS_PATH = BENCHMARK_DIR / "shots.json"
+BASELINE_PATH = BENCHMARK_DIR / "baseline.json"
+RECALL_AT = (3, 6, 10)
+STAGES = ("tokenize", "bm25_api", "bm25_examples", "dense", "dedupe", "expand_neighbors", "rerank", "total")
+PERCENTILES = (50, 95, 99)
+
+
+def load_cases(path: Path = SHOTS_PATH) -> list[dict[str, Any]]:
+    """Load the recorded prompts and their shot plans."""
+    return json.loads(path.read_text())["cases"]
+
+
+def ranked_symbols(evidence: dict[str, Any]) -> list[str]:
+    """Top-level API symbols in evidence order: selected chunks first, then the rejected runners-up."""
+    symbols = [chunk["symbol"] for chunk in evidence["selected_api_chunks"]] + evidence["rejected_candidates"]
+    ranked: list[str] = []
+    for symbol in symbols:
+        root = symbol.split(".")[0]
+        if root not in ranked:
+            ranked.append(root)
+    return ranked
+
+
+def held_out_symbols(item: dict[str, Any]) -> list[str]:
+    """Return the expected symbols the shot did not already name as candidates."""
+    given = set(item["shot"].get("candidate_symbols", []))
+    return [symbol for symbol in item["expected_symbols"] if symbol not in given]
+
+
+def recall_at(ranked: list[str], expected: list[str], k: int) -> float:
+    """Return the share of `expected` found in the top `k` of `ranked`."""
+    return len(set(ranked[:k]) & set(expected)) / len(expected) if expected else 0.0
+
+
+def reciprocal_rank(ranked: list[str], expected: list[str]) -> float:
+    """Return 1/position of the first expected symbol in `ranked`, or 0 if none appears."""
+    for position, symbol in enumerate(ranked, start=1):
+        if symbol in expected:
+            return 1.0 / position
+    return 0.0
+
+
+def _dense_backend() -> str:
+    if retriever.load_local_index() is not None:
+        return "local"
+    return "chroma" if retriever.chroma_query_enabled() else "off"
+
+
+def run_benchmark(cases: list[dict[str, Any]], repeat: int = 5) -> dict[str, Any]:
+    """Run every shot `repeat` times with the evidence cache off and report quality and stage latency."""
+    # Measure retrieval itself, not the evidence cache in front of it.
+    previous_ttl = os.environ.get("RETRIEVAL_CACHE_TTL_SECONDS")
+    os.environ["RETRIEVAL_CACHE_TTL_SECONDS"] = "0"
+    retriever._evidence_cache.cache_clear()
+    try:
+        retriever.warm_retrieval()
+        report = _run_cases(cases, max(1, repeat))
+    finally:
+        if previous_ttl is None:
+            os.environ.pop("RETRIEVAL_CACHE_TTL_SECONDS", None)
+        else:
+            os.environ["RETRIEVAL_CACHE_TTL_SECONDS"] = previous_ttl
+        retriever._evidence_cache.cache_clear()
+    return report
+
+
+def _run_cases(cases: list[dict[str, Any]], repeat: int) -> dict[str, Any]:
+    samples: dict[str, list[float]] = {stage: [] for stage in STAGES}
+    recalls: dict[int, list[float]] = {k: [] for k in RECALL_AT}
+    reciprocal_ranks: list[float] = []
+    for case in cases:
+        for item in case["shots"]:
+            for attempt in range(repeat):
+                with retriever.record_stage_timings() as timings:
+                    started = time.perf_counter()
+                    evidence = retriever.retrieve_shot_evidence(
+                        item["shot"], case["scene_spec"], case["topic_brief"], case["prompt"]
+                    )
+                    timings["total"] = time.perf_counter() - started
+                for stage in STAGES:
+                    samples[stage].append(timings.get(stage, 0.0) * 1000)
+                if attempt:
+                    continue
+                expected = held_out_symbols(item)
+                if not expected:
+                    continue
+                given = set(item["shot"].get("candidate_symbols", []))
+                ranked = [symbol for symbol in ranked_symbols(evidence) if symbol not in given]
+                for k in RECALL_AT:
+                    recalls[k].append(recall_at(ranked, expected, k))
+                reciprocal_ranks.append(reciprocal_rank(ranked, expected))
+
+    metrics = {f"recall@{k}": round(float(np.mean(values)), 4) for k, values in recalls.items()}
+    metrics["mrr"] = round(float(np.mean(reciprocal_ranks)), 4)
+    latency_ms = {
+        stage: {f"p{q}": round(float(np.percentile(values, q)), 4) for q in PERCENTILES}
+        for stage, values in samples.items()
+    }
+    return {
+        "shots": len(reciprocal_ranks),
+        "repeat": repeat,
+        "dense_backend": _dense_backend(),
+        "quality": metrics,
+        "latency_ms": latency_ms,
+    }
+
+
+def compare_to_baseline(report: dict[str, Any], baseline: dict[str, Any]) -> list[dict[str, Any]]:
+    """Pair every metric of `report` with its baseline value and percentage change."""
+    baseline_quality = baseline.get("quality", {})
+    baseline_latency = baseline.get("latency_ms", {})
+    rows = [_diff_row(name, baseline_quality.get(name), value) for name, value in report["quality"].items()]
+    for stage, percentiles in report["latency_ms"].items():
+        for name, value in percentiles.items():
+            rows.append(_diff_row(f"{stage}.{name}_ms", baseline_latency.get(stage, {}).get(name), value))
+    return rows
+
+
+def _diff_row(metric: str, baseline: float | None, current: float) -> dict[str, Any]:
+    change = None
+    if baseline:
+        change = round((current - baseline) / baseline * 100, 1)
+    return {"metric": metric, "baseline": baseline, "current": current, "change_pct": change}
+
+
+def format_report(report: dict[str, Any], diff: list[dict[str, Any]] | None = None) -> str:
+    """Render the report as a fixed-width table, with baseline columns when `diff` is given."""
+    if diff is None:
+        diff = compare_to_baseline(report, {})
+    lines = [
+        f"{report['shots']} shots x {report['repeat']} runs, dense retrieval: {report['dense_backend']}",
+        f"{'metric':<28}{'baseline':>12}{'current':>12}{'change':>10}",
+    ]
+    for row in diff:
+        baseline = "-" if row["baseline"] is None else f"{row['baseline']:.4f}"
+        change = "-" if row["change_pct"] is None else f"{row['change_pct']:+.1f}%"
+        lines.append(f"{row['metric']:<28}{baseline:>12}{row['current']:>12.4f}{change:>10}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Command-line entry point; see the module docstring for usage."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per shot")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--write-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args()
+
+    report = run_benchmark(load_cases(), repeat=args.repeat)
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    sys.stdout.write(format_report(report, compare_to_baseline(report, baseline)) + "\n")
+    if args.write_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        sys.stdout.write(f"Wrote baseline to {args.baseline}\n")
+
+
+if __name__ == "__main__":
+    main()
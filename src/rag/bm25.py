@@ -0,0 +1,169 @@
+"""BM25 over a precomputed inverted index with CSR-style NumPy postings.
+
+Scores match `rank_bm25.BM25Okapi` (including its epsilon floor for negative idf), but a
+query only touches the postings of its own terms instead of scanning every document.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+ARRAY_FIELDS = ("indptr", "doc_ids", "weights")
+
+
+class InvertedBM25:
+    """BM25Okapi scorer whose per-term postings carry precomputed weights."""
+
+    def __init__(
+        self,
+        vocabulary: dict[str, int],
+        indptr: np.ndarray,
+        doc_ids: np.ndarray,
+        weights: np.ndarray,
+        corpus_size: int,
+    ) -> None:
+        """Wrap prebuilt postings; use `build` or `load` to create one."""
+        self.vocabulary = vocabulary
+        # Postings of term t are doc_ids[indptr[t]:indptr[t + 1]], with their BM25 weights alongside.
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.corpus_size = corpus_size
+
+    @classmethod
+    def build(
+        cls,
+        corpus: list[list[str]],
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ) -> InvertedBM25:
+        """Index tokenized documents with BM25Okapi's parameters and idf floor."""
+        term_counts = [Counter(document) for document in corpus]
+        doc_lengths = np.array([len(document) for document in corpus], dtype=np.float64)
+        average_length = float(doc_lengths.sum()) / max(1, len(corpus))
+
+        postings: dict[str, list[int]] = {}
+        for doc_id, counts in enumerate(term_counts):
+            for term in counts:
+                postings.setdefault(term, []).append(doc_id)
+
+        idf = {
+            term: math.log(len(corpus) - len(doc_ids) + 0.5) - math.log(len(doc_ids) + 0.5)
+            for term, doc_ids in postings.items()
+        }
+        floor = epsilon * (sum(idf.values()) / len(idf)) if idf else 0.0
+        idf = {term: floor if value < 0 else value for term, value in idf.items()}
+
+        vocabulary = {term: position for position, term in enumerate(postings)}
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(postings[term]) for term in vocabulary])
+        doc_ids = np.fromiter(
+            (doc_id for term in vocabulary for doc_id in postings[term]),
+            dtype=np.int32,
+            count=int(indptr[-1]),
+        )
+        frequencies = np.fromiter(
+            (term_counts[doc_id][term] for term in vocabulary for doc_id in postings[term]),
+            dtype=np.float64,
+            count=int(indptr[-1]),
+        )
+        term_idf = np.repeat(np.array([idf[term] for term in vocabulary], dtype=np.float64), np.diff(indptr))
+        length_norm = k1 * (1 - b + b * doc_lengths[doc_ids] / average_length)
+        weights = term_idf * (frequencies * (k1 + 1) / (frequencies + length_norm))
+        return cls(vocabulary, indptr, doc_ids, weights, len(corpus))
+
+    def _postings(self, token_lists: list[list[str]]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        query_ids: list[np.ndarray] = []
+        doc_ids: list[np.ndarray] = []
+        weights: list[np.ndarray] = []
+        for query_id, tokens in enumerate(token_lists):
+            for position in (self.vocabulary.get(token) for token in tokens):
+                if position is None:
+                    continue
+                span = slice(self.indptr[position], self.indptr[position + 1])
+                doc_ids.append(self.doc_ids[span])
+                weights.append(self.weights[span])
+                query_ids.append(np.full(len(doc_ids[-1]), query_id, dtype=np.int64))
+        if not doc_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+        return np.concatenate(query_ids), np.concatenate(doc_ids), np.concatenate(weights)
+
+    def scores(self, tokens: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Return the ids and scores of the documents sharing a term with `tokens`."""
+        _, doc_ids, scores = self.scores_many([tokens])
+        return doc_ids, scores
+
+    def scores_many(self, token_lists: list[list[str]]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return sparse (query, doc, score) triples for every query, accumulated in one pass."""
+        query_ids, doc_ids, weights = self._postings(token_lists)
+        pairs, inverse = np.unique(query_ids * self.corpus_size + doc_ids, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights, minlength=len(pairs))
+        return pairs // max(1, self.corpus_size), (pairs % max(1, self.corpus_size)).astype(np.int32), scores
+
+    def top_k(self, tokens: list[str], limit: int) -> list[tuple[int, float]]:
+        """Return the `limit` best (doc id, score) pairs, ties broken by document order."""
+        return self.top_k_many([tokens], limit)[0]
+
+    def top_k_many(self, token_lists: list[list[str]], limit: int) -> list[list[tuple[int, float]]]:
+        """Return `top_k` for every query, scored in one pass over the postings."""
+        query_ids, doc_ids, scores = self.scores_many(token_lists)
+        positive = scores > 0
+        query_ids, doc_ids, scores = query_ids[positive], doc_ids[positive], scores[positive]
+        # Pairs come out sorted by query, so each query's matches are one contiguous run.
+        bounds = np.searchsorted(query_ids, np.arange(len(token_lists) + 1))
+        return [
+            self._select_top(doc_ids[start:end], scores[start:end], limit)
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+
+    @staticmethod
+    def _select_top(doc_ids: np.ndarray, scores: np.ndarray, limit: int) -> list[tuple[int, float]]:
+        if limit <= 0 or not len(doc_ids):
+            return []
+
+        if len(scores) > limit:
+            # Keep everything tied with the k-th best so ties still break by document order.
+            kth_best = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            keep = scores >= kth_best
+            doc_ids, scores = doc_ids[keep], scores[keep]
+        order = np.lexsort((doc_ids, -scores))[:limit]
+        return [(int(doc_ids[row]), float(scores[row])) for row in order]
+
+    def save(self, directory: Path, name: str) -> None:
+        """Write the postings as .npy arrays plus a vocabulary header, each replaced atomically."""
+        suffix = f".{os.getpid()}.tmp"
+        for field in ARRAY_FIELDS:
+            path = directory / f"{name}.{field}.npy"
+            with open(path.with_name(path.name + suffix), "wb") as handle:
+                np.save(handle, getattr(self, field))
+            os.replace(path.with_name(path.name + suffix), path)
+        path = directory / f"{name}.vocabulary.json"
+        path.with_name(path.name + suffix).write_text(
+            json.dumps({"corpus_size": self.corpus_size, "terms": list(self.vocabulary)})
+        )
+        os.replace(path.with_name(path.name + suffix), path)
+
+    @classmethod
+    def load(cls, directory: Path, name: str, corpus_size: int | None = None) -> InvertedBM25:
+        """Map a saved index back in; raises ValueError if its files do not belong together.
+
+        Pass `corpus_size` to also reject an index built for a different number of documents.
+        """
+        header = json.loads((directory / f"{name}.vocabulary.json").read_text())
+        indptr, doc_ids, weights = (
+            np.load(directory / f"{name}.{field}.npy", mmap_mode="r") for field in ARRAY_FIELDS
+        )
+        vocabulary = {term: position for position, term in enumerate(header["terms"])}
+        if corpus_size is not None and header["corpus_size"] != corpus_size:
+            raise ValueError(f"{name} indexes {header['corpus_size']} documents, expected {corpus_size}")
+        if len(indptr) != len(vocabulary) + 1 or int(indptr[-1]) != len(doc_ids) or len(doc_ids) != len(weights):
+            raise ValueError(f"{name} postings do not match its vocabulary")
+        if len(doc_ids) and int(doc_ids.max()) >= header["corpus_size"]:
+            raise ValueError(f"{name} postings reference documents past its corpus size")
+        return cls(vocabulary, indptr, doc_ids, weights, corpus_size=header["corpus_size"])
@@ -0,0 +1,223 @@
+"""Serialized retrieval corpus: chunks, symbol index, BM25 postings and rerank bitsets.
+
+Parsing `manim_docs` with `ast` and building BM25 takes hundreds of milliseconds, so the
+result is pickled once into RAG_ARTIFACT_DIR (BM25 postings as memory-mapped .npy arrays)
+and reloaded in a few milliseconds. The
+artifact is keyed on a hash of the docs and of the modules that build it, and is rebuilt
+automatically when either changes.
+
+Usage: PYTHONPATH=src python -m rag.corpus_artifact
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import sys
+from pathlib import Path
+from typing import Any
+
+from rag.bm25 import InvertedBM25
+from rag.chunks import chunking
+from rag.example_chunks import extract_example_chunks
+from rag.paths import DOCS_DIR, artifact_dir
+from rag.reranker import RerankFeatures
+from rag.synthetic_chunks import build_synthetic_symbol_chunks
+
+logger = logging.getLogger(__name__)
+
+# Bump when the artifact layout changes.
+ARTIFACT_VERSION = 4
+CORPUS_DIRNAME = "corpus"
+BUILDER_MODULES = [
+    "bm25.py",
+    "chunks.py",
+    "example_chunks.py",
+    "synthetic_chunks.py",
+    "reranker.py",
+    "corpus_artifact.py",
+]
+# Engines are stored as separate .npy postings so they can be memory-mapped on load. Each maps to the
+# chunk list it indexes, whose length its corpus_size must match.
+BM25_KEYS = {"api_bm25": "api_chunks", "example_bm25": "example_chunks"}
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercased identifier-like tokens for BM25."""
+    return [token.lower() for token in re.findall(r"[A-Za-z_][A-Za-z0-9_.+-]*", text)]
+
+
+def corpus_dir() -> Path:
+    """Return the directory holding the corpus artifact under the artifact dir."""
+    return artifact_dir() / CORPUS_DIRNAME
+
+
+def _doc_url_for_module(module_name: str) -> str:
+    return f"https://docs.manim.community/en/stable/reference/manim.{module_name}.html"
+
+
+def source_fingerprint(docs_dir: Path = DOCS_DIR) -> str:
+    """Hash the docs and the builder modules; a different value means the artifact is stale."""
+    digest = hashlib.sha256(f"v{ARTIFACT_VERSION}".encode())
+    builder_dir = Path(__file__).resolve().parent
+    for source_path in [*sorted(docs_dir.glob("*.py")), *(builder_dir / name for name in BUILDER_MODULES)]:
+        digest.update(source_path.name.encode())
+        digest.update(hashlib.sha256(source_path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def _build_api_chunks(docs_dir: Path) -> list[dict[str, Any]]:
+    chunks: list[dict[str, Any]] = []
+    for source_path in sorted(docs_dir.glob("*.py")):
+        parent_chunks, child_chunks = chunking(str(source_path), _doc_url_for_module(source_path.stem))
+        for chunk in [*parent_chunks, *child_chunks]:
+            chunk["metadata"] = {
+                "source_type": "api",
+                "chunk_kind": chunk.get("type", "").lower(),
+                "symbol": chunk.get("id", ""),
+                "parent_symbol": chunk.get("parent_id"),
+                "children_symbols": chunk.get("children_ids", []),
+                "keywords": [chunk.get("id", ""), chunk.get("type", ""), source_path.stem],
+                "aliases": [chunk.get("id", ""), chunk.get("method_name", ""), source_path.stem],
+                "doc_summary": chunk.get("content", "")[:300],
+                "file_path": chunk.get("file_path", ""),
+                "animation_patterns": [],
+                "visual_patterns": [],
+            }
+            chunks.append(chunk)
+    chunks.extend(build_synthetic_symbol_chunks(docs_dir))
+    return chunks
+
+
+def _build_example_chunks(docs_dir: Path) -> list[dict[str, Any]]:
+    chunks: list[dict[str, Any]] = []
+    for source_path in sorted(docs_dir.glob("*.py")):
+        chunks.extend(extract_example_chunks(str(source_path)))
+    return chunks
+
+
+def _build_symbol_index(chunks: list[dict[str, Any]]) -> dict[str, list[int]]:
+    """Lowercased symbol/alias -> rows of the chunks that carry it."""
+    index: dict[str, list[int]] = {}
+    for row, chunk in enumerate(chunks):
+        keys = [chunk["metadata"].get("symbol", ""), *chunk["metadata"].get("aliases", [])]
+        for key in keys:
+            normalized = key.lower()
+            if not normalized:
+                continue
+            index.setdefault(normalized, []).append(row)
+    return index
+
+
+def _api_document_tokens(chunk: dict[str, Any]) -> list[str]:
+    metadata = chunk["metadata"]
+    return tokenize(
+        " ".join(
+            [
+                metadata.get("symbol", ""),
+                " ".join(metadata.get("aliases", [])),
+                metadata.get("doc_summary", ""),
+                " ".join(metadata.get("keywords", [])),
+                chunk["content"],
+            ]
+        )
+    )
+
+
+def _example_document_tokens(chunk: dict[str, Any]) -> list[str]:
+    metadata = chunk["metadata"]
+    return tokenize(
+        " ".join(
+            [
+                metadata.get("scene_name", ""),
+                " ".join(metadata.get("domain_tags", [])),
+                " ".join(metadata.get("visual_patterns", [])),
+                " ".join(metadata.get("symbols_used", [])),
+                chunk["content"],
+            ]
+        )
+    )
+
+
+def build_corpus(docs_dir: Path = DOCS_DIR) -> dict[str, Any]:
+    """Parse the docs into API and example chunks and build their lookup, BM25 and rerank structures."""
+    api_chunks = _build_api_chunks(docs_dir)
+    example_chunks = _build_example_chunks(docs_dir)
+    return {
+        "api_chunks": api_chunks,
+        "example_chunks": example_chunks,
+        "api_symbol_index": _build_symbol_index(api_chunks),
+        "api_chunk_index": {chunk["id"]: row for row, chunk in enumerate(api_chunks)},
+        "api_bm25": InvertedBM25.build([_api_document_tokens(chunk) for chunk in api_chunks]),
+        "example_bm25": InvertedBM25.build([_example_document_tokens(chunk) for chunk in example_chunks]),
+        "api_rerank": RerankFeatures.build(api_chunks),
+        "example_rerank": RerankFeatures.build(example_chunks),
+    }
+
+
+def write_corpus(corpus: dict[str, Any], fingerprint: str, output_dir: Path | None = None) -> Path:
+    """Persist `corpus` under `fingerprint` and return the directory it was written to."""
+    output_dir = output_dir or corpus_dir()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # Per-process temp names keep concurrent builders from reading each other's partial files.
+    suffix = f".{os.getpid()}.tmp"
+    corpus_path = output_dir / "corpus.pkl"
+    manifest_path = output_dir / "manifest.json"
+    # The manifest goes first and comes back last, so a crash in between leaves no manifest to pair
+    # an older pickle with newer postings (or the reverse).
+    manifest_path.unlink(missing_ok=True)
+    for key in BM25_KEYS:
+        corpus[key].save(output_dir, key)
+    pickled = {name: value for name, value in corpus.items() if name not in BM25_KEYS}
+    with open(corpus_path.with_name(corpus_path.name + suffix), "wb") as handle:
+        pickle.dump(pickled, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(corpus_path.with_name(corpus_path.name + suffix), corpus_path)
+    manifest_path.with_name(manifest_path.name + suffix).write_text(
+        json.dumps({"version": ARTIFACT_VERSION, "fingerprint": fingerprint})
+    )
+    os.replace(manifest_path.with_name(manifest_path.name + suffix), manifest_path)
+    return output_dir
+
+
+def _read_corpus(fingerprint: str, input_dir: Path) -> dict[str, Any] | None:
+    try:
+        manifest = json.loads((input_dir / "manifest.json").read_text())
+        if manifest.get("version") != ARTIFACT_VERSION or manifest.get("fingerprint") != fingerprint:
+            return None
+        with open(input_dir / "corpus.pkl", "rb") as handle:
+            corpus = pickle.load(handle)
+        for key, chunks_key in BM25_KEYS.items():
+            corpus[key] = InvertedBM25.load(input_dir, key, corpus_size=len(corpus[chunks_key]))
+        return corpus
+    except (OSError, ValueError, KeyError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def load_corpus(docs_dir: Path = DOCS_DIR, input_dir: Path | None = None) -> dict[str, Any]:
+    """Return the stored corpus if it matches the sources, otherwise rebuild and store it."""
+    input_dir = input_dir or corpus_dir()
+    fingerprint = source_fingerprint(docs_dir)
+    corpus = _read_corpus(fingerprint, input_dir)
+    if corpus is not None:
+        return corpus
+
+    logger.info("Rebuilding retrieval corpus artifact in %s", input_dir)
+    corpus = build_corpus(docs_dir)
+    try:
+        write_corpus(corpus, fingerprint, input_dir)
+    except OSError:
+        logger.warning("Could not persist retrieval corpus artifact; using the in-memory build", exc_info=True)
+    return corpus
+
+
+def main() -> None:
+    """Command-line entry point: build the corpus artifact from the bundled docs."""
+    output_dir = write_corpus(build_corpus(), source_fingerprint())
+    sys.stdout.write(f"Wrote retrieval corpus artifact to {output_dir}\n")
+
+
+if __name__ == "__main__":
+    main()
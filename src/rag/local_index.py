@@ -0,0 +1,132 @@
+"""In-process dense index over the API chunks, built at deploy time.
+
+Usage: PYTHONPATH=src python -m rag.local_index
+"""
+from __future__ import annotations
+
+import io
+import json
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from chroma_utils import embed_texts, embedding_model
+from rag.paths import artifact_dir
+
+INDEX_DIRNAME = "dense-index"
+EMBED_BATCH_SIZE = 128
+# Keeps the largest class chunks inside the embedding model's input limit.
+MAX_EMBED_CHARS = 6000
+
+
+def local_index_dir() -> Path:
+    """Return the directory holding the dense index under the artifact dir."""
+    return artifact_dir() / INDEX_DIRNAME
+
+
+def _chunk_text(chunk: dict[str, Any]) -> str:
+    symbol = chunk["metadata"].get("symbol", "")
+    return f"{symbol}\n{chunk['content']}"[:MAX_EMBED_CHARS]
+
+
+class LocalDenseIndex:
+    """Unit-normalized chunk embeddings searched by cosine similarity."""
+
+    def __init__(self, chunk_ids: list[str], matrix: np.ndarray) -> None:
+        """Pair each row of `matrix` with the chunk id at the same position."""
+        self.chunk_ids = chunk_ids
+        self.matrix = matrix
+
+    def search(self, query_embedding: Any, limit: int) -> list[tuple[str, float]]:
+        """Return the `limit` most similar (chunk id, score) pairs."""
+        return self.search_many([query_embedding], limit)[0]
+
+    def search_many(self, query_embeddings: list[Any], limit: int) -> list[list[tuple[str, float]]]:
+        """Return `search` results for every query in one matrix product."""
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(len(query_embeddings), -1)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        limit = min(limit, len(self.chunk_ids))
+        if limit <= 0:
+            return [[] for _ in query_embeddings]
+
+        # Rows are unit-normalized at build time, so this is cosine similarity for every query at once.
+        scores = self.matrix @ (queries / np.where(norms == 0, 1.0, norms)).T
+        top = np.argpartition(-scores, limit - 1, axis=0)[:limit]
+        results: list[list[tuple[str, float]]] = []
+        for column in range(scores.shape[1]):
+            if not norms[column, 0]:
+                results.append([])
+                continue
+            rows = top[:, column]
+            rows = rows[np.argsort(-scores[rows, column])]
+            results.append([(self.chunk_ids[row], float(scores[row, column])) for row in rows])
+        return results
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    temp_path = path.with_name(f"{path.name}.tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, path)
+
+
+def build_local_index(chunks: list[dict[str, Any]], output_dir: Path | None = None) -> Path:
+    """Embed `chunks` and write the index; raises RuntimeError if the embedding API is unavailable."""
+    output_dir = output_dir or local_index_dir()
+    texts = [_chunk_text(chunk) for chunk in chunks]
+    vectors: list[Any] = []
+    for start in range(0, len(texts), EMBED_BATCH_SIZE):
+        vectors.extend(embed_texts(texts[start : start + EMBED_BATCH_SIZE]))
+    if len(vectors) != len(chunks):
+        raise RuntimeError("Embedding API is not configured; set CHROMA_OPENAI_API_KEY or OPENAI_API_KEY")
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1.0, norms)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / "manifest.json"
+    # The old manifest goes first and the new one is written last, so an interrupted rebuild never
+    # pairs a manifest with arrays from another build; each file is swapped in whole.
+    manifest_path.unlink(missing_ok=True)
+    buffer = io.BytesIO()
+    np.save(buffer, matrix)
+    _write_atomic(output_dir / "embeddings.npy", buffer.getvalue())
+    _write_atomic(output_dir / "chunk_ids.json", json.dumps([chunk["id"] for chunk in chunks]).encode())
+    manifest = {"model": embedding_model(), "count": len(chunks), "dimensions": int(matrix.shape[1])}
+    _write_atomic(manifest_path, json.dumps(manifest).encode())
+    return output_dir
+
+
+@lru_cache(maxsize=1)
+def load_local_index() -> LocalDenseIndex | None:
+    """Memory-map the built index, or return None if it is missing, partial or from another model."""
+    index_dir = local_index_dir()
+    try:
+        manifest = json.loads((index_dir / "manifest.json").read_text())
+        chunk_ids = json.loads((index_dir / "chunk_ids.json").read_text())
+        matrix = np.load(index_dir / "embeddings.npy", mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+    # Query vectors from a different model would live in another embedding space.
+    if manifest.get("model") != embedding_model():
+        return None
+    if not manifest.get("count") == len(chunk_ids) == matrix.shape[0]:
+        return None
+    return LocalDenseIndex(chunk_ids, matrix)
+
+
+def main() -> None:
+    """Command-line entry point: embed the API chunks and write the index."""
+    from rag.retriever import _load_api_chunks
+
+    output_dir = build_local_index(_load_api_chunks())
+    sys.stdout.write(f"Wrote local dense index to {output_dir}\n")
+
+
+if __name__ == "__main__":
+    main()
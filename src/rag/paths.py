@@ -0,0 +1,15 @@
+"""Filesystem locations of the bundled Manim docs and the prebuilt retrieval artifacts."""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+DOCS_DIR = Path(__file__).resolve().parents[1] / "manim_docs"
+DEFAULT_ARTIFACT_DIR = Path(__file__).resolve().parent / "artifacts"
+
+
+def artifact_dir() -> Path:
+    """Return RAG_ARTIFACT_DIR, or the in-tree artifacts directory when it is unset."""
+    # Retrieval artifacts are built at deploy time and read-only while serving.
+    configured = (os.getenv("RAG_ARTIFACT_DIR") or "").strip()
+    return Path(configured) if configured else DEFAULT_ARTIFACT_DIR
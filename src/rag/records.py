@@ -0,0 +1,49 @@
+"""Slotted records passed between retrieval stages instead of per-candidate dict copies."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping
+
+# Row of chunks that are not part of the local corpus (e.g. Chroma Cloud hits).
+EXTERNAL_ROW = -1
+
+
+@dataclass(frozen=True, slots=True)
+class ChunkRecord:
+    """One corpus chunk, built once per process and shared by every candidate that refers to it."""
+
+    row: int
+    chunk_id: str
+    source_type: str
+    symbol: str
+    content: str
+    metadata: Mapping[str, Any]
+
+    @classmethod
+    def from_chunk(cls, chunk: dict[str, Any], row: int = EXTERNAL_ROW) -> ChunkRecord:
+        """Wrap a chunk dict; its metadata is exposed read-only rather than copied."""
+        metadata = chunk.get("metadata") or {}
+        return cls(
+            row=row,
+            chunk_id=chunk["id"],
+            source_type=metadata.get("source_type", "api"),
+            symbol=metadata.get("symbol", metadata.get("scene_name", chunk["id"])),
+            content=chunk.get("content") or "",
+            metadata=MappingProxyType(metadata),
+        )
+
+
+@dataclass(slots=True)
+class Candidate:
+    """Per-shot scores for a chunk; the chunk itself is referenced, never copied."""
+
+    chunk: ChunkRecord
+    score_dense: float = 0.0
+    score_lexical: float = 0.0
+    score_rerank: float = 0.0
+
+    @property
+    def chunk_id(self) -> str:
+        """Id of the referenced chunk."""
+        return self.chunk.chunk_id
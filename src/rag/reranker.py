@@ -1,54 +1,128 @@
+"""Feature-based reranking of retrieval candidates against a planned shot."""
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Mapping
 
+import numpy as np
 
-def _normalize(score: float, maximum: float) -> float:
-    if maximum <= 0:
-        return 0.0
-    return max(score, 0.0) / maximum
+from rag.records import Candidate
+
+# Metadata fields whose terms are matched against each list on the shot.
+FEATURE_FIELDS = {
+    "symbols": ("symbol", "aliases"),
+    "patterns": ("animation_patterns", "visual_patterns"),
+    "objects": ("keywords", "domain_tags"),
+}
+
+
+def _field_terms(metadata: Mapping[str, Any], names: tuple[str, ...]) -> set[str]:
+    terms: set[str] = set()
+    for name in names:
+        values = metadata.get(name) or []
+        for value in [values] if isinstance(values, str) else values:
+            if value:
+                terms.add(value.lower())
+    return terms
+
+
+class RerankFeatures:
+    """Per-chunk term sets for every FEATURE_FIELDS group, stored as packed bitsets over term ids.
+
+    Bitset rows follow the order of the chunks they were built from, i.e. `ChunkRecord.row`.
+    """
+
+    def __init__(self, vocabularies: dict[str, dict[str, int]], bitsets: dict[str, np.ndarray]) -> None:
+        """Wrap per-field term vocabularies and their bitset matrices."""
+        self.vocabularies = vocabularies
+        self.bitsets = bitsets
+
+    @classmethod
+    def build(cls, chunks: list[dict[str, Any]]) -> RerankFeatures:
+        """Build the vocabularies and bitsets for chunks, in chunk order."""
+        vocabularies: dict[str, dict[str, int]] = {}
+        bitsets: dict[str, np.ndarray] = {}
+        for field, names in FEATURE_FIELDS.items():
+            chunk_terms = [_field_terms(chunk["metadata"], names) for chunk in chunks]
+            vocabulary: dict[str, int] = {}
+            for terms in chunk_terms:
+                for term in sorted(terms):
+                    vocabulary.setdefault(term, len(vocabulary))
+            dense = np.zeros((len(chunks), max(1, len(vocabulary))), dtype=bool)
+            for row, terms in enumerate(chunk_terms):
+                dense[row, [vocabulary[term] for term in terms]] = True
+            vocabularies[field] = vocabulary
+            bitsets[field] = np.packbits(dense, axis=1, bitorder="little")
+        return cls(vocabularies, bitsets)
 
+    def overlap_counts(self, field: str, rows: np.ndarray, expected: set[str]) -> np.ndarray:
+        """How many of `expected` appear in the term set of each chunk row."""
+        vocabulary = self.vocabularies[field]
+        term_ids = np.array([vocabulary[term] for term in expected if term in vocabulary], dtype=np.int64)
+        if not len(rows) or not len(term_ids):
+            return np.zeros(len(rows), dtype=np.int64)
+        words = self.bitsets[field][rows[:, None], term_ids >> 3]
+        return ((words >> (term_ids & 7).astype(np.uint8)) & 1).sum(axis=1)
 
-def _token_overlap(expected: list[str], observed: list[str]) -> float:
+
+def _feature_rows(candidates: list[Candidate], features: RerankFeatures | None) -> list[int | None]:
+    if features is None:
+        return [None] * len(candidates)
+    row_count = len(features.bitsets["symbols"])
+    return [candidate.chunk.row if 0 <= candidate.chunk.row < row_count else None for candidate in candidates]
+
+
+def _overlap_scores(
+    candidates: list[Candidate],
+    rows: list[int | None],
+    field: str,
+    expected: list[str],
+    features: RerankFeatures | None,
+) -> np.ndarray:
     expected_set = {item.lower() for item in expected if item}
-    observed_set = {item.lower() for item in observed if item}
+    counts = np.zeros(len(candidates))
     if not expected_set:
-        return 0.0
-    return len(expected_set & observed_set) / len(expected_set)
+        return counts
+
+    indexed = [position for position, row in enumerate(rows) if row is not None]
+    if indexed:
+        indexed_rows = np.array([rows[position] for position in indexed], dtype=np.int64)
+        counts[indexed] = features.overlap_counts(field, indexed_rows, expected_set)
+    # Candidates from outside the corpus (e.g. Chroma Cloud hits) are matched directly.
+    for position, row in enumerate(rows):
+        if row is None:
+            observed = _field_terms(candidates[position].chunk.metadata, FEATURE_FIELDS[field])
+            counts[position] = len(expected_set & observed)
+    return counts / len(expected_set)
 
 
-def rerank_candidates(candidates: list[dict[str, Any]], shot: dict[str, Any]) -> list[dict[str, Any]]:
+def _normalized_scores(scores: np.ndarray) -> np.ndarray:
+    maximum = scores.max() or 1.0
+    if maximum <= 0:
+        return np.zeros(len(scores))
+    return np.maximum(scores, 0.0) / maximum
+
+
+def rerank_candidates(
+    candidates: list[Candidate],
+    shot: dict[str, Any],
+    features: RerankFeatures | None = None,
+) -> list[Candidate]:
+    """Set `score_rerank` on every candidate and return them best first."""
     if not candidates:
         return []
 
-    max_lexical = max(candidate.get("score_lexical", 0.0) for candidate in candidates) or 1.0
-    max_dense = max(candidate.get("score_dense", 0.0) for candidate in candidates) or 1.0
-    expected_symbols = shot.get("candidate_symbols", [])
-    expected_patterns = shot.get("animation_patterns", [])
-    visible_objects = shot.get("visible_objects", [])
-
-    reranked: list[dict[str, Any]] = []
-    for candidate in candidates:
-        metadata = candidate.get("metadata", {})
-        symbol = metadata.get("symbol", "")
-        symbol_overlap = _token_overlap(expected_symbols, [symbol, *metadata.get("aliases", [])])
-        animation_overlap = _token_overlap(
-            expected_patterns,
-            metadata.get("animation_patterns", []) + metadata.get("visual_patterns", []),
-        )
-        object_overlap = _token_overlap(
-            visible_objects,
-            metadata.get("keywords", []) + metadata.get("domain_tags", []),
-        )
-        rerank_score = (
-            0.35 * _normalize(candidate.get("score_dense", 0.0), max_dense)
-            + 0.30 * _normalize(candidate.get("score_lexical", 0.0), max_lexical)
-            + 0.20 * symbol_overlap
-            + 0.10 * animation_overlap
-            + 0.05 * object_overlap
-        )
-        updated = dict(candidate)
-        updated["score_rerank"] = round(rerank_score, 6)
-        reranked.append(updated)
-
-    return sorted(reranked, key=lambda item: item.get("score_rerank", 0.0), reverse=True)
+    lexical = np.array([candidate.score_lexical for candidate in candidates], dtype=np.float64)
+    dense = np.array([candidate.score_dense for candidate in candidates], dtype=np.float64)
+    rows = _feature_rows(candidates, features)
+    rerank_scores = (
+        0.35 * _normalized_scores(dense)
+        + 0.30 * _normalized_scores(lexical)
+        + 0.20 * _overlap_scores(candidates, rows, "symbols", shot.get("candidate_symbols", []), features)
+        + 0.10 * _overlap_scores(candidates, rows, "patterns", shot.get("animation_patterns", []), features)
+        + 0.05 * _overlap_scores(candidates, rows, "objects", shot.get("visible_objects", []), features)
+    ).round(6)
+
+    for candidate, score in zip(candidates, rerank_scores.tolist()):
+        candidate.score_rerank = score
+    # Stable descending order keeps equal scores in candidate order.
+    return [candidates[position] for position in np.argsort(-rerank_scores, kind="stable")]
@@ -1,279 +1,255 @@
+"""Hybrid dense and lexical retrieval of Manim evidence for planned shots."""
 from __future__ import annotations
 
+import copy
 import os
 import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import lru_cache
-from pathlib import Path
-from typing import Any
-
-from chroma_utils import chroma_query_enabled, embed_texts, get_chroma_cloud_client
-from rag.chunks import chunking
-from rag.example_chunks import extract_example_chunks
+from typing import Any, Iterator
+
+from cache_utils import LRUCache
+from chroma_utils import (
+    chroma_query_enabled,
+    embed_texts,
+    get_chroma_collection,
+    reset_chroma_client,
+)
+from rag.corpus_artifact import load_corpus, tokenize
+from rag.local_index import load_local_index
+from rag.paths import DOCS_DIR
 from rag.query_builder import build_shot_queries
+from rag.records import EXTERNAL_ROW, Candidate, ChunkRecord
 from rag.reranker import rerank_candidates
-from rag.synthetic_chunks import build_synthetic_symbol_chunks
-
 
-DOCS_DIR = Path(__file__).resolve().parents[1] / "manim_docs"
 API_COLLECTION_NAME = "manim_source_code"
 FOUNDATION_SYMBOLS = ["VoiceoverScene", "GTTSService"]
 
-try:
-    from rank_bm25 import BM25Okapi
-except ImportError:  # pragma: no cover
-    BM25Okapi = None
 
+# Per-stage wall time, only collected inside record_stage_timings() (used by rag.benchmark).
+_stage_timings: ContextVar[dict[str, float] | None] = ContextVar("retrieval_stage_timings", default=None)
 
-def _tokenize(text: str) -> list[str]:
-    return [token.lower() for token in re.findall(r"[A-Za-z_][A-Za-z0-9_.+-]*", text)]
 
+@contextmanager
+def record_stage_timings() -> Iterator[dict[str, float]]:
+    """Collect per-stage retrieval wall time into the yielded dict."""
+    timings: dict[str, float] = {}
+    token = _stage_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _stage_timings.reset(token)
+
+
+@contextmanager
+def _timed(stage: str) -> Iterator[None]:
+    timings = _stage_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
 
-def _doc_url_for_module(module_name: str) -> str:
-    return f"https://docs.manim.community/en/stable/reference/manim.{module_name}.html"
 
+@lru_cache(maxsize=1)
+def _corpus() -> dict[str, Any]:
+    return load_corpus(DOCS_DIR)
 
-def _candidate_from_chunk(
-    chunk: dict[str, Any],
-    score_lexical: float = 0.0,
-    score_dense: float = 0.0,
-) -> dict[str, Any]:
-    metadata = dict(chunk["metadata"])
-    return {
-        "chunk_id": chunk["id"],
-        "source_type": metadata.get("source_type", "api"),
-        "symbol": metadata.get("symbol", metadata.get("scene_name", chunk["id"])),
-        "score_dense": float(score_dense),
-        "score_lexical": float(score_lexical),
-        "score_rerank": 0.0,
-        "content": chunk["content"],
-        "metadata": metadata,
-    }
+
+@lru_cache(maxsize=2)
+def _chunk_records(example: bool = False) -> tuple[ChunkRecord, ...]:
+    chunks = _corpus()["example_chunks" if example else "api_chunks"]
+    return tuple(ChunkRecord.from_chunk(chunk, row) for row, chunk in enumerate(chunks))
+
+
+def _api_candidate(row: int, score_lexical: float = 0.0, score_dense: float = 0.0) -> Candidate:
+    return Candidate(_chunk_records()[row], score_dense=float(score_dense), score_lexical=float(score_lexical))
 
 
-@lru_cache(maxsize=1)
 def _load_api_chunks() -> list[dict[str, Any]]:
-    chunks: list[dict[str, Any]] = []
-    for source_path in sorted(DOCS_DIR.glob("*.py")):
-        parent_chunks, child_chunks = chunking(str(source_path), _doc_url_for_module(source_path.stem))
-        for chunk in [*parent_chunks, *child_chunks]:
-            chunk["metadata"] = {
-                "source_type": "api",
-                "chunk_kind": chunk.get("type", "").lower(),
-                "symbol": chunk.get("id", ""),
-                "parent_symbol": chunk.get("parent_id"),
-                "children_symbols": chunk.get("children_ids", []),
-                "keywords": [chunk.get("id", ""), chunk.get("type", ""), source_path.stem],
-                "aliases": [chunk.get("id", ""), chunk.get("method_name", ""), source_path.stem],
-                "doc_summary": chunk.get("content", "")[:300],
-                "file_path": chunk.get("file_path", ""),
-                "animation_patterns": [],
-                "visual_patterns": [],
-            }
-            chunks.append(chunk)
-    chunks.extend(build_synthetic_symbol_chunks(DOCS_DIR))
-    return chunks
+    return _corpus()["api_chunks"]
 
 
-@lru_cache(maxsize=1)
 def _load_example_chunks() -> list[dict[str, Any]]:
-    chunks: list[dict[str, Any]] = []
-    for source_path in sorted(DOCS_DIR.glob("*.py")):
-        chunks.extend(extract_example_chunks(str(source_path)))
-    return chunks
+    return _corpus()["example_chunks"]
 
 
-@lru_cache(maxsize=1)
-def _api_symbol_index() -> dict[str, list[dict[str, Any]]]:
-    index: dict[str, list[dict[str, Any]]] = {}
-    for chunk in _load_api_chunks():
-        keys = [chunk["metadata"].get("symbol", ""), *chunk["metadata"].get("aliases", [])]
-        for key in keys:
-            normalized = key.lower()
-            if not normalized:
-                continue
-            index.setdefault(normalized, []).append(chunk)
-    return index
+def _api_symbol_index() -> dict[str, list[int]]:
+    return _corpus()["api_symbol_index"]
 
 
-@lru_cache(maxsize=1)
-def _api_chunk_index() -> dict[str, dict[str, Any]]:
-    return {chunk["id"]: chunk for chunk in _load_api_chunks()}
+def _api_chunk_index() -> dict[str, int]:
+    return _corpus()["api_chunk_index"]
 
 
-@lru_cache(maxsize=1)
 def _api_bm25():
-    chunks = _load_api_chunks()
-    corpus = [
-        _tokenize(
-            " ".join(
-                [
-                    chunk["metadata"].get("symbol", ""),
-                    " ".join(chunk["metadata"].get("aliases", [])),
-                    chunk["metadata"].get("doc_summary", ""),
-                    " ".join(chunk["metadata"].get("keywords", [])),
-                    chunk["content"],
-                ]
-            )
-        )
-        for chunk in chunks
-    ]
-    if BM25Okapi is None:
-        return chunks, corpus, None
-    return chunks, corpus, BM25Okapi(corpus)
+    return _chunk_records(), _corpus()["api_bm25"]
 
 
-@lru_cache(maxsize=1)
 def _example_bm25():
-    chunks = _load_example_chunks()
-    corpus = [
-        _tokenize(
-            " ".join(
-                [
-                    chunk["metadata"].get("scene_name", ""),
-                    " ".join(chunk["metadata"].get("domain_tags", [])),
-                    " ".join(chunk["metadata"].get("visual_patterns", [])),
-                    " ".join(chunk["metadata"].get("symbols_used", [])),
-                    chunk["content"],
-                ]
-            )
-        )
-        for chunk in chunks
-    ]
-    if BM25Okapi is None:
-        return chunks, corpus, None
-    return chunks, corpus, BM25Okapi(corpus)
-
-
-def _bm25_search(query: str, example: bool = False, limit: int = 8) -> list[dict[str, Any]]:
-    chunks, corpus, engine = _example_bm25() if example else _api_bm25()
-    tokens = _tokenize(query)
-    if not tokens:
-        return []
-
-    if engine is None:
-        scored: list[tuple[float, dict[str, Any]]] = []
-        token_set = set(tokens)
-        for chunk, chunk_tokens in zip(chunks, corpus):
-            overlap = len(token_set & set(chunk_tokens))
-            if overlap > 0:
-                scored.append((float(overlap), chunk))
-        scored.sort(key=lambda item: item[0], reverse=True)
-        return [_candidate_from_chunk(chunk, score_lexical=score) for score, chunk in scored[:limit]]
-
-    scores = engine.get_scores(tokens)
-    ranked = sorted(zip(scores, chunks), key=lambda item: item[0], reverse=True)
-    return [
-        _candidate_from_chunk(chunk, score_lexical=float(score))
-        for score, chunk in ranked[:limit]
-        if score > 0
-    ]
+    return _chunk_records(example=True), _corpus()["example_bm25"]
+
+
+def _bm25_search(query: str, example: bool = False, limit: int = 8) -> list[Candidate]:
+    return _bm25_search_batch([query], example=example, limit=limit)[0]
 
 
-def _exact_symbol_matches(symbols: list[str]) -> list[dict[str, Any]]:
-    matches: list[dict[str, Any]] = []
+def _bm25_search_batch(queries: list[str], example: bool = False, limit: int = 8) -> list[list[Candidate]]:
+    records, engine = _example_bm25() if example else _api_bm25()
+    with _timed("tokenize"):
+        token_lists = [tokenize(query) for query in queries]
+    with _timed("bm25_examples" if example else "bm25_api"):
+        return [
+            [Candidate(records[doc_id], score_lexical=score) for doc_id, score in hits]
+            for hits in engine.top_k_many(token_lists, limit)
+        ]
+
+
+def _exact_symbol_matches(symbols: list[str]) -> list[Candidate]:
+    matches: list[Candidate] = []
     seen: set[str] = set()
     index = _api_symbol_index()
+    records = _chunk_records()
     for symbol in symbols:
-        for chunk in index.get(symbol.lower(), []):
-            if chunk["id"] in seen:
+        for row in index.get(symbol.lower(), []):
+            if records[row].chunk_id in seen:
                 continue
-            seen.add(chunk["id"])
-            matches.append(_candidate_from_chunk(chunk, score_lexical=10.0))
+            seen.add(records[row].chunk_id)
+            matches.append(Candidate(records[row], score_lexical=10.0))
     return matches
 
 
-def _maybe_dense_search(query: str, limit: int = 4) -> list[dict[str, Any]]:
-    if not chroma_query_enabled():
-        return []
+def _local_dense_search(queries: list[str], limit: int) -> list[list[Candidate]] | None:
+    index = load_local_index()
+    if index is None:
+        return None
 
-    client = get_chroma_cloud_client()
-    if client is None:
-        return []
+    query_embeddings = embed_texts(queries)
+    if len(query_embeddings) != len(queries):
+        raise ValueError(f"Expected {len(queries)} query embeddings, got {len(query_embeddings)}")
 
-    try:
-        query_embeddings = embed_texts([query])
-        if not query_embeddings:
-            return []
-        collection = client.get_collection(name=API_COLLECTION_NAME)
-        result = collection.query(query_embeddings=query_embeddings, n_results=limit)
-    except Exception:
-        return []
+    chunk_index = _api_chunk_index()
+    return [
+        [
+            _api_candidate(chunk_index[chunk_id], score_dense=max(0.0, score))
+            for chunk_id, score in hits
+            if chunk_id in chunk_index
+        ]
+        for hits in index.search_many(query_embeddings, limit)
+    ]
+
+
+def _result_row(result: dict[str, Any], field: str, row: int) -> list[Any]:
+    values = result.get(field) or []
+    return (values[row] or []) if row < len(values) else []
 
-    dense_results: list[dict[str, Any]] = []
+
+def _chroma_dense_candidates(result: dict[str, Any], row: int) -> list[Candidate]:
+    dense_results: list[Candidate] = []
     rows = zip(
-        result.get("ids", [[]])[0],
-        result.get("documents", [[]])[0],
-        result.get("metadatas", [[]])[0],
-        result.get("distances", [[]])[0],
+        _result_row(result, "ids", row),
+        _result_row(result, "documents", row),
+        _result_row(result, "metadatas", row),
+        _result_row(result, "distances", row),
     )
     for chunk_id, document, metadata, distance in rows:
-        dense_results.append(
-            {
-                "chunk_id": chunk_id,
-                "source_type": (metadata or {}).get("source_type", "api"),
-                "symbol": (metadata or {}).get("symbol", chunk_id),
-                "score_dense": 0.0 if distance is None else max(0.0, 1.0 - float(distance)),
-                "score_lexical": 0.0,
-                "score_rerank": 0.0,
-                "content": document,
-                "metadata": metadata or {},
-            }
+        # Chroma Cloud chunks keep their own document and metadata, outside the local corpus rows.
+        chunk = ChunkRecord(
+            row=EXTERNAL_ROW,
+            chunk_id=chunk_id,
+            source_type=(metadata or {}).get("source_type", "api"),
+            symbol=(metadata or {}).get("symbol", chunk_id),
+            content=document or "",
+            metadata=metadata or {},
         )
+        score_dense = 0.0 if distance is None else max(0.0, 1.0 - float(distance))
+        dense_results.append(Candidate(chunk, score_dense=score_dense))
     return dense_results
 
 
-def _dedupe_candidates(candidates: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    merged: dict[str, dict[str, Any]] = {}
+def _maybe_dense_search(query: str, limit: int = 4) -> list[Candidate] | None:
+    results = _maybe_dense_search_batch([query], limit=limit)
+    return None if results is None else results[0]
+
+
+def _maybe_dense_search_batch(queries: list[str], limit: int = 4) -> list[list[Candidate]] | None:
+    """Dense hits per query, or None when the dense backend failed and the results are lexical-only."""
+    # A deploy-time local index replaces the Chroma Cloud round trip when present.
+    try:
+        local_results = _local_dense_search(queries, limit)
+    except Exception:
+        return None
+    if local_results is not None:
+        return local_results
+
+    if not queries or not chroma_query_enabled():
+        return [[] for _ in queries]
+
+    try:
+        collection = get_chroma_collection(API_COLLECTION_NAME)
+        if collection is None:
+            return None
+        # One embedding request and one multi-query round trip for every shot.
+        query_embeddings = embed_texts(queries)
+        if len(query_embeddings) != len(queries):
+            return None
+        result = collection.query(query_embeddings=query_embeddings, n_results=limit)
+    except Exception:
+        reset_chroma_client()
+        return None
+
+    return [_chroma_dense_candidates(result, row) for row in range(len(queries))]
+
+
+def _dedupe_candidates(candidates: list[Candidate]) -> list[Candidate]:
+    merged: dict[str, Candidate] = {}
     for candidate in candidates:
-        key = candidate["chunk_id"]
-        if key not in merged:
-            merged[key] = dict(candidate)
-            continue
-        merged[key]["score_dense"] = max(
-            merged[key].get("score_dense", 0.0),
-            candidate.get("score_dense", 0.0),
-        )
-        merged[key]["score_lexical"] = max(
-            merged[key].get("score_lexical", 0.0),
-            candidate.get("score_lexical", 0.0),
-        )
+        kept = merged.setdefault(candidate.chunk_id, candidate)
+        if kept is not candidate:
+            kept.score_dense = max(kept.score_dense, candidate.score_dense)
+            kept.score_lexical = max(kept.score_lexical, candidate.score_lexical)
     return list(merged.values())
 
 
-def _expand_neighbors(candidates: list[dict[str, Any]]) -> list[dict[str, Any]]:
+def _expand_neighbors(candidates: list[Candidate]) -> list[Candidate]:
     expanded = list(candidates)
-    seen = {candidate["chunk_id"] for candidate in candidates}
+    seen = {candidate.chunk_id for candidate in candidates}
     chunk_index = _api_chunk_index()
 
-    for candidate in list(candidates):
-        parent_symbol = candidate.get("metadata", {}).get("parent_symbol")
+    for candidate in candidates:
+        parent_symbol = candidate.chunk.metadata.get("parent_symbol")
         if parent_symbol and parent_symbol in chunk_index and parent_symbol not in seen:
             seen.add(parent_symbol)
-            expanded.append(_candidate_from_chunk(chunk_index[parent_symbol], score_lexical=1.0))
+            expanded.append(_api_candidate(chunk_index[parent_symbol], score_lexical=1.0))
     return expanded
 
 
 def _select_api_chunks(
-    reranked_api: list[dict[str, Any]],
-    exact_matches: list[dict[str, Any]],
+    reranked_api: list[Candidate],
+    exact_matches: list[Candidate],
     limit: int = 6,
-) -> list[dict[str, Any]]:
-    exact_ids = {candidate["chunk_id"] for candidate in exact_matches}
-    selected: list[dict[str, Any]] = []
+) -> list[Candidate]:
+    exact_ids = {candidate.chunk_id for candidate in exact_matches}
+    selected: list[Candidate] = []
     seen: set[str] = set()
 
     for candidate in reranked_api:
-        if candidate["chunk_id"] not in exact_ids:
+        if candidate.chunk_id not in exact_ids:
             continue
-        seen.add(candidate["chunk_id"])
+        seen.add(candidate.chunk_id)
         selected.append(candidate)
         if len(selected) >= limit:
             return selected
 
     for candidate in reranked_api:
-        if candidate["chunk_id"] in seen:
+        if candidate.chunk_id in seen:
             continue
-        seen.add(candidate["chunk_id"])
+        seen.add(candidate.chunk_id)
         selected.append(candidate)
         if len(selected) >= limit:
             break
@@ -281,7 +257,31 @@ def _select_api_chunks(
     return selected
 
 
+def _evidence_chunk(candidate: Candidate) -> dict[str, Any]:
+    """State-sized view of a selected candidate; corpus content is looked up again when formatting."""
+    chunk = candidate.chunk
+    evidence_chunk = {
+        "chunk_id": chunk.chunk_id,
+        "chunk_row": chunk.row,
+        "source_type": chunk.source_type,
+        "symbol": chunk.symbol,
+        "score_dense": candidate.score_dense,
+        "score_lexical": candidate.score_lexical,
+        "score_rerank": candidate.score_rerank,
+    }
+    if chunk.row == EXTERNAL_ROW:
+        evidence_chunk["content"] = chunk.content
+    return evidence_chunk
+
+
+def _evidence_content(evidence_chunk: dict[str, Any]) -> str:
+    if "content" in evidence_chunk:
+        return evidence_chunk["content"]
+    return _chunk_records(example=evidence_chunk["source_type"] == "example")[evidence_chunk["chunk_row"]].content
+
+
 def format_evidence_block(evidence: dict[str, Any]) -> str:
+    """Render one shot's evidence as a markdown block for the code prompts."""
     lines = [
         f"## Shot {evidence['shot_id']}",
         f"Dense query: {evidence['dense_query']}",
@@ -291,59 +291,81 @@ def format_evidence_block(evidence: dict[str, Any]) -> str:
         "### API Evidence",
     ]
     for index, chunk in enumerate(evidence["selected_api_chunks"], start=1):
-        lines.extend([f"{index}. {chunk['symbol']} (score={chunk['score_rerank']:.3f})", chunk["content"][:900], ""])
+        content = _evidence_content(chunk)[:900]
+        lines.extend([f"{index}. {chunk['symbol']} (score={chunk['score_rerank']:.3f})", content, ""])
     lines.append("### Example Evidence")
     for index, chunk in enumerate(evidence["selected_example_chunks"], start=1):
-        lines.extend([f"{index}. {chunk['symbol']} (score={chunk['score_rerank']:.3f})", chunk["content"][:700], ""])
+        content = _evidence_content(chunk)[:700]
+        lines.extend([f"{index}. {chunk['symbol']} (score={chunk['score_rerank']:.3f})", content, ""])
     if evidence["notes"]:
         lines.append("Notes:")
         lines.extend(f"- {note}" for note in evidence["notes"])
     return "\n".join(lines).strip()
 
 
-def get_foundation_chunks(symbols: list[str] | None = None) -> list[dict[str, Any]]:
-    requested_symbols = symbols or FOUNDATION_SYMBOLS
-    chunks = _exact_symbol_matches(requested_symbols)
+@lru_cache(maxsize=1)
+def _default_foundation_chunks() -> tuple[ChunkRecord, ...]:
+    return tuple(_foundation_chunks(FOUNDATION_SYMBOLS))
+
+
+def get_foundation_chunks(symbols: list[str] | None = None) -> list[ChunkRecord]:
+    """Return the chunks for symbols, defaulting to FOUNDATION_SYMBOLS."""
+    if not symbols:
+        return list(_default_foundation_chunks())
+    return _foundation_chunks(symbols)
+
+
+def _foundation_chunks(requested_symbols: list[str]) -> list[ChunkRecord]:
+    chunks = [candidate.chunk for candidate in _exact_symbol_matches(requested_symbols)]
     return sorted(
         chunks,
         key=lambda chunk: (
-            0 if chunk["metadata"].get("symbol") in requested_symbols else 1,
-            chunk["metadata"].get("symbol", ""),
+            0 if chunk.metadata.get("symbol") in requested_symbols else 1,
+            chunk.metadata.get("symbol", ""),
         ),
     )
 
 
-def format_foundation_block(chunks: list[dict[str, Any]]) -> str:
+def format_foundation_block(chunks: list[ChunkRecord]) -> str:
+    """Render foundation chunks as a markdown block for the code prompts."""
     lines = ["## Foundation Evidence"]
     for index, chunk in enumerate(chunks, start=1):
-        lines.extend([f"{index}. {chunk['metadata'].get('symbol', chunk['symbol'])}", chunk["content"][:900], ""])
+        lines.extend([f"{index}. {chunk.metadata.get('symbol', chunk.symbol)}", chunk.content[:900], ""])
     return "\n".join(lines).strip()
 
 
-def retrieve_shot_evidence(
+def warm_retrieval() -> None:
+    """Load every lazily built retrieval structure so the first request does not pay for it."""
+    _corpus()
+    _chunk_records()
+    _chunk_records(example=True)
+    load_local_index()
+    _default_foundation_chunks()
+
+
+def _assemble_shot_evidence(
     shot: dict[str, Any],
-    scene_spec: dict[str, Any],
-    topic_brief: dict[str, Any],
-    prompt: str,
+    dense_query: str,
+    lexical_query: str,
+    api_candidates: list[Candidate],
+    example_candidates: list[Candidate],
+    dense_candidates: list[Candidate],
 ) -> dict[str, Any]:
-    dense_query, lexical_query = build_shot_queries(shot, scene_spec, topic_brief, prompt)
     exact_matches = _exact_symbol_matches(shot.get("candidate_symbols", []))
-    api_candidates = _bm25_search(lexical_query, example=False, limit=12)
-    example_candidates = _bm25_search(lexical_query, example=True, limit=8)
-    dense_candidates = _maybe_dense_search(dense_query, limit=5)
-
-    combined_api = _expand_neighbors(_dedupe_candidates([*exact_matches, *api_candidates, *dense_candidates]))
-    reranked_api = rerank_candidates(combined_api, shot)
-    reranked_examples = rerank_candidates(_dedupe_candidates(example_candidates), shot)
+    with _timed("dedupe"):
+        combined_api = _dedupe_candidates([*exact_matches, *api_candidates, *dense_candidates])
+        deduped_examples = _dedupe_candidates(example_candidates)
+    with _timed("expand_neighbors"):
+        combined_api = _expand_neighbors(combined_api)
+    corpus = _corpus()
+    with _timed("rerank"):
+        reranked_api = rerank_candidates(combined_api, shot, corpus["api_rerank"])
+        reranked_examples = rerank_candidates(deduped_examples, shot, corpus["example_rerank"])
 
     selected_api = _select_api_chunks(reranked_api, exact_matches, limit=6)
     selected_examples = reranked_examples[:3]
     allowed_symbols = sorted(
-        {
-            chunk["metadata"].get("symbol", chunk["symbol"])
-            for chunk in selected_api
-            if chunk["metadata"].get("symbol")
-        }
+        {candidate.chunk.metadata["symbol"] for candidate in selected_api if candidate.chunk.metadata.get("symbol")}
     )
 
     notes: list[str] = []
@@ -352,14 +374,131 @@ def retrieve_shot_evidence(
     if shot.get("difficulty") in {"medium", "high"} and not selected_examples:
         notes.append("No example chunks were retrieved for this medium/high difficulty shot.")
 
-    rejected_candidates = [candidate["symbol"] for candidate in reranked_api[6:10]]
+    rejected_candidates = [candidate.chunk.symbol for candidate in reranked_api[6:10]]
     return {
         "shot_id": shot["shot_id"],
         "dense_query": dense_query,
         "lexical_query": lexical_query,
-        "selected_api_chunks": selected_api,
-        "selected_example_chunks": selected_examples,
+        "selected_api_chunks": [_evidence_chunk(candidate) for candidate in selected_api],
+        "selected_example_chunks": [_evidence_chunk(candidate) for candidate in selected_examples],
         "rejected_candidates": rejected_candidates,
         "allowed_symbols": allowed_symbols,
         "notes": notes,
     }
+
+
+@lru_cache(maxsize=1)
+def _evidence_cache() -> LRUCache | None:
+    ttl_seconds = float(os.getenv("RETRIEVAL_CACHE_TTL_SECONDS", "3600"))
+    if ttl_seconds <= 0:
+        return None
+    return LRUCache(int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", "512")), ttl_seconds=ttl_seconds)
+
+
+def retrieval_cache_stats() -> dict[str, Any]:
+    """Return the evidence cache's stats, or {"enabled": False} when it is off."""
+    cache = _evidence_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
+
+
+def _normalize_query(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def _evidence_cache_key(shot: dict[str, Any], dense_query: str, lexical_query: str) -> tuple:
+    # Besides the two queries, reranking reads these shot fields and the notes read difficulty.
+    return (
+        _normalize_query(lexical_query),
+        _normalize_query(dense_query),
+        tuple(symbol.casefold() for symbol in shot.get("candidate_symbols", [])),
+        tuple(pattern.casefold() for pattern in shot.get("animation_patterns", [])),
+        tuple(item.casefold() for item in shot.get("visible_objects", [])),
+        shot.get("difficulty"),
+    )
+
+
+def _cached_evidence(
+    shot: dict[str, Any], dense_query: str, lexical_query: str, key: tuple
+) -> dict[str, Any] | None:
+    cache = _evidence_cache()
+    cached = cache.get(key) if cache is not None else None
+    if cached is None:
+        return None
+    return {
+        **copy.deepcopy(cached),
+        "shot_id": shot["shot_id"],
+        "dense_query": dense_query,
+        "lexical_query": lexical_query,
+    }
+
+
+def _remember_evidence(key: tuple, evidence: dict[str, Any]) -> None:
+    cache = _evidence_cache()
+    if cache is not None:
+        cache.set(key, copy.deepcopy(evidence))
+
+
+def retrieve_shot_evidence(
+    shot: dict[str, Any],
+    scene_spec: dict[str, Any],
+    topic_brief: dict[str, Any],
+    prompt: str,
+) -> dict[str, Any]:
+    """Retrieve, rerank and cache the evidence for one planned shot."""
+    dense_query, lexical_query = build_shot_queries(shot, scene_spec, topic_brief, prompt)
+    cache_key = _evidence_cache_key(shot, dense_query, lexical_query)
+    cached = _cached_evidence(shot, dense_query, lexical_query, cache_key)
+    if cached is not None:
+        return cached
+
+    api_candidates = _bm25_search(lexical_query, example=False, limit=12)
+    example_candidates = _bm25_search(lexical_query, example=True, limit=8)
+    with _timed("dense"):
+        dense_candidates = _maybe_dense_search(dense_query, limit=5)
+    evidence = _assemble_shot_evidence(
+        shot, dense_query, lexical_query, api_candidates, example_candidates, dense_candidates or []
+    )
+    # Evidence missing its dense hits is not cached, so a transient failure is retried on the next call.
+    if dense_candidates is not None:
+        _remember_evidence(cache_key, evidence)
+    return evidence
+
+
+def retrieve_evidence_batch(
+    shots: list[dict[str, Any]],
+    scene_spec: dict[str, Any],
+    topic_brief: dict[str, Any],
+    prompt: str,
+) -> list[dict[str, Any]]:
+    """Retrieve evidence for every shot with one lexical pass per corpus and one dense request."""
+    queries = [build_shot_queries(shot, scene_spec, topic_brief, prompt) for shot in shots]
+    cache_keys = [_evidence_cache_key(shot, *shot_queries) for shot, shot_queries in zip(shots, queries)]
+    results = [
+        _cached_evidence(shot, *shot_queries, key) for shot, shot_queries, key in zip(shots, queries, cache_keys)
+    ]
+    misses = [position for position, evidence in enumerate(results) if evidence is None]
+    if not misses:
+        return results
+
+    dense_queries = [queries[position][0] for position in misses]
+    lexical_queries = [queries[position][1] for position in misses]
+    api_candidates = _bm25_search_batch(lexical_queries, example=False, limit=12)
+    example_candidates = _bm25_search_batch(lexical_queries, example=True, limit=8)
+    with _timed("dense"):
+        dense_candidates = _maybe_dense_search_batch(dense_queries, limit=5)
+    dense_failed = dense_candidates is None
+    if dense_failed:
+        dense_candidates = [[] for _ in misses]
+    for row, position in enumerate(misses):
+        dense_query, lexical_query = queries[position]
+        results[position] = _assemble_shot_evidence(
+            shots[position],
+            dense_query,
+            lexical_query,
+            api_candidates[row],
+            example_candidates[row],
+            dense_candidates[row],
+        )
+        if not dense_failed:
+            _remember_evidence(cache_keys[position], results[position])
+    return results
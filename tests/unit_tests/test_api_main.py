@@ -1,4 +1,5 @@
 import sys
+import threading
 from contextlib import contextmanager
 from pathlib import Path
 
@@ -24,8 +25,8 @@ def test_run_pipeline_returns_504_for_upstream_read_timeout(monkeypatch) -> None
         raise httpx.ReadTimeout("The read operation timed out")
 
     monkeypatch.setattr(main_module, "propagate_langfuse_attributes", _noop_propagation)
-    monkeypatch.setattr(main_module, "_get_cached_video_url", lambda prompt: None)
-    monkeypatch.setattr(main_module, "_cache_video_url", lambda prompt, video_url: None)
+    monkeypatch.setattr(main_module, "_get_cached_video_url", lambda prompt, language: None)
+    monkeypatch.setattr(main_module, "_cache_video_url", lambda prompt, language, video_url: None)
     monkeypatch.setattr(main_module, "get_langfuse_handler", lambda: None)
     monkeypatch.setattr(main_module.workflow_app, "ainvoke", fake_ainvoke)
 
@@ -43,3 +44,174 @@ def test_semantic_cache_disabled_by_default(monkeypatch) -> None:
     monkeypatch.delenv("SEMANTIC_CACHE_ENABLED", raising=False)
 
     assert main_module._semantic_cache_enabled() is False
+
+
+def test_run_pipeline_reads_cache_off_loop_and_writes_after_response(monkeypatch) -> None:
+    import threading
+
+    lookup_threads = []
+    loop_threads = []
+    cache_writes = []
+
+    def fake_lookup(prompt, language):
+        lookup_threads.append(threading.current_thread())
+        return None
+
+    def fake_exact_lookup(cache_key):
+        lookup_threads.append(threading.current_thread())
+        return None
+
+    async def fake_ainvoke(*args, **kwargs):
+        loop_threads.append(threading.current_thread())
+        return {"animation": True, "video_url": "https://cdn.test/video.mp4"}
+
+    monkeypatch.setattr(main_module, "propagate_langfuse_attributes", _noop_propagation)
+    monkeypatch.setattr(main_module, "_get_exact_cached_video_url", fake_exact_lookup)
+    monkeypatch.setattr(main_module, "_get_cached_video_url", fake_lookup)
+    monkeypatch.setattr(
+        main_module,
+        "_cache_video_url",
+        lambda prompt, language, video_url: cache_writes.append((prompt, language, video_url)),
+    )
+    monkeypatch.setattr(main_module, "get_langfuse_handler", lambda: None)
+    monkeypatch.setattr(main_module.workflow_app, "ainvoke", fake_ainvoke)
+
+    with TestClient(main_module.app) as client:
+        response = client.post("/run", json={"prompt": "Animate a sine wave", "language": "en"})
+
+    assert response.status_code == 200
+    assert response.json() == {"result": "https://cdn.test/video.mp4", "status": "success"}
+    assert len(lookup_threads) == 2 and loop_threads[0] not in lookup_threads
+    assert cache_writes == [("Animate a sine wave", "en", "https://cdn.test/video.mp4")]
+
+
+
+def test_run_pipeline_answers_repeat_prompt_from_exact_tier(monkeypatch) -> None:
+    from api.prompt_cache import PromptCache
+
+    semantic_lookups = []
+    cache = PromptCache(max_entries=8)
+
+    async def fake_ainvoke(*args, **kwargs):
+        return {"animation": True, "video_url": "https://cdn.test/video.mp4"}
+
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "true")
+    monkeypatch.setattr(main_module, "get_prompt_cache", lambda: cache)
+    monkeypatch.setattr(main_module, "propagate_langfuse_attributes", _noop_propagation)
+    monkeypatch.setattr(main_module, "_get_cached_video_url", lambda prompt, language: semantic_lookups.append(prompt))
+    monkeypatch.setattr(main_module, "_cache_video_url", lambda prompt, language, video_url: None)
+    monkeypatch.setattr(main_module, "get_langfuse_handler", lambda: None)
+    monkeypatch.setattr(main_module.workflow_app, "ainvoke", fake_ainvoke)
+
+    with TestClient(main_module.app) as client:
+        first = client.post("/run", json={"prompt": "Animate a sine wave", "language": "en"})
+        repeat = client.post("/run", json={"prompt": "  animate a SINE wave ", "language": "en"})
+
+    assert first.json() == repeat.json() == {"result": "https://cdn.test/video.mp4", "status": "success"}
+    assert semantic_lookups == ["Animate a sine wave"]
+
+
+def test_exact_cache_keeps_videos_of_different_qualities_apart(monkeypatch) -> None:
+    from api.prompt_cache import PromptCache
+
+    cache = PromptCache(max_entries=8)
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "true")
+    monkeypatch.setattr(main_module, "get_prompt_cache", lambda: cache)
+
+    def cache_key() -> str:
+        return main_module.prompt_cache_key("Animate a sine wave", **main_module._cache_scope("en"))
+
+    monkeypatch.setenv("MANIM_QUALITY_FLAG", "-ql")
+    low_quality_key = cache_key()
+    main_module._remember_video_url(low_quality_key, "https://cdn.test/low.mp4")
+    monkeypatch.setenv("MANIM_QUALITY_FLAG", "-qh")
+
+    assert cache_key() != low_quality_key
+    assert main_module._get_exact_cached_video_url(cache_key()) is None
+    main_module._remember_video_url(cache_key(), "https://cdn.test/high.mp4")
+    assert main_module._get_exact_cached_video_url(low_quality_key) == "https://cdn.test/low.mp4"
+
+
+def test_semantic_cache_scopes_entries_by_language_quality_and_pipeline(monkeypatch) -> None:
+    class FakeCollection:
+        def __init__(self):
+            self.queries = []
+            self.added = []
+
+        def query(self, **kwargs):
+            self.queries.append(kwargs)
+            return {"distances": [[0.01]], "metadatas": [[{"video_url": "https://cdn.test/hi.mp4"}]]}
+
+        def add(self, **kwargs):
+            self.added.append(kwargs)
+
+    collection = FakeCollection()
+    monkeypatch.setenv("MANIM_QUALITY_FLAG", "-qh")
+    monkeypatch.setattr(main_module, "_get_cache_collection", lambda: collection)
+    monkeypatch.setattr(main_module, "embed_texts", lambda texts: [[0.1, 0.2]])
+
+    main_module._cache_video_url("Animate a sine wave", "hi", "https://cdn.test/hi.mp4")
+    cached_url = main_module._get_cached_video_url("Animate a sine wave", "hi")
+
+    scope = {"language": "hi", "quality": "-qh", "pipeline_version": main_module.CACHE_PIPELINE_VERSION}
+    assert cached_url == "https://cdn.test/hi.mp4"
+    assert collection.added[0]["metadatas"] == [{"video_url": "https://cdn.test/hi.mp4", **scope}]
+    assert collection.queries[0]["where"] == {"$and": [{name: value} for name, value in scope.items()]}
+
+
+def test_readiness_reports_warm_up_progress(monkeypatch) -> None:
+    import threading
+    import time
+
+    release = threading.Event()
+    warmed = []
+
+    def slow_warm_retrieval():
+        release.wait(timeout=5)
+        warmed.append(True)
+
+    monkeypatch.setattr(main_module, "warm_retrieval", slow_warm_retrieval)
+    monkeypatch.setitem(main_module._warmup_state, "status", "pending")
+    monkeypatch.setitem(main_module._warmup_state, "attempts", 0)
+    monkeypatch.setitem(main_module._warmup_state, "duration_seconds", None)
+
+    with TestClient(main_module.app) as client:
+        warming = client.get("/health/ready")
+        release.set()
+        for _ in range(50):
+            ready = client.get("/health/ready")
+            if ready.status_code == 200:
+                break
+            time.sleep(0.05)
+
+    assert warming.status_code == 503
+    assert warming.json()["status"] in {"pending", "warming"}
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "ready"
+    assert warmed == [True]
+
+
+def test_warm_up_retries_then_reports_degraded_but_ready(monkeypatch) -> None:
+    outcomes = [RuntimeError("chroma down"), None]
+
+    def flaky_warm_retrieval():
+        outcome = outcomes.pop(0) if outcomes else RuntimeError("still down")
+        if outcome is not None:
+            raise outcome
+
+    monkeypatch.setattr(main_module, "warm_retrieval", flaky_warm_retrieval)
+    monkeypatch.setattr(main_module, "WARMUP_RETRY_SECONDS", 0.0)
+    monkeypatch.setattr(main_module, "_warmup_stop", threading.Event())
+    monkeypatch.setattr(main_module, "_warmup_state", {"status": "pending", "attempts": 0, "duration_seconds": None})
+    client = TestClient(main_module.app)
+
+    main_module._warm_up()
+    assert main_module._warmup_state["status"] == "ready"
+    assert main_module._warmup_state["attempts"] == 2
+
+    main_module._warm_up()
+    response = client.get("/health/ready")
+
+    assert main_module._warmup_state["attempts"] == main_module.WARMUP_ATTEMPTS
+    assert response.status_code == 200
+    assert response.json()["status"] == "degraded"
@@ -0,0 +1,59 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import rag.retriever as retriever_module
+from rag.benchmark import (
+    STAGES,
+    compare_to_baseline,
+    held_out_symbols,
+    load_cases,
+    ranked_symbols,
+    recall_at,
+    reciprocal_rank,
+    run_benchmark,
+)
+
+
+def test_quality_metrics_use_top_level_symbols_in_evidence_order() -> None:
+    evidence = {
+        "selected_api_chunks": [{"symbol": "Axes.plot"}, {"symbol": "Axes"}, {"symbol": "Create"}],
+        "rejected_candidates": ["Dot"],
+    }
+    ranked = ranked_symbols(evidence)
+
+    assert ranked == ["Axes", "Create", "Dot"]
+    assert recall_at(ranked, ["Dot", "Create"], 2) == 0.5
+    assert reciprocal_rank(ranked, ["Dot"]) == pytest.approx(1 / 3)
+    assert reciprocal_rank(ranked, ["Square"]) == 0.0
+
+
+def test_quality_is_scored_only_on_symbols_the_shot_did_not_name() -> None:
+    item = {"shot": {"candidate_symbols": ["Axes", "Create"]}, "expected_symbols": ["Axes", "Create", "Dot"]}
+
+    assert held_out_symbols(item) == ["Dot"]
+    assert all(held_out_symbols(item) for case in load_cases() for item in case["shots"])
+
+
+def test_run_benchmark_reports_every_stage_and_diffs_baseline(monkeypatch) -> None:
+    monkeypatch.setattr(retriever_module, "_maybe_dense_search", lambda *args, **kwargs: [])
+    monkeypatch.delenv("RETRIEVAL_CACHE_TTL_SECONDS", raising=False)
+    report = run_benchmark(load_cases()[:1], repeat=2)
+
+    assert report["shots"] == 2
+    assert set(report["latency_ms"]) == set(STAGES)
+    assert report["latency_ms"]["bm25_api"]["p50"] > 0
+    assert 0.0 <= report["quality"]["recall@10"] <= 1.0
+    assert "RETRIEVAL_CACHE_TTL_SECONDS" not in os.environ
+
+    baseline = {"quality": {"mrr": report["quality"]["mrr"] / 2}}
+    rows = {row["metric"]: row for row in compare_to_baseline(report, baseline)}
+    assert rows["mrr"]["change_pct"] == 100.0
+    assert rows["total.p99_ms"]["baseline"] is None
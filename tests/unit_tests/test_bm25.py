@@ -0,0 +1,56 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from rag.bm25 import InvertedBM25
+
+CORPUS = [
+    ["circle", "create", "circle", "radius"],
+    ["square", "create", "side"],
+    ["axes", "plot", "sine", "graph", "create"],
+    ["text", "write", "label"],
+    ["circle", "square", "transform"],
+    ["value", "tracker", "always_redraw", "dot", "axes"],
+]
+
+
+def test_inverted_bm25_matches_bm25okapi_scores_and_ranking() -> None:
+    rank_bm25 = pytest.importorskip("rank_bm25")
+    reference = rank_bm25.BM25Okapi(CORPUS)
+    engine = InvertedBM25.build(CORPUS)
+    vocabulary = sorted({token for document in CORPUS for token in document})
+    rng = random.Random(7)
+
+    for _ in range(50):
+        query = [rng.choice(vocabulary) for _ in range(rng.randint(1, 5))] + ["missing"]
+        scores = reference.get_scores(query)
+        ranked = sorted(zip(scores, range(len(CORPUS))), key=lambda item: item[0], reverse=True)
+        expected = [(doc_id, float(score)) for score, doc_id in ranked[:3] if score > 0]
+
+        assert engine.top_k(query, 3) == pytest.approx(expected)
+
+
+def test_inverted_bm25_round_trips_through_memory_mapped_arrays(tmp_path) -> None:
+    engine = InvertedBM25.build(CORPUS)
+    engine.save(tmp_path, "api_bm25")
+
+    loaded = InvertedBM25.load(tmp_path, "api_bm25")
+
+    assert loaded.top_k(["circle", "create"], 4) == engine.top_k(["circle", "create"], 4)
+    assert loaded.top_k(["missing"], 4) == []
+    with pytest.raises(ValueError):
+        InvertedBM25.load(tmp_path, "api_bm25", corpus_size=len(CORPUS) + 1)
+
+
+def test_inverted_bm25_batch_scoring_matches_single_queries() -> None:
+    engine = InvertedBM25.build(CORPUS)
+    queries = [["circle", "create"], ["missing"], ["axes", "dot", "axes"], []]
+
+    assert engine.top_k_many(queries, 3) == [engine.top_k(query, 3) for query in queries]
@@ -36,3 +36,70 @@ def test_chroma_openai_key_prefers_chroma_specific_key(monkeypatch) -> None:
     monkeypatch.setenv("CHROMA_OPENAI_API_KEY", "chroma-openai-key")
 
     assert chroma_utils._chroma_openai_api_key_env_var() == "CHROMA_OPENAI_API_KEY"
+
+
+def test_embed_texts_batches_misses_and_reuses_cached_embeddings(monkeypatch, tmp_path) -> None:
+    calls = []
+
+    def fake_embedding_function(texts):
+        calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "embeddings.sqlite3"))
+    monkeypatch.setattr(chroma_utils, "get_chroma_embedding_function", lambda: fake_embedding_function)
+    chroma_utils._embedding_memory_cache.cache_clear()
+    chroma_utils._embedding_disk_cache.cache_clear()
+
+    first = chroma_utils.embed_texts(["circle", "square", "circle"])
+    second = chroma_utils.embed_texts(["square", "triangle"])
+
+    assert calls == [["circle", "square"], ["triangle"]]
+    assert [list(vector) for vector in first] == [[6.0, 1.0], [6.0, 1.0], [6.0, 1.0]]
+    assert [list(vector) for vector in second] == [[6.0, 1.0], [8.0, 1.0]]
+
+    chroma_utils._embedding_memory_cache.cache_clear()
+    assert [list(vector) for vector in chroma_utils.embed_texts(["triangle"])] == [[8.0, 1.0]]
+    assert len(calls) == 2
+
+    chroma_utils._embedding_memory_cache.cache_clear()
+    chroma_utils._embedding_disk_cache.cache_clear()
+
+
+def test_chroma_client_and_collections_are_reused_until_unhealthy(monkeypatch) -> None:
+    class FakeClient:
+        def __init__(self):
+            self.healthy = True
+            self.collection_requests = []
+
+        def heartbeat(self):
+            if not self.healthy:
+                raise ConnectionError("connection reset")
+            return 1
+
+        def get_collection(self, name):
+            self.collection_requests.append(name)
+            return (self, name)
+
+    created = []
+
+    def fake_create_client():
+        created.append(FakeClient())
+        return created[-1]
+
+    monkeypatch.setenv("CHROMA_HEALTH_CHECK_SECONDS", "0")
+    monkeypatch.setattr(chroma_utils, "_create_chroma_cloud_client", fake_create_client)
+    chroma_utils.reset_chroma_client()
+
+    first = chroma_utils.get_chroma_collection("manim_source_code")
+    second = chroma_utils.get_chroma_collection("manim_source_code")
+
+    assert first is second
+    assert len(created) == 1
+    assert created[0].collection_requests == ["manim_source_code"]
+
+    created[0].healthy = False
+    reconnected = chroma_utils.get_chroma_collection("manim_source_code")
+
+    assert len(created) == 2
+    assert reconnected == (created[1], "manim_source_code")
+    chroma_utils.reset_chroma_client()
@@ -0,0 +1,70 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import rag.corpus_artifact as corpus_module
+
+
+def _docs_dir(tmp_path: Path) -> Path:
+    docs_dir = tmp_path / "docs"
+    docs_dir.mkdir()
+    shutil.copy(SRC_DIR / "manim_docs" / "mobject_geometry_arc.py", docs_dir)
+    return docs_dir
+
+
+def test_load_corpus_reuses_artifact_until_sources_change(monkeypatch, tmp_path) -> None:
+    docs_dir = _docs_dir(tmp_path)
+    artifact_dir = tmp_path / "corpus"
+    built = corpus_module.load_corpus(docs_dir, artifact_dir)
+
+    assert (artifact_dir / "manifest.json").exists()
+    assert built["api_chunks"] and built["example_chunks"]
+    assert "circle" in built["api_symbol_index"]
+
+    real_build = corpus_module.build_corpus
+    builds = []
+
+    def counting_build(docs):
+        builds.append(docs)
+        return real_build(docs)
+
+    monkeypatch.setattr(corpus_module, "build_corpus", counting_build)
+    reloaded = corpus_module.load_corpus(docs_dir, artifact_dir)
+
+    assert builds == []
+    assert [chunk["id"] for chunk in reloaded["api_chunks"]] == [chunk["id"] for chunk in built["api_chunks"]]
+    assert reloaded["api_bm25"].top_k(["circle"], 5) == built["api_bm25"].top_k(["circle"], 5)
+
+    with open(docs_dir / "mobject_geometry_arc.py", "a") as handle:
+        handle.write("\n# edited\n")
+    corpus_module.load_corpus(docs_dir, artifact_dir)
+
+    assert builds == [docs_dir]
+
+
+def test_interrupted_rewrite_leaves_no_manifest_for_mismatched_files(monkeypatch, tmp_path) -> None:
+    docs_dir = _docs_dir(tmp_path)
+    artifact_dir = tmp_path / "corpus"
+    corpus_module.load_corpus(docs_dir, artifact_dir)
+    other_docs_dir = tmp_path / "other_docs"
+    other_docs_dir.mkdir()
+    shutil.copy(SRC_DIR / "manim_docs" / "mobject_geometry_line.py", other_docs_dir)
+    other = corpus_module.build_corpus(other_docs_dir)
+
+    def crash(*args, **kwargs):
+        raise OSError("disk full")
+
+    # The postings are replaced before the pickle write fails.
+    monkeypatch.setattr(corpus_module.pickle, "dump", crash)
+    with pytest.raises(OSError):
+        corpus_module.write_corpus(other, corpus_module.source_fingerprint(docs_dir), artifact_dir)
+
+    assert not (artifact_dir / "manifest.json").exists()
+    assert corpus_module._read_corpus(corpus_module.source_fingerprint(docs_dir), artifact_dir) is None
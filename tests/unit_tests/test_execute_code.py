@@ -11,12 +11,20 @@ if str(SRC_DIR) not in sys.path:
 import agent.execute_code as execute_module
 
 
+def _serve(monkeypatch, post, get) -> None:
+    session = SimpleNamespace(post=post, get=get)
+    monkeypatch.setattr(execute_module, "get_http_session", lambda: session)
+
+
 class _Response:
-    def __init__(self, payload):
+    def __init__(self, payload, status_code: int = 200, headers: dict | None = None):
         self._payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
 
     def raise_for_status(self) -> None:
-        return None
+        if self.status_code >= 400:
+            raise execute_module.requests.HTTPError(str(self.status_code))
 
     def json(self):
         return self._payload
@@ -26,6 +34,7 @@ def test_execute_code_submits_and_polls_until_success(monkeypatch) -> None:
     monkeypatch.setenv("MANIM_WORKER_URL", "http://worker")
     monkeypatch.setenv("MANIM_WORKER_POLL_SECONDS", "5")
     monkeypatch.setenv("MANIM_WORKER_MAX_WAIT_SECONDS", "15")
+    monkeypatch.setenv("MANIM_WORKER_LONG_POLL_SECONDS", "0")
 
     poll_responses = iter(
         [
@@ -38,35 +47,63 @@ def test_execute_code_submits_and_polls_until_success(monkeypatch) -> None:
 
     def fake_post(url, json, timeout):
         captured["post"].append((url, json, timeout))
-        return _Response(next(poll_responses))
+        return _Response({"job_id": "job-1", "status": "queued"})
 
-    def fake_get(url, timeout):
-        captured["get"].append((url, timeout))
+    def fake_get(url, params, timeout):
+        captured["get"].append((url, params, timeout))
         return _Response(next(poll_responses))
 
-    monkeypatch.setattr(execute_module.requests, "post", fake_post)
-    monkeypatch.setattr(execute_module.requests, "get", fake_get)
+    _serve(monkeypatch, fake_post, fake_get)
     monkeypatch.setattr(execute_module.time, "sleep", lambda seconds: captured["sleeps"].append(seconds))
 
     result = execute_module.execute_code({"code": "print('hi')", "scene_name": "TestScene"})
 
     assert result["sandbox_error"] == "No error"
     assert result["video_url"] == "https://cdn.test/video.mp4"
-    assert len(captured["get"]) == 2
+    assert len(captured["get"]) == 3
+    assert all(params is None for _, params, _ in captured["get"])
     assert captured["sleeps"] == [5, 5]
 
 
-def test_execute_code_returns_failure_from_worker(monkeypatch) -> None:
+def test_execute_code_long_polls_without_sleeping(monkeypatch) -> None:
     monkeypatch.setenv("MANIM_WORKER_URL", "http://worker")
-    monkeypatch.setattr(
-        execute_module.requests,
-        "post",
-        lambda url, json, timeout: _Response({"job_id": "job-2", "status": "queued"}),
+    monkeypatch.setenv("MANIM_WORKER_MAX_WAIT_SECONDS", "900")
+    monkeypatch.setenv("MANIM_WORKER_LONG_POLL_SECONDS", "30")
+
+    clock = {"now": 0.0}
+    poll_responses = iter(
+        [
+            {"job_id": "job-1", "status": "running"},
+            {"job_id": "job-1", "status": "succeeded", "video_url": "https://cdn.test/video.mp4"},
+        ]
     )
+    captured = {"get": [], "sleeps": []}
+
+    def fake_get(url, params, timeout):
+        captured["get"].append((params, timeout))
+        clock["now"] += params["wait"]
+        return _Response(next(poll_responses))
+
+    _serve(monkeypatch, lambda url, json, timeout: _Response({"job_id": "job-1", "status": "queued"}), fake_get)
     monkeypatch.setattr(
-        execute_module.requests,
-        "get",
-        lambda url, timeout: _Response({"job_id": "job-2", "status": "failed", "error": "Manim failed"}),
+        execute_module,
+        "time",
+        SimpleNamespace(monotonic=lambda: clock["now"], sleep=captured["sleeps"].append),
+    )
+
+    result = execute_module.execute_code({"code": "print('hi')", "scene_name": "TestScene"})
+
+    assert result["video_url"] == "https://cdn.test/video.mp4"
+    assert captured["get"] == [({"wait": 30}, 60), ({"wait": 30}, 60)]
+    assert captured["sleeps"] == []
+
+
+def test_execute_code_returns_failure_from_worker(monkeypatch) -> None:
+    monkeypatch.setenv("MANIM_WORKER_URL", "http://worker")
+    _serve(
+        monkeypatch,
+        lambda url, json, timeout: _Response({"job_id": "job-2", "status": "queued"}),
+        lambda url, params, timeout: _Response({"job_id": "job-2", "status": "failed", "error": "Manim failed"}),
     )
     monkeypatch.setattr(execute_module.time, "sleep", lambda seconds: None)
 
@@ -77,3 +114,115 @@ def test_execute_code_returns_failure_from_worker(monkeypatch) -> None:
     assert result["video_url"] == ""
     assert result["sandbox_error"] == "Manim failed"
     assert result["render_failures"] == 2
+
+
+def test_execute_code_returns_render_cache_hit_without_polling(monkeypatch) -> None:
+    monkeypatch.setenv("MANIM_WORKER_URL", "http://worker")
+    def fail_get(url, params, timeout):
+        raise AssertionError("cache hits should not be polled")
+
+    _serve(
+        monkeypatch,
+        lambda url, json, timeout: _Response(
+            {"job_id": "job-3", "status": "succeeded", "video_url": "https://cdn.test/cached.mp4"}
+        ),
+        fail_get,
+    )
+
+    result = execute_module.execute_code({"code": "print('hi')", "scene_name": "TestScene"})
+
+    assert result == {"sandbox_error": "No error", "video_url": "https://cdn.test/cached.mp4", "render_failures": 0}
+
+
+def test_execute_code_waits_out_a_full_worker_queue(monkeypatch) -> None:
+    monkeypatch.setenv("MANIM_WORKER_URL", "http://worker")
+    monkeypatch.setenv("MANIM_WORKER_LONG_POLL_SECONDS", "0")
+    submits = iter(
+        [
+            _Response({"detail": "Render queue is full"}, 429, {"Retry-After": "7"}),
+            _Response({"job_id": "job-5", "status": "queued"}, 202),
+        ]
+    )
+    sleeps = []
+    _serve(
+        monkeypatch,
+        lambda url, json, timeout: next(submits),
+        lambda url, params, timeout: _Response({"job_id": "job-5", "status": "succeeded", "video_url": "v.mp4"}),
+    )
+    monkeypatch.setattr(execute_module.time, "sleep", sleeps.append)
+
+    result = execute_module.execute_code({"code": "print('hi')", "scene_name": "TestScene", "render_failures": 1})
+
+    assert result == {"sandbox_error": "No error", "video_url": "v.mp4", "render_failures": 0}
+    assert sleeps == [7.0]
+
+
+def test_aexecute_code_waits_out_a_full_worker_queue(monkeypatch) -> None:
+    import asyncio
+
+    import httpx
+
+    monkeypatch.setenv("MANIM_WORKER_URL", "http://worker")
+    monkeypatch.setenv("MANIM_WORKER_LONG_POLL_SECONDS", "0")
+    submits = iter(
+        [
+            httpx.Response(429, headers={"Retry-After": "3"}, json={"detail": "Render queue is full"}),
+            httpx.Response(202, json={"job_id": "job-6", "status": "queued"}),
+        ]
+    )
+    sleeps = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            return next(submits)
+        return httpx.Response(200, json={"job_id": "job-6", "status": "succeeded", "video_url": "v.mp4"})
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(
+        execute_module,
+        "get_async_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    monkeypatch.setattr(execute_module.asyncio, "sleep", fake_sleep)
+
+    result = asyncio.run(execute_module.aexecute_code({"code": "print('hi')", "scene_name": "DemoScene"}))
+
+    assert result["video_url"] == "v.mp4"
+    assert result["render_failures"] == 0
+    assert sleeps == [3.0]
+
+
+def test_aexecute_code_long_polls_worker_without_blocking(monkeypatch) -> None:
+    import asyncio
+
+    import httpx
+
+    monkeypatch.setenv("MANIM_WORKER_URL", "http://worker")
+    monkeypatch.setenv("MANIM_WORKER_LONG_POLL_SECONDS", "30")
+    requests_seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append((request.method, str(request.url)))
+        if request.method == "POST":
+            return httpx.Response(202, json={"job_id": "job-4", "status": "queued"})
+        return httpx.Response(
+            200,
+            json={"job_id": "job-4", "status": "succeeded", "video_url": "https://cdn.test/async.mp4"},
+        )
+
+    monkeypatch.setattr(
+        execute_module,
+        "get_async_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    result = asyncio.run(execute_module.aexecute_code({"code": "print('hi')", "scene_name": "DemoScene"}))
+
+    assert result["video_url"] == "https://cdn.test/async.mp4"
+    assert result["sandbox_error"] == "No error"
+    assert requests_seen == [
+        ("POST", "http://worker/jobs"),
+        ("GET", "http://worker/jobs/job-4?wait=30"),
+    ]
@@ -0,0 +1,63 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import agent.http_clients as http_module
+
+
+def test_http_session_is_shared_and_pools_per_host(monkeypatch) -> None:
+    monkeypatch.setenv("HTTP_POOL_MAXSIZE", "4")
+    monkeypatch.setenv("HTTP_RETRY_TOTAL", "3")
+    http_module.get_http_session.cache_clear()
+    try:
+        session = http_module.get_http_session()
+        adapter = session.get_adapter("https://example.com")
+
+        assert http_module.get_http_session() is session
+        assert adapter._pool_maxsize == 4
+        assert adapter.max_retries.total == 3
+        assert "POST" not in adapter.max_retries.allowed_methods
+    finally:
+        http_module.get_http_session.cache_clear()
+
+
+def _retrying_client(statuses: list[int], seen: list[str]) -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.method)
+        return httpx.Response(statuses.pop(0))
+
+    transport = http_module._RetryingTransport(httpx.MockTransport(handler), retries=2, backoff_seconds=0)
+    return httpx.AsyncClient(transport=transport)
+
+
+def test_async_client_retries_idempotent_requests_only() -> None:
+    async def run() -> tuple[int, int]:
+        async with _retrying_client([503, 502, 200], seen) as client:
+            polled = await client.get("http://worker/jobs/job-1")
+        async with _retrying_client([503, 200], seen) as client:
+            submitted = await client.post("http://worker/jobs")
+        return polled.status_code, submitted.status_code
+
+    seen: list[str] = []
+
+    assert asyncio.run(run()) == (200, 503)
+    assert seen == ["GET", "GET", "GET", "POST"]
+
+
+def test_async_client_is_reused_within_an_event_loop() -> None:
+    async def run() -> httpx.AsyncClient:
+        client = http_module.get_async_client()
+        assert http_module.get_async_client() is client
+        await http_module.aclose_http_clients()
+        assert client.is_closed
+        return client
+
+    first = asyncio.run(run())
+    assert asyncio.run(run()) is not first
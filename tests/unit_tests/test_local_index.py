@@ -0,0 +1,92 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import rag.local_index as local_index_module
+import rag.retriever as retriever_module
+
+
+def _fake_embed_texts(texts):
+    vectors = []
+    for text in texts:
+        lowered = text.lower()
+        vectors.append([float("circle" in lowered), float("square" in lowered), 0.1])
+    return vectors
+
+
+def test_local_index_round_trips_and_ranks_by_cosine(monkeypatch, tmp_path) -> None:
+    chunks = [
+        {"id": "Circle", "content": "class Circle: draws a circle", "metadata": {"symbol": "Circle"}},
+        {"id": "Square", "content": "class Square: draws a square", "metadata": {"symbol": "Square"}},
+        {"id": "Dot", "content": "class Dot: a point", "metadata": {"symbol": "Dot"}},
+    ]
+    monkeypatch.setenv("RAG_ARTIFACT_DIR", str(tmp_path))
+    monkeypatch.setattr(local_index_module, "embed_texts", _fake_embed_texts)
+    local_index_module.load_local_index.cache_clear()
+
+    local_index_module.build_local_index(chunks)
+    index = local_index_module.load_local_index()
+
+    assert isinstance(index.matrix, np.memmap)
+    assert [chunk_id for chunk_id, _ in index.search([0.0, 1.0, 0.2], limit=2)] == ["Square", "Dot"]
+    local_index_module.load_local_index.cache_clear()
+
+
+def test_dense_search_uses_local_index_without_chroma(monkeypatch, tmp_path) -> None:
+    for env_name in ("CHROMA_API_KEY", "CHROMA_TENANT", "CHROMA_DATABASE"):
+        monkeypatch.delenv(env_name, raising=False)
+    chunks = retriever_module._load_api_chunks()[:20]
+    monkeypatch.setenv("RAG_ARTIFACT_DIR", str(tmp_path))
+    monkeypatch.setattr(local_index_module, "embed_texts", lambda texts: [[1.0, float(i)] for i, _ in enumerate(texts)])
+    monkeypatch.setattr(retriever_module, "embed_texts", lambda texts: [[0.0, 1.0]])
+    local_index_module.load_local_index.cache_clear()
+    local_index_module.build_local_index(chunks)
+
+    results = retriever_module._maybe_dense_search("anything", limit=3)
+
+    assert len(results) == 3
+    assert all(result.score_dense > 0 for result in results)
+    local_index_module.load_local_index.cache_clear()
+
+
+def test_local_index_is_ignored_when_built_with_another_model(monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("RAG_ARTIFACT_DIR", str(tmp_path))
+    monkeypatch.setattr(local_index_module, "embed_texts", _fake_embed_texts)
+    local_index_module.load_local_index.cache_clear()
+    local_index_module.build_local_index([{"id": "Circle", "content": "circle", "metadata": {}}])
+
+    monkeypatch.setenv("CHROMA_OPENAI_EMBEDDING_MODEL", "text-embedding-3-large")
+    local_index_module.load_local_index.cache_clear()
+
+    assert local_index_module.load_local_index() is None
+    local_index_module.load_local_index.cache_clear()
+
+
+def test_interrupted_rebuild_leaves_no_loadable_index(monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("RAG_ARTIFACT_DIR", str(tmp_path))
+    monkeypatch.setattr(local_index_module, "embed_texts", _fake_embed_texts)
+    local_index_module.build_local_index([{"id": "Circle", "content": "circle", "metadata": {}}])
+
+    real_write = local_index_module._write_atomic
+
+    def write_then_crash(path, data):
+        real_write(path, data)
+        # Both arrays now describe the new build; only the manifest is missing.
+        if path.name == "chunk_ids.json":
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(local_index_module, "_write_atomic", write_then_crash)
+    chunks = [{"id": name, "content": name, "metadata": {}} for name in ("Circle", "Square")]
+    with pytest.raises(KeyboardInterrupt):
+        local_index_module.build_local_index(chunks)
+
+    local_index_module.load_local_index.cache_clear()
+    assert local_index_module.load_local_index() is None
+    local_index_module.load_local_index.cache_clear()
@@ -1,5 +1,8 @@
+import asyncio
 import importlib.util
 import sys
+import threading
+import time
 from pathlib import Path
 from unittest.mock import patch
 
@@ -8,7 +11,10 @@ import pytest
 
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
-WORKER_APP_PATH = ROOT_DIR / "manim-worker" / "app.py"
+WORKER_DIR = ROOT_DIR / "manim-worker"
+WORKER_APP_PATH = WORKER_DIR / "app.py"
+if str(WORKER_DIR) not in sys.path:
+    sys.path.insert(0, str(WORKER_DIR))
 
 
 def _load_worker_module():
@@ -71,3 +77,218 @@ def test_create_job_returns_job_id(monkeypatch: pytest.MonkeyPatch) -> None:
     body = response.json()
     assert body["job_id"]
     assert body["status"] == "queued"
+
+
+def test_create_job_rejects_with_retry_after_when_queue_is_full(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MANIM_MAX_QUEUED_JOBS", "1")
+    monkeypatch.setenv("MANIM_QUEUE_RETRY_AFTER_SECONDS", "12")
+    worker = _load_worker_module()
+    client = TestClient(worker.app)
+    payload = {
+        "scene_name": "TestScene",
+        "code": "from manim import *\nclass TestScene(Scene):\n    pass",
+    }
+
+    with patch.object(worker, "_ensure_render_workers", return_value=None):
+        first = client.post("/jobs", json=payload)
+        second = client.post("/jobs", json=payload)
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert second.headers["Retry-After"] == "12"
+
+
+def test_get_job_reports_queue_position(monkeypatch: pytest.MonkeyPatch) -> None:
+    worker = _load_worker_module()
+    client = TestClient(worker.app)
+    payload = {
+        "scene_name": "TestScene",
+        "code": "from manim import *\nclass TestScene(Scene):\n    pass",
+    }
+
+    with patch.object(worker, "_ensure_render_workers", return_value=None):
+        first_id = client.post("/jobs", json=payload).json()["job_id"]
+        second_id = client.post("/jobs", json=payload).json()["job_id"]
+
+    first = client.get(f"/jobs/{first_id}").json()
+    second = client.get(f"/jobs/{second_id}").json()
+    assert (first["queue_position"], first["queue_depth"]) == (1, 2)
+    assert (second["queue_position"], second["queue_depth"]) == (2, 2)
+
+
+def test_sqlite_job_store_survives_restart_and_evicts_finished_jobs(tmp_path: Path) -> None:
+    worker = _load_worker_module()
+    store_path = tmp_path / "jobs.sqlite3"
+    store = worker.SQLiteJobStore(store_path)
+    jobs = (
+        ("done", "succeeded", "worker-a", 100.0),
+        ("busy", "running", "worker-a", 100.0),
+        ("orphaned", "running", "old-container", 100.0),
+        ("elsewhere", "queued", "worker-b", 150.0),
+    )
+    for job_id, status, worker_id, updated_at in jobs:
+        store.create(
+            {
+                "job_id": job_id,
+                "status": status,
+                "worker_id": worker_id,
+                "video_url": "",
+                "error": "",
+                "updated_at": updated_at,
+            }
+        )
+
+    restarted = worker.SQLiteJobStore(store_path)
+    assert restarted.get("done")["status"] == "succeeded"
+    assert restarted.fail_unfinished("worker-a", "restarted", running_before=120.0, queued_before=120.0) == 2
+    assert restarted.get("busy")["status"] == "failed"
+    assert restarted.get("busy")["error"] == "restarted"
+    # Left behind by a worker id that no longer exists.
+    assert restarted.get("orphaned")["status"] == "failed"
+    assert restarted.get("elsewhere")["status"] == "queued"
+
+    assert restarted.evict_finished(older_than=200.0) == 1
+    assert restarted.get("done") is None
+    assert restarted.get("busy") is not None
+
+
+def test_create_job_serves_repeat_scene_from_render_cache(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("MANIM_TMP_DIR", str(tmp_path))
+    worker = _load_worker_module()
+    client = TestClient(worker.app)
+    code = "from manim import *\nclass TestScene(Scene):\n    pass"
+    published_path = tmp_path / "published" / "TestScene.mp4"
+    published_path.write_bytes(b"mp4")
+    worker._store_render_cache(
+        worker._render_cache_key(code + "   \n", "TestScene"),
+        "https://cdn.test/TestScene.mp4",
+        published_path,
+    )
+
+    with patch.object(worker, "_ensure_render_workers") as ensure_workers:
+        response = client.post("/jobs", json={"scene_name": "TestScene", "code": code})
+
+    ensure_workers.assert_not_called()
+    body = response.json()
+    assert body["status"] == "succeeded"
+    assert body["video_url"] == "https://cdn.test/TestScene.mp4"
+    assert client.get(f"/jobs/{body['job_id']}").json()["cache_hit"] is True
+
+
+def test_render_cache_eviction_deletes_videos_no_live_job_returns(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setenv("MANIM_TMP_DIR", str(tmp_path))
+    monkeypatch.setenv("MANIM_RENDER_CACHE_MAX_BYTES", "4")
+    worker = _load_worker_module()
+    published_dir = tmp_path / "published"
+    published_dir.mkdir(parents=True, exist_ok=True)
+    worker._job_store.create(
+        {
+            "job_id": "live",
+            "status": "succeeded",
+            "worker_id": worker.WORKER_ID,
+            "video_url": "https://cdn.test/Second.mp4",
+            "updated_at": 1.0,
+        }
+    )
+    for scene_name in ("First", "Second", "Third"):
+        published_path = published_dir / f"{scene_name}.mp4"
+        published_path.write_bytes(b"mp4")
+        worker._store_render_cache(scene_name, f"https://cdn.test/{scene_name}.mp4", published_path)
+
+    assert worker._lookup_render_cache("First") is None
+    assert not (published_dir / "First.mp4").exists()
+    # A job the store still holds returns Second's URL, so its video outlives the byte budget.
+    assert worker._lookup_render_cache("Second") == "https://cdn.test/Second.mp4"
+    assert worker._lookup_render_cache("Third") == "https://cdn.test/Third.mp4"
+    assert worker._render_cache_bytes == 6
+
+
+def test_render_cache_key_changes_with_quality_flag(monkeypatch: pytest.MonkeyPatch) -> None:
+    code = "from manim import *\nclass TestScene(Scene):\n    pass"
+    low_quality_key = _load_worker_module()._render_cache_key(code, "TestScene")
+    monkeypatch.setenv("MANIM_QUALITY_FLAG", "-qh")
+    high_quality_key = _load_worker_module()._render_cache_key(code, "TestScene")
+
+    assert low_quality_key != high_quality_key
+
+
+def test_resolve_render_backend_falls_back_to_cli_for_custom_quality_flags(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MANIM_QUALITY_FLAG", "--quality=l")
+    worker = _load_worker_module()
+
+    assert worker._resolve_render_backend() == "cli"
+
+
+def test_forkserver_render_reports_scene_errors(tmp_path: Path) -> None:
+    import render_pool
+
+    source_file = tmp_path / "scene.py"
+    with pytest.raises(RuntimeError) as exc_info:
+        render_pool.run_render(
+            "raise ValueError('broken scene')",
+            source_file,
+            "TestScene",
+            tmp_path / "media",
+            "-ql",
+            timeout_seconds=30,
+        )
+
+    assert str(exc_info.value).startswith("Manim failed:")
+    assert "ValueError: broken scene" in str(exc_info.value)
+
+
+def test_get_job_long_poll_returns_when_job_finishes(monkeypatch: pytest.MonkeyPatch) -> None:
+    worker = _load_worker_module()
+    client = TestClient(worker.app)
+
+    with patch.object(worker, "_ensure_render_workers", return_value=None):
+        job_id = client.post(
+            "/jobs",
+            json={"scene_name": "LongPollScene", "code": "from manim import *\nclass LongPollScene(Scene):\n    pass"},
+        ).json()["job_id"]
+
+    finisher = threading.Timer(
+        0.2,
+        lambda: worker._update_job(job_id, status="succeeded", video_url="https://cdn.test/long-poll.mp4"),
+    )
+    finisher.start()
+    started = time.monotonic()
+    response = client.get(f"/jobs/{job_id}", params={"wait": 10})
+    finisher.join()
+
+    assert response.json()["status"] == "succeeded"
+    assert response.json()["video_url"] == "https://cdn.test/long-poll.mp4"
+    assert time.monotonic() - started < 5
+
+
+def test_job_events_stream_ends_with_terminal_status(monkeypatch: pytest.MonkeyPatch) -> None:
+    worker = _load_worker_module()
+    client = TestClient(worker.app)
+
+    with patch.object(worker, "_ensure_render_workers", return_value=None):
+        job_id = client.post(
+            "/jobs",
+            json={"scene_name": "StreamScene", "code": "from manim import *\nclass StreamScene(Scene):\n    pass"},
+        ).json()["job_id"]
+    worker._update_job(job_id, status="failed", error="Manim failed: boom")
+    real_snapshot = worker._job_snapshot
+    snapshot_loops = []
+
+    def recording_snapshot(snapshot_job_id):
+        # Store reads block, so they must not run on the event loop thread.
+        try:
+            snapshot_loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            snapshot_loops.append(None)
+        return real_snapshot(snapshot_job_id)
+
+    monkeypatch.setattr(worker, "_job_snapshot", recording_snapshot)
+    response = client.get(f"/jobs/{job_id}/events")
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block for block in response.text.split("\n\n") if block.startswith("event: job")]
+    assert len(events) == 1
+    assert '"status": "failed"' in events[0]
+    assert snapshot_loops == [None]
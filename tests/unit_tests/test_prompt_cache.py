@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from api.prompt_cache import PromptCache, prompt_cache_key
+
+
+def test_prompt_cache_key_ignores_case_whitespace_and_unicode_width() -> None:
+    assert prompt_cache_key("  Animate   a SINE wave\n", "en") == prompt_cache_key("animate a sine wave", "EN")
+    assert prompt_cache_key("Ａnimate a sine wave", "en") == prompt_cache_key("animate a sine wave", "en")
+
+
+def test_prompt_cache_key_varies_with_language_and_scope() -> None:
+    assert prompt_cache_key("Animate a sine wave", "en") != prompt_cache_key("Animate a sine wave", "hi")
+    assert prompt_cache_key("Animate a sine wave", "en", quality="-ql") != prompt_cache_key(
+        "Animate a sine wave", "en", quality="-qh"
+    )
+
+
+def test_prompt_cache_persists_through_sqlite(tmp_path) -> None:
+    key = prompt_cache_key("Animate a sine wave", "en")
+    PromptCache(max_entries=8, sqlite_path=tmp_path / "prompts.sqlite3").set(key, "https://cdn.test/sine.mp4")
+
+    restarted = PromptCache(max_entries=8, sqlite_path=tmp_path / "prompts.sqlite3")
+
+    assert restarted.get(key) == "https://cdn.test/sine.mp4"
+    assert restarted.get(prompt_cache_key("Animate a cosine wave", "en")) is None
@@ -0,0 +1,64 @@
+import dataclasses
+import random
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from rag.records import Candidate, ChunkRecord
+from rag.reranker import RerankFeatures, rerank_candidates
+
+CHUNKS = [
+    {"id": "Circle", "metadata": {"symbol": "Circle", "aliases": ["Circle", "geometry"], "keywords": ["shape"]}},
+    {"id": "Square", "metadata": {"symbol": "Square", "aliases": ["Square"], "keywords": ["shape", "polygon"]}},
+    {"id": "Create", "metadata": {"symbol": "Create", "aliases": [], "animation_patterns": ["Create"]}},
+    {"id": "Axes", "metadata": {"symbol": "Axes", "aliases": ["axes"], "keywords": ["graph", "plot"]}},
+    {"id": "scene", "metadata": {"scene_name": "Demo", "visual_patterns": ["transform"], "domain_tags": ["geometry"]}},
+]
+
+
+def _candidates(rng: random.Random) -> list[Candidate]:
+    return [
+        Candidate(
+            ChunkRecord.from_chunk(chunk, row),
+            score_lexical=rng.choice([0.0, rng.random() * 5]),
+            score_dense=rng.choice([0.0, rng.random()]),
+        )
+        for row, chunk in enumerate(CHUNKS)
+    ]
+
+
+def _scored(candidates: list[Candidate]) -> list[tuple[str, float]]:
+    return [(candidate.chunk_id, candidate.score_rerank) for candidate in candidates]
+
+
+def test_bitset_scores_match_direct_set_overlap() -> None:
+    features = RerankFeatures.build(CHUNKS)
+    terms = ["circle", "Square", "Create", "Transform", "axes", "shape", "graph", "geometry", "missing"]
+    rng = random.Random(3)
+    for _ in range(200):
+        candidates = _candidates(rng)
+        shot = {
+            "candidate_symbols": rng.sample(terms, rng.randint(0, 4)),
+            "animation_patterns": rng.sample(terms, rng.randint(0, 3)),
+            "visible_objects": rng.sample(terms, rng.randint(0, 3)),
+        }
+        direct = rerank_candidates([dataclasses.replace(candidate) for candidate in candidates], shot)
+        assert _scored(rerank_candidates(candidates, shot, features)) == _scored(direct)
+
+
+def test_rerank_orders_by_weighted_score() -> None:
+    candidates = [
+        Candidate(ChunkRecord.from_chunk({"id": "Axes", "metadata": {"symbol": "Axes"}}), score_lexical=1.0),
+        Candidate(
+            ChunkRecord.from_chunk({"id": "Circle", "metadata": {"symbol": "Circle", "aliases": ["circle"]}}),
+            score_lexical=1.0,
+        ),
+    ]
+    reranked = rerank_candidates(candidates, {"candidate_symbols": ["Circle"]})
+
+    assert _scored(reranked) == [("Circle", 0.5), ("Axes", 0.3)]
+    assert [candidate.chunk_id for candidate in candidates] == ["Axes", "Circle"]
@@ -0,0 +1,185 @@
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import agent.research_topic as research_module
+from agent.research_cache import PageCache
+
+PAGE = "<html><title>Apollo 11</title><p>" + "Apollo 11 landed on the Moon on July 20, 1969. " * 3 + "</p></html>"
+
+
+class _Response:
+    def __init__(self, status_code: int, text: str = "", headers: dict | None = None) -> None:
+        self.status_code = status_code
+        self.content = text.encode()
+        self.headers = headers or {}
+        self.encoding = "utf-8"
+
+    def __enter__(self) -> "_Response":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def iter_content(self, chunk_size: int):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise research_module.requests.HTTPError(str(self.status_code))
+
+
+@pytest.fixture
+def page_cache(monkeypatch, tmp_path) -> PageCache:
+    cache = PageCache(tmp_path / "pages.sqlite3", ttl_seconds=60, max_bytes=1024**2)
+    monkeypatch.setattr(research_module, "get_page_cache", lambda: cache)
+    return cache
+
+
+def _serve(monkeypatch, responses: list) -> list[dict]:
+    calls: list[dict] = []
+
+    def fake_get(url, headers=None, timeout=None, stream=False):
+        calls.append(headers or {})
+        return responses.pop(0)
+
+    monkeypatch.setattr(research_module, "get_http_session", lambda: SimpleNamespace(get=fake_get))
+    return calls
+
+
+def test_fresh_excerpt_is_served_from_disk(monkeypatch, page_cache) -> None:
+    html_headers = {"content-type": "text/html", "ETag": '"v1"'}
+    calls = _serve(monkeypatch, [_Response(200, PAGE, html_headers)])
+
+    first = research_module._fetch_page_excerpt("https://nasa.gov/apollo-11")
+    second = research_module._fetch_page_excerpt("https://nasa.gov/apollo-11")
+
+    assert first.startswith("Title: Apollo 11")
+    assert second == first
+    assert len(calls) == 1
+
+
+def test_expired_excerpt_is_revalidated_with_etag(monkeypatch, page_cache) -> None:
+    page_cache.set("https://nasa.gov/apollo-11", "cached excerpt", etag='"v1"', last_modified="Sun, 20 Jul 1969")
+    page_cache.ttl_seconds = 0
+    monkeypatch.setattr(time, "time", lambda: 10**10)
+    calls = _serve(monkeypatch, [_Response(304)])
+
+    assert research_module._fetch_page_excerpt("https://nasa.gov/apollo-11") == "cached excerpt"
+    assert calls[0]["If-None-Match"] == '"v1"'
+    assert calls[0]["If-Modified-Since"] == "Sun, 20 Jul 1969"
+    assert page_cache.get("https://nasa.gov/apollo-11")["fetched_at"] == 10**10
+
+
+def test_page_cache_stays_within_its_byte_budget(tmp_path) -> None:
+    cache = PageCache(tmp_path / "pages.sqlite3", ttl_seconds=60, max_bytes=400)
+    for index in range(5):
+        cache.set(f"https://example.com/{index}", "x" * 150)
+
+    assert cache.get("https://example.com/4") is not None
+    assert cache.get("https://example.com/0") is None
+
+
+def test_page_cache_only_trims_once_its_size_estimate_passes_the_budget(monkeypatch, tmp_path) -> None:
+    cache = PageCache(tmp_path / "pages.sqlite3", ttl_seconds=60, max_bytes=2000)
+    trims = []
+    real_trim = cache._store.trim
+    monkeypatch.setattr(cache._store, "trim", lambda max_bytes: trims.append(max_bytes) or real_trim(max_bytes))
+
+    for index in range(20):
+        cache.set(f"https://example.com/{index}", "x" * 150)
+
+    # Each entry is ~230 bytes: the 9th write passes 2000 bytes and trims to 1800, then every ~2 writes.
+    assert len(trims) == 6
+    assert set(trims) == {1800}
+    assert cache._store.total_bytes() <= 2000
+    assert cache.get("https://example.com/19") is not None
+
+
+class _FakeDDGS:
+    instances = 0
+    closed = 0
+    overlapping = 0
+    delay = 0.0
+    searches: list[str] = []
+
+    def __init__(self) -> None:
+        _FakeDDGS.instances += 1
+        self.busy = False
+
+    def __exit__(self, *exc_info) -> None:
+        _FakeDDGS.closed += 1
+
+    def text(self, query, max_results):
+        # Like DDGS, one client must not run two searches at the same time.
+        _FakeDDGS.overlapping += self.busy
+        self.busy = True
+        time.sleep(_FakeDDGS.delay)
+        self.busy = False
+        _FakeDDGS.searches.append(query)
+        return [{"title": query, "href": f"https://example.com/{query.replace(' ', '-')}", "body": ""}]
+
+
+@pytest.fixture
+def fake_ddgs(monkeypatch):
+    import duckduckgo_search
+
+    monkeypatch.setattr(duckduckgo_search, "DDGS", _FakeDDGS)
+    monkeypatch.setattr(research_module, "_fetch_page_excerpt", lambda url: "")
+    _FakeDDGS.instances = _FakeDDGS.closed = _FakeDDGS.overlapping = 0
+    _FakeDDGS.delay = 0.0
+    _FakeDDGS.searches = []
+    research_module.get_search_cache().clear()
+    yield _FakeDDGS
+    research_module.get_search_cache().clear()
+
+
+ROUTE = {
+    "route": "named_real_world_event",
+    "needs_external_grounding": True,
+    "named_entities": [],
+    "time_sensitive": False,
+    "domain": "space",
+    "ambiguity_notes": [],
+}
+
+
+def test_search_results_are_cached_per_normalized_query(fake_ddgs) -> None:
+    research_module._gather_web_evidence(["apollo 11 timeline", "saturn v stages"], ROUTE)
+    research_module._gather_web_evidence(["  Apollo 11   TIMELINE ", "lunar module"], ROUTE)
+
+    assert sorted(fake_ddgs.searches) == ["apollo 11 timeline", "lunar module", "saturn v stages"]
+    assert fake_ddgs.instances <= 3
+    stats = research_module.get_search_cache().stats()
+    assert (stats["hits"], stats["misses"]) == (1, 3)
+
+
+def test_time_sensitive_routes_bypass_older_search_results(monkeypatch, fake_ddgs) -> None:
+    monkeypatch.setenv("RESEARCH_SEARCH_CACHE_TIME_SENSITIVE_TTL_SECONDS", "0")
+    research_module._gather_web_evidence(["artemis launch date"], ROUTE)
+    research_module._gather_web_evidence(["artemis launch date"], {**ROUTE, "time_sensitive": True})
+    research_module._gather_web_evidence(["artemis launch date"], ROUTE)
+
+    assert fake_ddgs.searches == ["artemis launch date", "artemis launch date"]
+
+
+def test_concurrent_searches_reuse_one_client_per_search_thread(fake_ddgs) -> None:
+    fake_ddgs.delay = 0.2
+    queries = ["apollo 11", "saturn v", "lunar module", "command module"]
+
+    started = time.perf_counter()
+    research_module._gather_web_evidence(queries, ROUTE)
+
+    assert time.perf_counter() - started < 0.6
+    assert sorted(fake_ddgs.searches) == sorted(queries)
+    assert fake_ddgs.overlapping == 0
+    assert fake_ddgs.closed == fake_ddgs.instances <= research_module.SEARCH_THREADS
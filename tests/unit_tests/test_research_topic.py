@@ -1,4 +1,6 @@
 import sys
+import threading
+import time
 from pathlib import Path
 
 
@@ -71,3 +73,145 @@ def test_build_search_queries_falls_back_to_prompt_and_entities(monkeypatch) ->
     )
 
     assert queries == ["Explain methane combustion methane"]
+
+
+GROUNDED_ROUTE = {
+    "route": "named_real_world_event",
+    "needs_external_grounding": True,
+    "named_entities": ["Apollo 11"],
+    "time_sensitive": False,
+    "domain": "space",
+    "ambiguity_notes": [],
+}
+
+
+def test_gather_web_evidence_searches_and_fetches_concurrently_in_query_order(monkeypatch) -> None:
+    def search(query, *args):
+        time.sleep(0.2)
+        return [{"title": query, "href": f"https://example.com/{query}/{index}", "body": ""} for index in range(2)]
+
+    def fetch(url):
+        time.sleep(0.2)
+        return "" if url.endswith("a/0") else f"excerpt of {url}"
+
+    monkeypatch.setattr(research_module, "_search_with_duckduckgo", search)
+    monkeypatch.setattr(research_module, "_fetch_page_excerpt", fetch)
+
+    started = time.perf_counter()
+    evidence = research_module._gather_web_evidence(["a", "b", "c"], GROUNDED_ROUTE)
+
+    assert time.perf_counter() - started < 0.8
+    assert [block.splitlines()[0] for block in evidence] == [
+        "URL: https://example.com/a/0",
+        "URL: https://example.com/a/1",
+        "URL: https://example.com/b/0",
+        "URL: https://example.com/b/1",
+        "URL: https://example.com/c/0",
+    ]
+    # The failed fetch does not use up one of the MAX_FETCHED_PAGES excerpts.
+    assert ["Page Excerpt" in block for block in evidence] == [False, True, True, True, False]
+
+
+def test_gather_web_evidence_stops_fetching_once_enough_pages_succeed(monkeypatch) -> None:
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        time.sleep(0.05)
+        return "" if url.endswith("/1") else f"excerpt of {url}"
+
+    def search(query, *args):
+        return [{"title": query, "href": f"https://example.com/{index}", "body": ""} for index in range(5)]
+
+    monkeypatch.setattr(research_module, "_search_with_duckduckgo", search)
+    monkeypatch.setattr(research_module, "_fetch_page_excerpt", fetch)
+
+    evidence = research_module._gather_web_evidence(["a"], GROUNDED_ROUTE)
+
+    # Page 1 comes back empty, so page 3 takes its place; page 4 is never requested.
+    assert sorted(fetched) == [f"https://example.com/{index}" for index in range(4)]
+    assert ["Page Excerpt" in block for block in evidence] == [True, False, True, True, False]
+
+
+def test_gather_web_evidence_keeps_what_finished_before_the_deadline(monkeypatch) -> None:
+    release = threading.Event()
+
+    def search(query, *args):
+        if query == "slow":
+            release.wait(5)
+        return [{"title": query, "href": f"https://example.com/{query}", "body": ""}]
+
+    def fetch(url):
+        if url.endswith("fast"):
+            return "fast excerpt"
+        release.wait(5)
+        return "late excerpt"
+
+    monkeypatch.setenv("RESEARCH_DEADLINE_SECONDS", "1")
+    monkeypatch.setattr(research_module, "_search_with_duckduckgo", search)
+    monkeypatch.setattr(research_module, "_fetch_page_excerpt", fetch)
+
+    started = time.perf_counter()
+    try:
+        evidence = research_module._gather_web_evidence(["fast", "slow"], GROUNDED_ROUTE)
+    finally:
+        release.set()
+
+    assert time.perf_counter() - started < 2
+    assert evidence == ["URL: https://example.com/fast\nTitle: fast\nSnippet: \nPage Excerpt: fast excerpt"]
+
+
+class _StreamedResponse:
+    headers = {"content-type": "text/html; charset=utf-8"}
+    encoding = "utf-8"
+
+    def __init__(self, chunks: list[bytes]) -> None:
+        self.chunks = chunks
+        self.read = 0
+
+    def iter_content(self, chunk_size: int):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+
+PARAGRAPH = "<p>" + "Apollo 11 landed on the Moon on July 20, 1969 &amp; returned safely. " * 2 + "</p>"
+
+
+def test_read_excerpt_stops_once_the_excerpt_budget_is_filled() -> None:
+    chunks = [b"<html><head><title>Apollo  11</title><script>var p = '<p>';</script></head><body>"]
+    chunks += [PARAGRAPH.encode()] * 200
+    response = _StreamedResponse(chunks)
+
+    excerpt = research_module._read_excerpt(response)
+
+    title, body = excerpt.split("\n")
+    assert title == "Title: Apollo 11"
+    assert body.startswith("Excerpt: Apollo 11 landed on the Moon on July 20, 1969 & returned safely.")
+    assert len(body) == len("Excerpt: ") + research_module.EXCERPT_CHARS
+    assert response.read < 20
+
+
+def test_read_excerpt_respects_the_byte_cap(monkeypatch) -> None:
+    monkeypatch.setenv("RESEARCH_PAGE_MAX_BYTES", str(len(PARAGRAPH) * 2))
+    response = _StreamedResponse([PARAGRAPH.encode()] * 10)
+
+    excerpt = research_module._read_excerpt(response)
+
+    assert excerpt.count("Apollo 11 landed") == 4
+    assert response.read == 2
+
+
+def test_excerpt_skips_short_items_and_keeps_nested_list_text_once_in_order() -> None:
+    item = "Saturn V third stage restarted for translunar injection burn"
+    html = f"<ul><li>Nav</li><li>{item}<ul><li>{item} nested</li></ul></li><li>{item} last"
+    response = _StreamedResponse([html.encode("utf-8")])
+
+    assert research_module._read_excerpt(response) == f"{item} {item} nested {item} last"
+
+
+def test_read_excerpt_flushes_a_character_cut_off_at_the_end_of_the_stream() -> None:
+    text = "Tsiolkovsky derived the rocket equation relating delta-v to mass ratio in 1903 "
+    response = _StreamedResponse([f"<p>{text}".encode("utf-8"), "✓".encode("utf-8")[:2]])
+
+    assert research_module._read_excerpt(response) == text + "\ufffd"
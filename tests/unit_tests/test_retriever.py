@@ -11,15 +11,24 @@ if str(SRC_DIR) not in sys.path:
 
 from rag.example_chunks import extract_example_chunks
 import rag.retriever as retriever_module
-from rag.retriever import get_foundation_chunks, retrieve_shot_evidence
+from rag.retriever import get_foundation_chunks, retrieve_evidence_batch, retrieve_shot_evidence
 from rag.synthetic_chunks import build_synthetic_symbol_chunks
 
+REAL_DENSE_SEARCH = retriever_module._maybe_dense_search
+REAL_DENSE_SEARCH_BATCH = retriever_module._maybe_dense_search_batch
+
 
 @pytest.fixture(autouse=True)
 def _disable_dense_retrieval(monkeypatch: pytest.MonkeyPatch) -> None:
     for env_name in ("CHROMA_API_KEY", "CHROMA_TENANT", "CHROMA_DATABASE"):
         monkeypatch.delenv(env_name, raising=False)
     monkeypatch.setattr(retriever_module, "_maybe_dense_search", lambda *args, **kwargs: [])
+    monkeypatch.setattr(
+        retriever_module,
+        "_maybe_dense_search_batch",
+        lambda queries, **kwargs: [[] for _ in queries],
+    )
+    retriever_module._evidence_cache.cache_clear()
 
 
 def test_extract_example_chunks_returns_examples() -> None:
@@ -90,5 +99,91 @@ def test_retrieve_shot_evidence_returns_api_context() -> None:
 
 def test_foundation_chunks_include_voiceover_symbols() -> None:
     chunks = get_foundation_chunks()
-    symbols = {chunk["metadata"]["symbol"] for chunk in chunks}
+    symbols = {chunk.symbol for chunk in chunks}
     assert {"VoiceoverScene", "GTTSService"} <= symbols
+
+
+def test_retrieve_evidence_batch_matches_per_shot_retrieval(monkeypatch) -> None:
+    dense_batches = []
+    monkeypatch.setattr(
+        retriever_module,
+        "_maybe_dense_search_batch",
+        lambda queries, **kwargs: dense_batches.append(list(queries)) or [[] for _ in queries],
+    )
+    base_shot = {
+        "order": 1,
+        "purpose": "",
+        "narration": "",
+        "continuity_from_previous": "",
+        "visible_objects": [],
+        "animation_patterns": [],
+        "expected_output": "",
+        "difficulty": "low",
+        "grounded_claims": [],
+        "simplifications": [],
+    }
+    shots = [
+        {**base_shot, "shot_id": "shot_1", "purpose": "Draw a circle.", "candidate_symbols": ["Circle", "Create"]},
+        {**base_shot, "shot_id": "shot_2", "purpose": "Label the axes.", "candidate_symbols": ["Axes", "Text"]},
+    ]
+    scene_spec = {"title": "Shapes", "concept": "Shapes", "audience": "general", "teaching_goal": "Show shapes."}
+    topic_brief = {"topic_title": "Shapes", "key_facts": [], "process_steps": []}
+
+    batch = retrieve_evidence_batch(shots, scene_spec, topic_brief, "draw shapes")
+
+    assert len(dense_batches) == 1 and len(dense_batches[0]) == 2
+    assert batch == [retrieve_shot_evidence(shot, scene_spec, topic_brief, "draw shapes") for shot in shots]
+
+
+def test_repeat_shot_is_served_from_evidence_cache(monkeypatch) -> None:
+    shot = {
+        "shot_id": "shot_1",
+        "purpose": "Draw a circle and transform it into a square.",
+        "visible_objects": ["circle", "square"],
+        "candidate_symbols": ["Circle", "Square", "Transform"],
+        "animation_patterns": ["Create", "Transform"],
+        "difficulty": "easy",
+    }
+    first = retrieve_shot_evidence(shot, {"title": "Shapes"}, {}, "Circle to square")
+
+    def fail_search(*args, **kwargs):
+        raise AssertionError("cached shot should not hit BM25")
+
+    monkeypatch.setattr(retriever_module, "_bm25_search", fail_search)
+    monkeypatch.setattr(retriever_module, "_bm25_search_batch", fail_search)
+    repeat = {**shot, "shot_id": "shot_7", "purpose": "  Draw a CIRCLE and transform it into a square. "}
+    cached = retrieve_shot_evidence(repeat, {"title": "Shapes"}, {}, "Circle to square")
+    [batched] = retrieve_evidence_batch([repeat], {"title": "Shapes"}, {}, "Circle to square")
+
+    assert cached == batched
+    assert cached["shot_id"] == "shot_7"
+    assert cached["selected_api_chunks"] == first["selected_api_chunks"]
+    cached["selected_api_chunks"].clear()
+    assert retrieve_shot_evidence(repeat, {"title": "Shapes"}, {}, "Circle to square")["selected_api_chunks"]
+    stats = retriever_module.retrieval_cache_stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_failed_dense_search_is_retried_instead_of_cached(monkeypatch) -> None:
+    dense_calls = []
+
+    def flaky_local_search(queries, limit):
+        dense_calls.append(list(queries))
+        if len(dense_calls) == 1:
+            raise RuntimeError("embedding service unavailable")
+        return [[] for _ in queries]
+
+    monkeypatch.setattr(retriever_module, "_maybe_dense_search", REAL_DENSE_SEARCH)
+    monkeypatch.setattr(retriever_module, "_maybe_dense_search_batch", REAL_DENSE_SEARCH_BATCH)
+    monkeypatch.setattr(retriever_module, "_local_dense_search", flaky_local_search)
+    shot = {"shot_id": "shot_1", "purpose": "Draw a circle.", "candidate_symbols": ["Circle"], "difficulty": "low"}
+
+    degraded = retrieve_shot_evidence(shot, {"title": "Shapes"}, {}, "draw a circle")
+    retried = retrieve_shot_evidence(shot, {"title": "Shapes"}, {}, "draw a circle")
+    cached = retrieve_shot_evidence(shot, {"title": "Shapes"}, {}, "draw a circle")
+
+    assert degraded["selected_api_chunks"]
+    assert cached == retried
+    assert len(dense_calls) == 2
+    assert retriever_module.retrieval_cache_stats()["hits"] == 1